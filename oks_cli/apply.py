@@ -0,0 +1,246 @@
+import click
+import contextvars
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .utils import do_request, print_output, print_table, ctx_update, login_profile, profile_completer, \
+                   detect_and_parse_documents, get_project_name, get_template, parse_duration, wait_for_resource
+
+KINDS = ("project", "cluster")
+
+# fields identifying a resource, never sent in an update
+IDENTITY_FIELDS = ("kind", "name", "project_name", "project_id")
+
+# fields the API can update, the others such as cidr_pods are only set at creation
+UPDATABLE_FIELDS = {
+    "project": ("description", "tags", "quirks", "disable_api_termination"),
+    "cluster": ("description", "admin_whitelist", "version", "tags", "admission_flags", "quirks",
+                "disable_api_termination", "control_planes"),
+}
+
+ACTION_STATUS = {"create": "created", "update": "updated", "unchanged": "unchanged"}
+
+
+def _load_resources(documents):
+    """Validate the documents and return them as resources, clusters depending on their project when it is declared too."""
+    resources = []
+    keys = {}
+
+    for index, document in enumerate(documents):
+        if not isinstance(document, dict):
+            raise click.BadParameter(f"document {index + 1} is not an object")
+
+        kind = str(document.get("kind", "")).lower()
+        if kind not in KINDS:
+            raise click.BadParameter(f"document {index + 1}: kind must be one of {', '.join(KINDS)}")
+        if not document.get("name"):
+            raise click.BadParameter(f"document {index + 1}: missing name")
+
+        config = {key: value for key, value in document.items() if key != "kind"}
+        project_name = None
+        if kind == "cluster":
+            project_name = config.pop("project_name", None) or get_project_name(None)
+
+        key = (kind, project_name, config["name"])
+        if key in keys:
+            raise click.BadParameter(f"document {index + 1}: {kind} {config['name']} is declared twice")
+        keys[key] = len(resources)
+
+        resources.append({"kind": kind, "project": project_name, "name": config["name"], "config": config, "depends": []})
+
+    for resource in resources:
+        if resource["kind"] == "cluster" and ("project", None, resource["project"]) in keys:
+            resource["depends"].append(keys[("project", None, resource["project"])])
+
+    return resources
+
+
+def _normalize(value):
+    """Return a value as the API returns it: lists sorted, empty values as None."""
+    if isinstance(value, dict):
+        value = {key: _normalize(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        value = sorted((_normalize(item) for item in value), key=lambda item: json.dumps(item, sort_keys=True))
+    return None if value in ({}, [], "") else value
+
+
+def _matches(desired, live):
+    """Tell if a live value matches the desired one, the keys of objects the config does not set being left as they are."""
+    if isinstance(desired, dict) and isinstance(live, dict):
+        return all(_matches(value, live.get(key)) for key, value in desired.items())
+    return desired == live
+
+
+def _diff(kind, config, live):
+    """Return the updatable fields of config differing from the live object, as {field: {"from": live, "to": desired}}."""
+    changes = {}
+
+    for key, value in config.items():
+        if key in IDENTITY_FIELDS:
+            continue
+        if key not in UPDATABLE_FIELDS[kind]:
+            logging.info("%s %s: %s can not be updated, ignored", kind, config["name"], key)
+            continue
+
+        if key == "admin_whitelist" and value is not None:
+            from .cluster import resolve_admin_whitelist
+
+            value = resolve_admin_whitelist([value] if isinstance(value, str) else value)
+
+        if not _matches(_normalize(value), _normalize(live.get(key))):
+            changes[key] = {"from": live.get(key), "to": value}
+
+    return changes
+
+
+def _plan(resources):
+    """Compare the resources with the live state, fetched with two requests whatever their number."""
+    projects = {project["name"]: project for project in do_request("GET", "projects")}
+    clusters = {}
+
+    if any(resource["kind"] == "cluster" for resource in resources):
+        clusters = {(cluster.get("project_id"), cluster.get("name")): cluster for cluster in do_request("GET", "clusters/all")}
+
+    for resource in resources:
+        if resource["kind"] == "project":
+            live = projects.get(resource["name"])
+        else:
+            project = projects.get(resource["project"])
+            live = project and clusters.get((project["id"], resource["name"]))
+            resource["project_id"] = project and project["id"]
+
+        resource["live"] = live
+        if live is None:
+            resource["action"] = "create"
+            resource["changes"] = {}
+        else:
+            resource["changes"] = _diff(resource["kind"], resource["config"], live)
+            resource["action"] = "update" if resource["changes"] else "unchanged"
+
+    return resources
+
+
+def _apply_resource(resource, resources, timeout):
+    """Create or update a resource, a project created or not ready yet is waited for so that its clusters can be created."""
+    kind, name, action = resource["kind"], resource["name"], resource["action"]
+
+    if kind == "project":
+        if action == "create":
+            project = do_request("POST", "projects", json=resource["config"])
+        elif action == "update":
+            changes = {key: change["to"] for key, change in resource["changes"].items()}
+            project = do_request("PATCH", f"projects/{resource['live']['id']}", json=changes)
+        else:
+            project = resource["live"]
+
+        resource["id"] = project["id"]
+        if project.get("status") != "ready":
+            wait_for_resource(f"projects/{project['id']}", name, ("status", "ready"), timeout, lambda project: project)
+    else:
+        if action == "create":
+            from .cluster import prepare_cluster_template
+
+            project_id = resource["project_id"]
+            for index in resource["depends"]:
+                project_id = resources[index]["id"]
+            if not project_id:
+                raise click.ClickException(f"Project {resource['project']} not found")
+
+            cluster_template = prepare_cluster_template(dict(resource["config"]))
+            cluster_template["project_id"] = project_id
+            do_request("POST", "clusters", json=cluster_template)
+        elif action == "update":
+            changes = {key: change["to"] for key, change in resource["changes"].items()}
+            do_request("PATCH", f"clusters/{resource['live']['id']}", json=changes)
+
+    return ACTION_STATUS[action]
+
+
+def _run_resource(resource, resources, timeout):
+    """Apply a resource and record its status, failures are reported instead of raised."""
+    try:
+        resource["status"] = _apply_resource(resource, resources, timeout)
+    except SystemExit:
+        # raised by wait_for_resource, which already reported why
+        resource["status"] = "failed: not ready"
+    except Exception as e:
+        logging.info("could not apply %s %s: %s", resource["kind"], resource["name"], e)
+        message = e.format_message() if isinstance(e, click.ClickException) else str(e) or e.__class__.__name__
+        resource["status"] = f"failed: {message}"
+
+    click.echo(f"{resource['kind']}/{resource['name']} {resource['status']}", err=True)
+
+
+def _execute(resources, parallel, timeout):
+    """Apply the resources under a bounded worker pool, each one once all those it depends on succeeded."""
+    remaining = list(range(len(resources)))
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        while remaining or running:
+            for index in list(remaining):
+                statuses = [resources[dep].get("status") for dep in resources[index]["depends"]]
+                if any(status is None for status in statuses):
+                    continue
+
+                remaining.remove(index)
+                resource = resources[index]
+                if any(status.startswith(("failed", "skipped")) for status in statuses):
+                    resource["status"] = "skipped: a dependency failed"
+                    click.echo(f"{resource['kind']}/{resource['name']} {resource['status']}", err=True)
+                    continue
+
+                # workers run in the caller's context, which holds the logged in profile
+                future = executor.submit(contextvars.copy_context().run, _run_resource, resource, resources, timeout)
+                running[future] = index
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                future.result()
+
+
+@click.command(help="Create or update the projects and clusters described in a file")
+@click.option('--filename', '-f', type=click.File("r"), required=True, help="Multi-document YAML or JSON file of projects and clusters, each one with a 'kind'")
+@click.option('--parallel', type=click.IntRange(min=1), default=4, show_default=True, help="Number of resources applied concurrently")
+@click.option('--timeout', default="30m", show_default=True, callback=lambda ctx, param, value: parse_duration(value),
+              help="Maximum time to wait for a project to be ready before creating its clusters (30s, 15m, 1h)")
+@click.option('--dry-run', is_flag=True, help="Only print the differences with the live state, without applying them")
+@click.option('--output', '-o', type=click.Choice(["json", "yaml", "table"]), default="table", help="Specify output format, default is table")
+@click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
+@click.pass_context
+def apply(ctx, filename, parallel, timeout, dry_run, output, profile):
+    """Apply a set of projects and clusters: independent resources concurrently, clusters once their project is ready."""
+    _, _, profile = ctx_update(ctx, None, None, profile)
+    login_profile(profile)
+
+    resources = _plan(_load_resources(detect_and_parse_documents(filename.read())))
+
+    if dry_run:
+        for resource in resources:
+            status = ACTION_STATUS[resource["action"]]
+            resource["status"] = status if resource["action"] == "unchanged" else f"would be {status}"
+    else:
+        if any(resource["kind"] == "cluster" and resource["action"] == "create" for resource in resources):
+            # fetched once here rather than concurrently by the workers
+            get_template("cluster")
+        _execute(resources, parallel, timeout)
+
+    result = [{"kind": resource["kind"], "project": resource["project"], "name": resource["name"],
+               "action": resource["action"], "changes": resource["changes"], "status": resource["status"]}
+              for resource in resources]
+
+    if output == "table":
+        for element in result:
+            element["changes"] = ", ".join(element["changes"])
+        fields = [["kind", "kind"], ["project", "project"], ["name", "name"], ["action", "action"],
+                  ["changes", "changes"], ["status", "status"]]
+        print_table(result, fields)
+    else:
+        print_output(result, output)
+
+    if any(element["status"].startswith(("failed", "skipped")) for element in result):
+        raise SystemExit(1)
@@ -1,6 +1,10 @@
 import click
-from .utils import clear_cache, find_project_id_by_name, find_cluster_id_by_name, get_all_cache, get_expiration_date, \
-                   ctx_update, login_profile, profile_completer, cluster_completer, project_completer, print_table
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from .utils import clear_cache, find_project_id_by_name, find_cluster_id_by_name, get_all_cache, get_kubeconfig_expiration_date, \
+                   ctx_update, login_profile, profile_completer, cluster_completer, project_completer, print_table, \
+                   print_output, parse_duration, list_cached_kubeconfigs, is_kubeconfig_expiring, fetch_kubeconfig, \
+                   do_request
 
 from prettytable import TableStyle
 
@@ -42,17 +46,11 @@ def list_kubeconfigs(ctx, project_name, cluster_name, plain, msword, profile):
     fields = [["user", "user"],["group", "group"], ["expiration date", "expires_at"]]
 
     for element in result:
-        kubeconfig = None
         user = click.style(element['user'], bold=True)
         group = click.style(element['group'], bold=True)
 
         if element.get("cache_path"):
-            with open(element.get("cache_path")) as f:
-                kubeconfig = f.read()
-
-        if kubeconfig:
-            exp = get_expiration_date(kubeconfig)
-            row = user, group, exp
+            exp = get_kubeconfig_expiration_date(element.get("cache_path"))
             data.append({"user": user, "group": group, "expires_at": exp})
 
     style = None
@@ -62,3 +60,71 @@ def list_kubeconfigs(ctx, project_name, cluster_name, plain, msword, profile):
         style = TableStyle.MSWORD_FRIENDLY
 
     print_table(data, fields, style=style)
+
+def _renew_kubeconfig(element, ttl):
+    """Fetch a new kubeconfig for a cached entry, returns the entry updated with the renewal status."""
+    user = element["user"] if element["user"] != "default" else None
+    group = element["group"] if element["group"] != "default" else None
+
+    try:
+        _, kubeconfig_path = fetch_kubeconfig(element["project_id"], element["cluster_id"], user, group, ttl)
+        return {**element, "status": "renewed", "expires_at": get_kubeconfig_expiration_date(kubeconfig_path)}
+    except (Exception, SystemExit) as e:
+        logging.info("could not renew %s: %s", element["cache_path"], e)
+        message = e.format_message() if isinstance(e, click.ClickException) else str(e) or e.__class__.__name__
+        return {**element, "status": f"failed: {message}"}
+
+@cache.command('refresh', help="Renew cached kubeconfigs expiring soon")
+@click.option('--project-name', '-p', required=False, help="Only renew kubeconfigs of this project", shell_complete=project_completer)
+@click.option('--cluster-name', '--name', '-c', required=False, help="Only renew kubeconfigs of this cluster", shell_complete=cluster_completer)
+@click.option('--expiring-within', default="1h", show_default=True, help="Renew kubeconfigs expiring within this duration (30m, 5h, 1d, 1w)")
+@click.option('--ttl', type=click.STRING, help="TTL of the renewed kubeconfigs in human readable format (5h, 1d, 1w)")
+@click.option('--parallel', type=click.IntRange(min=1), default=4, show_default=True, help="Number of kubeconfigs renewed concurrently")
+@click.option('--dry-run', is_flag=True, help="List the kubeconfigs that would be renewed")
+@click.option('--output', '-o', type=click.Choice(["json", "yaml", "table"]), default="table", help="Specify output format, default is table")
+@click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
+@click.pass_context
+def refresh_kubeconfigs(ctx, project_name, cluster_name, expiring_within, ttl, parallel, dry_run, output, profile):
+    """Renew concurrently all cached kubeconfigs whose certificate expires within the given duration."""
+    _, _, profile = ctx_update(ctx, None, None, profile)
+    project_name = project_name or ctx.obj.get('project_name')
+    cluster_name = cluster_name or ctx.obj.get('cluster_name')
+    within = parse_duration(expiring_within)
+    login_profile(profile)
+
+    project_id = find_project_id_by_name(project_name) if project_name or cluster_name else None
+    cluster_id = find_cluster_id_by_name(project_id, cluster_name) if cluster_name else None
+
+    expiring = [{**element, "expires_at": get_kubeconfig_expiration_date(element["cache_path"])}
+                for element in list_cached_kubeconfigs(project_id, cluster_id)
+                if is_kubeconfig_expiring(element["cache_path"], within)]
+
+    if project_id is None and expiring:
+        # the cache holds the kubeconfigs of all profiles, only the clusters of the logged in one can be renewed
+        owned = {cluster.get("id") for cluster in do_request("GET", "clusters/all")}
+        foreign = [element for element in expiring if element["cluster_id"] not in owned]
+        if foreign:
+            click.echo(f"Skipping {len(foreign)} kubeconfigs of clusters not in the profile: "
+                       f"{', '.join(sorted({element['cluster_id'] for element in foreign}))}", err=True)
+        expiring = [element for element in expiring if element["cluster_id"] in owned]
+
+    if dry_run:
+        result = [{**element, "status": "would be renewed"} for element in expiring]
+    else:
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            result = list(executor.map(lambda element: _renew_kubeconfig(element, ttl), expiring))
+
+    for element in result:
+        element.pop("cache_path")
+        if element.get("expires_at"):
+            element["expires_at"] = str(element["expires_at"])
+
+    if output == "table":
+        fields = [["project id", "project_id"], ["cluster id", "cluster_id"], ["user", "user"], ["group", "group"],
+                  ["expiration date", "expires_at"], ["status", "status"]]
+        print_table(result, fields)
+    else:
+        print_output(result, output)
+
+    if any(element["status"].startswith("failed") for element in result):
+        raise SystemExit(1)
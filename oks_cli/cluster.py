@@ -1,29 +1,32 @@
 import click
 import subprocess
 import json
-from nacl.public import PrivateKey, SealedBox
-from nacl.encoding import Base64Encoder
 
-import time
 import os
-from datetime import datetime
-import dateutil.parser
-import human_readable
+import sys
+import contextvars
+import itertools
+from datetime import datetime, timezone
 import pathlib
-import prettytable
 import logging
-import yaml
+from concurrent.futures import ThreadPoolExecutor
 
 from prettytable import TableStyle
 from .utils import cluster_completer, do_request, print_output,                 \
                    find_project_id_by_name, find_cluster_id_by_name,            \
                    get_cache, save_cache, detect_and_parse_input,               \
-                   verify_certificate, shell_completions, transform_tuple,      \
+                   is_kubeconfig_valid, shell_completions, transform_tuple,     \
                    profile_list, login_profile, cluster_create_in_background,   \
                    ctx_update, set_cluster_id, get_cluster_id, get_project_id,  \
                    get_template, get_cluster_name, format_changed_row,          \
                    is_interesting_status, profile_completer, project_completer, \
-                   kubeconfig_parse_fields, print_table, format_row, apply_set_fields
+                   kubeconfig_parse_fields, print_table, format_row, apply_set_fields, \
+                   fetch_kubeconfig, renew_kubeconfig_in_background, run_kubectl_native, NOT_MODIFIED, \
+                   WatchScheduler, parse_wait_condition, parse_duration, wait_for_resource, WAIT_EXIT_TIMEOUT, \
+                   WAIT_EXIT_FAILED, print_event, get_cached_project_names, save_project_names, get_project_names, \
+                   yaml_load, parse_query, TableRenderer, getenv, parse_profile_names, resolve_profile_names, \
+                   list_from_profiles, parse_selector, match_selector, run_in_waves, \
+                   parse_name_regex, select_resources, delete_resources
 
 from .profile import add_profile
 from .project import project_create, project_login
@@ -92,31 +95,66 @@ def cluster_logout(ctx, profile):
 @click.option('--plain', is_flag=True, help="Plain table format")
 @click.option('--msword', is_flag=True, help="Microsoft Word table format")
 @click.option('--watch', '-w', is_flag=True, help="Watch the changes")
-@click.option('--output', '-o', type=click.Choice(["json", "yaml", "wide"]), help="Specify output format")
+@click.option('--interval', type=click.FloatRange(min=0.1), default=2, show_default=True, help="Seconds between watch polls while clusters are in progress")
+@click.option('--max-interval', type=click.FloatRange(min=0.1), default=30, show_default=True, help="Maximum seconds between watch polls once all clusters are stable")
+@click.option('--output', '-o', type=click.Choice(["json", "ndjson", "yaml", "wide"]), help="Specify output format, ndjson watches emit change events")
+@click.option('--query', callback=parse_query, help="JMESPath query applied to the result before printing, e.g. \"[?statuses.status=='ready'].name\"")
 @click.option('--profile', help="Configuration profile to use")
+@click.option('--profiles', callback=parse_profile_names, help="Comma-separated profiles to list the clusters of, queried concurrently")
+@click.option('--all-profiles', is_flag=True, help="List the clusters of all the configured profiles")
 @click.option('--all', '-A', is_flag=True, help="List clusters from all projects")
 @click.pass_context
-def cluster_list(ctx, project_name, cluster_name, deleted, plain, msword, watch, output, profile, all):
+def cluster_list(ctx, project_name, cluster_name, deleted, plain, msword, watch, interval, max_interval, output, query, profile, profiles, all_profiles, all):
     """Display clusters with optional filtering and real-time monitoring."""
     project_name, cluster_name, profile = ctx_update(ctx, project_name, cluster_name, profile)
-    login_profile(profile)
-
-    profile_name = os.getenv('OKS_PROFILE')
-    region_name = os.getenv('OKS_REGION')
-    params = {}
+    profiles = resolve_profile_names(profiles, all_profiles)
 
-    if not all:
-        project_id = find_project_id_by_name(project_name)
-        params['project_id'] = project_id
+    if profiles and watch:
+        raise click.BadOptionUsage("watch", "--watch can not be used with --profiles or --all-profiles")
 
-    cluster_id = get_cluster_id()
+    params = {}
 
     if cluster_name:
         params['name'] = cluster_name
     if deleted:
         params['deleted'] = True
 
+    if profiles:
+        default_cluster_ids = set()
+
+        def list_profile_clusters():
+            profile_params = dict(params)
+            if all:
+                data = _list_all_clusters(profile_params)
+            else:
+                profile_params['project_id'] = find_project_id_by_name(project_name)
+                data = do_request("GET", "clusters", params=profile_params)
+            default_cluster_ids.add(get_cluster_id())
+            return data
+    else:
+        login_profile(profile)
+
+        profile_name = getenv('OKS_PROFILE')
+        region_name = getenv('OKS_REGION')
+
+        if not all:
+            params['project_id'] = find_project_id_by_name(project_name)
+
+        default_cluster_ids = {get_cluster_id()}
+
+    def list_clusters(conditional=False):
+        if profiles:
+            return list_from_profiles(profiles, list_profile_clusters)
+        if all:
+            return _list_all_clusters(params, conditional=conditional)
+        return do_request("GET", "clusters", params=params, conditional=conditional)
+
+    # a projection can not be rendered as a table
+    if query and output in (None, "wide"):
+        output = "json"
+
     field_names = ["CLUSTER", "PROFILE", "REGION", "CREATED", "UPDATED", "STATUS", "DEFAULT"]
+    events = output == "ndjson" and watch
 
     if all:
         field_names.insert(0, "PROJECT")
@@ -125,40 +163,35 @@ def cluster_list(ctx, project_name, cluster_name, deleted, plain, msword, watch,
         field_names.insert(0, "ID")
         field_names.append("VERSION")
         field_names.append("CONTROL PLANE")
-    elif output:
-        if all:
-            projects = {p["id"]: p for p in do_request("GET", "projects")}
-            data = do_request("GET", "clusters/all", params=params)
-            for cluster in data:
-                project = projects.get(cluster.get("project_id"))
-                cluster["project_name"] = project.get("name")
-        else:
-            data = do_request("GET", "clusters", params=params)
-
-        print_output(data, output)
+    elif output and not events:
+        data = list_clusters()
+        print_output(data, output, query)
         return
 
-    table = prettytable.PrettyTable()
-    table.field_names = field_names
-
-    table._min_width = {"CREATED": 13, "UPDATED": 13, "STATUS": 10}
-
+    style = None
     if plain or watch:
-        table.set_style(TableStyle.PLAIN_COLUMNS)
+        style = TableStyle.PLAIN_COLUMNS
 
     if msword:
-        table.set_style(TableStyle.MSWORD_FRIENDLY)
+        style = TableStyle.MSWORD_FRIENDLY
 
+    table = TableRenderer(field_names, style=style, min_width={"CREATED": 13, "UPDATED": 13, "STATUS": 10})
 
-    def build_row(cluster):
+
+    def build_row(cluster, now=None):
         row, current_status, _ = format_row(
             cluster.get('statuses'),
             cluster.get('name'),
-            cluster_id == cluster.get('id')
+            cluster.get('id') in default_cluster_ids,
+            now
         )
 
-        row.insert(1, profile_name)
-        row.insert(2, region_name)
+        if profiles:
+            row.insert(1, cluster.get('profile'))
+            row.insert(2, cluster.get('region'))
+        else:
+            row.insert(1, profile_name)
+            row.insert(2, region_name)
         if all:
             project_name = click.style(cluster.get("project_name"), bold=True)
             row.insert(0, project_name)
@@ -169,44 +202,58 @@ def cluster_list(ctx, project_name, cluster_name, deleted, plain, msword, watch,
 
         return row, current_status
 
-    if all:
-        projects = {p["id"]: p for p in do_request("GET", "projects")}
-        data = do_request("GET", "clusters/all", params=params)
-        for cluster in data:
-            project = projects.get(cluster.get("project_id"))
-            cluster["project_name"] = project.get("name")
-    else:
-        data = do_request("GET", "clusters", params=params)
+    def emit(event_type, cluster):
+        if events:
+            print_event(event_type, cluster, query)
+        else:
+            row, _ = build_row(cluster)
+            click.echo(format_changed_row(table, row))
+
+    data = list_clusters(conditional=watch)
 
     initial_clusters = {}
+    # all the rows are relative to the same time
+    now = datetime.now(timezone.utc)
 
     for cluster in data:
-        row, _ = build_row(cluster)
-        table.add_row(row)
+        if events:
+            print_event("ADDED", cluster, query)
+        else:
+            row, _ = build_row(cluster, now)
+            table.add_row(row)
         initial_clusters[cluster.get("id")] = cluster
 
-    click.echo(table)
+    if not events:
+        click.echo(table)
 
     if watch:
-        total_sleep = 0
+        scheduler = WatchScheduler(interval, max_interval)
+        scheduler.update([(c.get('statuses') or {}).get('status') for c in data])
         try:
             while True:
-                time.sleep(2)
-                total_sleep += 2
+                scheduler.sleep()
 
                 try:
-                    if all:
-                        projects = {p["id"]: p for p in do_request("GET", "projects")}
-                        data = do_request("GET", "clusters/all", params=params)
-                        for cluster in data:
-                            project = projects.get(cluster.get("project_id"))
-                            cluster["project_name"] = project.get("name")
-                    else:
-                        data = do_request("GET", "clusters", params=params)
+                    clusters_data = list_clusters(conditional=True)
                 except click.ClickException as err:
-                    click.echo(f"Error during watch: {err}")
+                    click.echo(f"Error during watch: {err}", err=events)
+                    scheduler.failed(getattr(err, "retry_after", None))
                     continue
 
+                # NDJSON watches only emit changes
+                remind = scheduler.remind_due() and not events
+
+                # nothing changed since the last poll, only remind the clusters still in progress
+                if clusters_data is NOT_MODIFIED:
+                    if remind:
+                        for cluster in data:
+                            if is_interesting_status((cluster.get('statuses') or {}).get('status')):
+                                emit("MODIFIED", cluster)
+                    scheduler.update([(c.get('statuses') or {}).get('status') for c in data])
+                    continue
+
+                data = clusters_data
+
                 current_ids = {c.get('id') for c in data}
 
                 for cl_id, stored_cluster in list(initial_clusters.items()):
@@ -214,36 +261,58 @@ def cluster_list(ctx, project_name, cluster_name, deleted, plain, msword, watch,
                         deleted_cluster = stored_cluster.copy()
                         deleted_cluster['statuses']['status'] = 'deleted'
 
-                        row, _ = build_row(deleted_cluster)
-                        new_table = format_changed_row(table, row)
-                        click.echo(new_table)
+                        emit("DELETED", deleted_cluster)
                         del initial_clusters[cl_id]
 
                 for cluster in data:
                     cl_id = cluster.get('id')
-                    row, current_status = build_row(cluster)
+                    current_status = (cluster.get('statuses') or {}).get('status')
 
                     if cl_id not in initial_clusters:
-                        new_table = format_changed_row(table, row)
-                        click.echo(new_table)
+                        emit("ADDED", cluster)
                         initial_clusters[cl_id] = cluster
                         continue
 
                     stored_cluster = initial_clusters[cl_id]
                     stored_status = stored_cluster.get('statuses').get('status')
                     if stored_status != current_status:
-                        new_table = format_changed_row(table, row)
-                        click.echo(new_table)
+                        emit("MODIFIED", cluster)
                         initial_clusters[cl_id] = cluster
                         continue
 
-                    if total_sleep % 10 == 0 and is_interesting_status(current_status):
-                        new_table = format_changed_row(table, row)
-                        click.echo(new_table)
+                    if remind and is_interesting_status(current_status):
+                        emit("MODIFIED", cluster)
                         initial_clusters[cl_id] = cluster
 
+                scheduler.update([(c.get('statuses') or {}).get('status') for c in data])
+
         except KeyboardInterrupt:
-            click.echo("\nWatch stopped.")
+            click.echo("\nWatch stopped.", err=events)
+
+
+def _list_all_clusters(params, conditional=False):
+    """List the clusters of all projects with their project name.
+    Projects are listed concurrently with the clusters when the cached ID to name map is stale,
+    afterwards only if a cluster belongs to a project missing from it.
+    """
+    if get_cached_project_names() is None:
+        # a thread only when the map is stale, which is not the case on the next ticks of a watch
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # run in the caller's context, which holds the profile when listing several of them
+            projects = executor.submit(contextvars.copy_context().run, do_request, "GET", "projects")
+            data = do_request("GET", "clusters/all", params=params, conditional=conditional)
+        save_project_names(projects.result())
+    else:
+        data = do_request("GET", "clusters/all", params=params, conditional=conditional)
+
+    if data is NOT_MODIFIED:
+        return data
+
+    names = get_project_names({cluster.get("project_id") for cluster in data})
+    for cluster in data:
+        cluster["project_name"] = names.get(cluster.get("project_id"))
+
+    return data
 
 
 # GET CLUSTER BY NAME
@@ -251,9 +320,10 @@ def cluster_list(ctx, project_name, cluster_name, deleted, plain, msword, watch,
 @click.option('--project-name', '-p', required=False, help="Project Name", shell_complete=project_completer)
 @click.option('--cluster-name', '--name', '-c', required=False, help="Cluster Name", shell_complete=cluster_completer)
 @click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json")
+@click.option('--query', callback=parse_query, help="JMESPath query applied to the result before printing, e.g. \"[?statuses.status=='ready'].name\"")
 @click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
 @click.pass_context
-def cluster_get_command(ctx, project_name, cluster_name, output, profile):
+def cluster_get_command(ctx, project_name, cluster_name, output, query, profile):
     """Retrieve and display detailed information about a specific cluster."""
     project_name, cluster_name, profile = ctx_update(ctx, project_name, cluster_name, profile)
     login_profile(profile)
@@ -263,7 +333,34 @@ def cluster_get_command(ctx, project_name, cluster_name, output, profile):
 
     data = do_request("GET", f'clusters/{cluster_id}')
 
-    print_output(data, output)
+    print_output(data, output, query)
+
+
+# WAIT FOR CLUSTER STATUS
+@cluster.command('wait', help="Wait for a cluster to reach a status or to be deleted")
+@click.option('--project-name', '-p', required=False, help="Project Name", shell_complete=project_completer)
+@click.option('--cluster-name', '--name', '-c', required=False, help="Cluster Name", shell_complete=cluster_completer)
+@click.option('--for', 'condition', required=True, callback=parse_wait_condition, help=f"Condition to wait for: 'status=<status>' or 'delete', exits with code {WAIT_EXIT_FAILED} if it can not be met anymore")
+@click.option('--timeout', default="30m", show_default=True, callback=lambda ctx, param, value: parse_duration(value),
+              help=f"Maximum time to wait (30s, 15m, 1h), exits with code {WAIT_EXIT_TIMEOUT} once elapsed")
+@click.option('--interval', type=click.FloatRange(min=0.1), default=2, show_default=True, help="Seconds between polls while the cluster is in progress")
+@click.option('--max-interval', type=click.FloatRange(min=0.1), default=30, show_default=True, help="Maximum seconds between polls")
+@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Print the cluster once the condition is met")
+@click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
+@click.pass_context
+def cluster_wait_command(ctx, project_name, cluster_name, condition, timeout, interval, max_interval, output, profile):
+    """Poll a cluster until the condition is met, exiting with a distinct code if it failed or timed out."""
+    project_name, cluster_name, profile = ctx_update(ctx, project_name, cluster_name, profile)
+    login_profile(profile)
+
+    project_id = find_project_id_by_name(project_name)
+    cluster_id = find_cluster_id_by_name(project_id, cluster_name)
+
+    data = wait_for_resource(f'clusters/{cluster_id}', cluster_name or cluster_id, condition, timeout,
+                             lambda cluster: cluster.get('statuses') or {}, interval, max_interval)
+
+    if output and data is not None:
+        print_output(data, output)
 
 
 def prepare_cluster_template(cluster_config):
@@ -289,6 +386,25 @@ def prepare_cluster_template(cluster_config):
     cluster_template.update(cluster_config)
     return cluster_template
 
+def resolve_admin_whitelist(admin_list):
+    """Return the admin whitelist with 'my-ip' replaced by the current IP, without duplicates."""
+    resolved_ips = []
+    for ip in admin_list:
+        ip = ip.strip()
+        if ip == "my-ip":
+            try:
+                data = do_request("GET", "myip")
+                if isinstance(data, dict) and "x_real_ip" in data:
+                    resolved_ip = data["x_real_ip"]
+                    resolved_ips.append(f"{resolved_ip}/32")
+                else:
+                    raise click.ClickException(f"Unexpected response format from 'myip': {data}")
+            except Exception as e:
+                raise click.ClickException(f"Unable to resolve 'my-ip': {e}")
+        else:
+            resolved_ips.append(ip)
+    return list(dict.fromkeys(resolved_ips))
+
 def _create_cluster(project_name, cluster_config, output):
     """Create a new cluster with interactive setup for missing profiles/projects."""
     profiles = profile_list()
@@ -504,23 +620,7 @@ def cluster_update_command(ctx, project_name, cluster_name, description, admin,
         if len(admin) == 0:
             cluster_config['admin_whitelist'] = []
         else:
-            admin_list = admin.split(',')
-            resolved_ips = []
-            for ip in admin_list:
-                ip = ip.strip()
-                if ip == "my-ip":
-                    try:
-                        data = do_request("GET", "myip")
-                        if isinstance(data, dict) and "x_real_ip" in data:
-                            resolved_ip = data["x_real_ip"]
-                            resolved_ips.append(f"{resolved_ip}/32")
-                        else:
-                            raise click.ClickException(f"Unexpected response format from 'myip': {data}")
-                    except Exception as e:
-                        raise click.ClickException(f"Unable to resolve 'my-ip': {e}")
-                else:
-                    resolved_ips.append(ip)
-            cluster_config['admin_whitelist'] = list(dict.fromkeys(resolved_ips))
+            cluster_config['admin_whitelist'] = resolve_admin_whitelist(admin.split(','))
 
     if version is not None:
         cluster_config['version'] = version
@@ -570,42 +670,170 @@ def cluster_update_command(ctx, project_name, cluster_name, description, admin,
         data = do_request("PATCH", f'clusters/{cluster_id}', json=cluster_config)
         print_output(data, output)
 
+def _version_key(version):
+    """Sort key of a Kubernetes version such as 1.31 or 1.31.2."""
+    return tuple(int(part) for part in str(version).split(".") if part.isdigit())
+
+def _is_up_to_date(cluster, target):
+    """Tell if a cluster is ready on the target version, its upgrade being a no-op."""
+    if target is None or not isinstance(cluster, dict):
+        return False
+    return cluster.get('version') == target and (cluster.get('statuses') or {}).get('status') == "ready"
+
+def _upgrade_clusters(clusters, max_concurrent, max_failures, timeout):
+    """Upgrade the clusters by waves, each cluster being waited to be ready again before the next wave starts.
+    Returns the status of each cluster and records the version it was upgraded to.
+    """
+    done = itertools.count(1)
+    # the upgrade of a cluster already on the latest version is a no-op that never updates its status
+    target = max(do_request("GET", 'clusters/limits/kubernetes_versions') or [], key=_version_key, default=None)
+
+    def upgrade(cluster):
+        cluster_id = cluster.get('id')
+        # the status is still the one before the upgrade until the API starts it
+        statuses = cluster.get('statuses') or {}
+
+        try:
+            data = cluster
+            if not _is_up_to_date(data, target):
+                data = do_request("PATCH", f'clusters/{cluster_id}/upgrade')
+            if _is_up_to_date(data, target):
+                cluster['upgraded_version'] = target
+                status = "up to date"
+            else:
+                data = wait_for_resource(f'clusters/{cluster_id}', cluster.get('name'), ("status", "ready"), timeout,
+                                         lambda cluster: cluster.get('statuses') or {}, changed_since=statuses.get('updated_at'))
+                cluster['upgraded_version'] = data.get('version')
+                status = "upgraded"
+        except click.ClickException as e:
+            status = f"failed: {e.format_message()}"
+        except SystemExit:
+            # wait_for_resource already printed why
+            status = "failed: not ready"
+
+        click.echo(f"[{next(done)}/{len(clusters)}] {cluster.get('name')} {status}", err=True)
+        return status
+
+    return run_in_waves(clusters, upgrade, max_concurrent, max_failures)
+
 # UPGRADE CLUSTER
-@cluster.command('upgrade', help="Upgrade a cluster by name")
+@cluster.command('upgrade', help="Upgrade a cluster by name, or by waves all or selected clusters of the project")
 @click.option('--project-name', '-p', required=False, help="Project name", shell_complete=project_completer)
 @click.option('--cluster-name', '--name', '-c', required=False, help="Cluster name", shell_complete=cluster_completer)
-@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json")
+@click.option('--all', 'all_clusters', is_flag=True, help="Upgrade all the clusters of the project")
+@click.option('--selector', '-l', callback=parse_selector, help="Upgrade the clusters of the project matching comma-separated field=value, field!=value or tag=key=value terms, e.g. tag=env=staging")
+@click.option('--max-concurrent', type=click.IntRange(min=1), default=1, show_default=True, help="Number of clusters upgraded concurrently, in waves")
+@click.option('--max-failures', type=click.IntRange(min=0), default=0, show_default=True, help="Number of failed upgrades tolerated before the next waves are skipped")
+@click.option('--timeout', default="30m", show_default=True, callback=lambda ctx, param, value: parse_duration(value),
+              help="Maximum time to wait for each cluster to be ready again (30s, 15m, 1h)")
+@click.option('--dry-run', is_flag=True, help="Only list the clusters that would be upgraded")
+@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json, a table summary with --all or --selector")
 @click.option('--force', is_flag=True, help="Force upgrade")
 @click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
 @click.pass_context
-def cluster_update_command(ctx, project_name, cluster_name, output, force, profile):
-    """CLI command to upgrade an existing Kubernetes cluster to the latest supported version."""
+def cluster_update_command(ctx, project_name, cluster_name, all_clusters, selector, max_concurrent, max_failures, timeout, dry_run, output, force, profile):
+    """CLI command to upgrade existing Kubernetes clusters to the latest supported version."""
+    fleet = all_clusters or selector is not None
+    if fleet and cluster_name:
+        raise click.BadOptionUsage("cluster_name", "--cluster-name can not be used with --all or --selector")
+
     project_name, cluster_name, profile = ctx_update(ctx, project_name, cluster_name, profile)
     login_profile(profile)
 
     project_id = find_project_id_by_name(project_name)
+
+    if fleet:
+        clusters = do_request("GET", 'clusters', params={"project_id": project_id})
+        if selector:
+            clusters = [cluster for cluster in clusters if match_selector(cluster, selector)]
+        if not clusters:
+            raise click.ClickException("No cluster to upgrade")
+
+        names = ", ".join(cluster.get('name') for cluster in clusters)
+        if dry_run:
+            statuses = ["would be upgraded"] * len(clusters)
+        elif force or click.confirm(f"Are you sure you want to upgrade {len(clusters)} clusters: {names}?", abort=True):
+            statuses = _upgrade_clusters(clusters, max_concurrent, max_failures, timeout)
+
+        result = [{"id": cluster.get('id'), "name": cluster.get('name'), "version": cluster.get('version'),
+                   "upgraded_version": cluster.get('upgraded_version'), "status": status}
+                  for cluster, status in zip(clusters, statuses)]
+
+        if output:
+            print_output(result, output)
+        else:
+            print_table(result, [["cluster", "name"], ["id", "id"], ["version", "version"],
+                                 ["upgraded version", "upgraded_version"], ["status", "status"]])
+
+        if any(status.startswith(("failed", "skipped")) for status in statuses):
+            raise SystemExit(1)
+        return
+
     cluster_id = find_cluster_id_by_name(project_id, cluster_name)
     cluster_name = get_cluster_name(cluster_name)
 
+    if dry_run:
+        print_output({"message": "Dry run: The cluster would be upgraded."}, output)
+        return
+
     if force or click.confirm(f"Are you sure you want to upgrade the cluster with name {cluster_name}?", abort=True):
         data = do_request("PATCH", f'clusters/{cluster_id}/upgrade')
         print_output(data, output)
 
 # DELETE CLUSTER BY NAME
-@cluster.command('delete', help="Delete a cluster by name")
+@cluster.command('delete', help="Delete a cluster by name, or the clusters of the project matching a selector or a name pattern")
 @click.option('--project-name', '-p', required=False, help="Project name", shell_complete=project_completer)
 @click.option('--cluster-name', '--name', '-c', required=False, help="Cluster name", shell_complete=cluster_completer)
-@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json")
+@click.option('--selector', '-l', callback=parse_selector, help="Delete the clusters of the project matching comma-separated field=value, field!=value or tag=key=value terms, e.g. tag=env=ci")
+@click.option('--name-regex', callback=parse_name_regex, help="Delete the clusters of the project whose whole name matches this regular expression, e.g. 'ci-.*'")
+@click.option('--max-concurrent', type=click.IntRange(min=1), default=4, show_default=True, help="Number of clusters deleted concurrently")
+@click.option('--rate', type=click.FloatRange(min=0.1), default=5, show_default=True, help="Maximum DELETE requests per second")
+@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json, a table summary with --selector or --name-regex")
 @click.option('--dry-run', is_flag=True, help="Run without any action")
 @click.option('--force', is_flag=True, help="Force deletion without confirmation")
 @click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
 @click.pass_context
-def cluster_delete_command(ctx, project_name, cluster_name, output, dry_run, force, profile):
-    """CLI command to delete an existing Kubernetes cluster by name."""
+def cluster_delete_command(ctx, project_name, cluster_name, selector, name_regex, max_concurrent, rate, output, dry_run, force, profile):
+    """CLI command to delete existing Kubernetes clusters by name, selector or name pattern."""
+    bulk = selector is not None or name_regex is not None
+    if bulk and cluster_name:
+        raise click.BadOptionUsage("cluster_name", "--cluster-name can not be used with --selector or --name-regex")
+
     project_name, cluster_name, profile = ctx_update(ctx, project_name, cluster_name, profile)
     login_profile(profile)
 
     project_id = find_project_id_by_name(project_name)
+
+    if bulk:
+        clusters = select_resources(do_request("GET", 'clusters', params={"project_id": project_id}), selector, name_regex)
+        if not clusters:
+            raise click.ClickException("No cluster to delete")
+
+        result = [{"id": cluster.get('id'), "name": cluster.get('name'),
+                   "status": "skipped: api termination disabled" if cluster.get('disable_api_termination') else None}
+                  for cluster in clusters]
+        targets = [element for element in result if element["status"] is None]
+        names = ", ".join(element["name"] for element in targets)
+
+        if dry_run:
+            for element in targets:
+                element["status"] = "would be deleted"
+        elif targets and (force or click.confirm(f"Are you sure you want to delete {len(targets)} clusters: {names}?", abort=True)):
+            statuses = delete_resources([(f"clusters/{element['id']}", element["name"]) for element in targets], max_concurrent, rate)
+            for element, status in zip(targets, statuses):
+                element["status"] = status
+
+            if get_cluster_id() in [element["id"] for element in targets if element["status"] == "deleted"]:
+                set_cluster_id("")
+
+        if output:
+            print_output(result, output)
+        else:
+            print_table(result, [["cluster", "name"], ["id", "id"], ["status", "status"]])
+
+        if any(element["status"].startswith(("failed", "skipped")) for element in result):
+            raise SystemExit(1)
+        return
     cluster_id = find_cluster_id_by_name(project_id, cluster_name)
     cluster_name = get_cluster_name(cluster_name)
 
@@ -644,51 +872,22 @@ def cluster_kubeconfig_command(ctx, project_name, cluster_name, print_path, outp
     project_id = find_project_id_by_name(project_name)
     cluster_id = find_cluster_id_by_name(project_id, cluster_name)
 
-    # @TODO: check expiration in get_cache() code, etc
     kubeconfig_path = get_cache(project_id, cluster_id, 'kubeconfig', user, group)
 
     kubeconfig = None
     is_cert_valid = False
 
     if kubeconfig_path:
-        with open(kubeconfig_path) as f:
-            kubeconfig = f.read()
-
-    if kubeconfig:
-        is_cert_valid = verify_certificate(kubeconfig)
+        is_cert_valid = is_kubeconfig_valid(kubeconfig_path)
 
     if not kubeconfig_path or refresh or not is_cert_valid:
-        logging.info("extracting kubeconfig by api")
-
-        params = {}
-        if user:
-            params["user"] = user
-        if group:
-            params["group"] = group
-        if ttl:
-            params["ttl"] = ttl
-
-        if nacl:
-            ephemeral = PrivateKey.generate()
-            unsealbox = SealedBox(ephemeral)
-
-            headers = {
-              'x-encrypt-nacl': ephemeral.public_key.encode(Base64Encoder).decode('ascii')
-            }
-            kubeconfig_raw = do_request("POST", f'clusters/{cluster_id}/kubeconfig', params = params, headers = headers)['data']['kubeconfig']
-        else:
-            kubeconfig_raw = do_request("GET", f'clusters/{cluster_id}/kubeconfig', params = params)['data']['kubeconfig']
-
-        if not kubeconfig_raw:
-            logging.error("empty response")
-            raise SystemExit()
-        elif nacl:
-            logging.info("decrypting received kubeconfig")
-            kubeconfig = unsealbox.decrypt(kubeconfig_raw.encode('ascii'), encoder = Base64Encoder).decode('ascii')
-        else:
-            kubeconfig = kubeconfig_raw
+        kubeconfig, kubeconfig_path = fetch_kubeconfig(project_id, cluster_id, user, group, ttl, nacl)
+    else:
+        renew_kubeconfig_in_background(project_id, cluster_id, kubeconfig_path, user, group)
 
-        kubeconfig_path = save_cache(project_id, cluster_id, 'kubeconfig', kubeconfig, user, group)
+    if kubeconfig is None and not print_path and output != 'table':
+        with open(kubeconfig_path) as f:
+            kubeconfig = f.read()
 
     if print_path:
         click.echo(kubeconfig_path)
@@ -713,37 +912,37 @@ def cluster_kubeconfig_command(ctx, project_name, cluster_name, print_path, outp
             else:
                 raise SystemExit(f"Could not find {kubeconfig_path}")
         elif output == 'json':
-            click.echo(json.dumps(yaml.safe_load(kubeconfig)))
+            click.echo(json.dumps(yaml_load(kubeconfig)))
         else:
             click.echo(kubeconfig)
 
 
-def _run_kubectl(project_id, cluster_id, user, group, args, input=None, capture=False):
-    """Run a kubectl command using the cached kubeconfig for the specified cluster, refreshing it if needed."""
-    # @TODO: check expiration in get_cache() code, etc
+def _get_kubeconfig_path(project_id, cluster_id, user, group):
+    """Return the path of the cached kubeconfig for the specified cluster, refreshing it if needed."""
     kubeconfig_path = get_cache(project_id, cluster_id, 'kubeconfig', user, group)
 
-    kubeconfig = None
     is_cert_valid = False
 
-    if kubeconfig_path :
-        with open(kubeconfig_path) as f:
-            kubeconfig = f.read()
-
-    if kubeconfig:
-        is_cert_valid = verify_certificate(kubeconfig)
+    if kubeconfig_path:
+        is_cert_valid = is_kubeconfig_valid(kubeconfig_path)
 
     if not kubeconfig_path or not is_cert_valid:
-        logging.info("extracting kubeconfig by api")
+        _, kubeconfig_path = fetch_kubeconfig(project_id, cluster_id, user, group)
+    else:
+        renew_kubeconfig_in_background(project_id, cluster_id, kubeconfig_path, user, group)
 
-        kubeconfig_raw = do_request(
-            "GET", f'clusters/{cluster_id}/kubeconfig')['data']['kubeconfig']
+    return kubeconfig_path
 
-        if not kubeconfig_raw:
-            click.echo("Cannot get kubeconfig")
-            raise SystemExit(1)
 
-        kubeconfig_path = save_cache(project_id, cluster_id, 'kubeconfig', kubeconfig_raw, user, group)
+def _run_kubectl(project_id, cluster_id, user, group, args, input=None, capture=False):
+    """Run a kubectl command using the cached kubeconfig for the specified cluster, refreshing it if needed.
+    Simple get/create/delete commands are sent to the Kubernetes API directly, others go through kubectl.
+    """
+    kubeconfig_path = _get_kubeconfig_path(project_id, cluster_id, user, group)
+
+    result = run_kubectl_native(kubeconfig_path, args, input=input, capture=capture)
+    if result is not None:
+        return result
 
     env = dict(os.environ)
     env['KUBECONFIG'] = str(kubeconfig_path)
@@ -782,7 +981,31 @@ def cluster_kubectl_command(ctx, project_name, cluster_name, user, group, args,
     project_id = find_project_id_by_name(project_name)
     cluster_id = find_cluster_id_by_name(project_id, cluster_name)
 
-    _run_kubectl(project_id, cluster_id, user, group, args)
+    _exec_kubectl(project_id, cluster_id, user, group, args)
+
+
+def _exec_kubectl(project_id, cluster_id, user, group, args):
+    """Replace the current process by kubectl using the cached kubeconfig, so it gets the terminal and signals directly."""
+    env = dict(os.environ)
+    env['KUBECONFIG'] = str(_get_kubeconfig_path(project_id, cluster_id, user, group))
+
+    cmd = ['kubectl'] + list(args)
+    logging.info("executing %s", cmd)
+
+    # exec does not replace the process on Windows, keep a child process there
+    if os.name == 'nt' or not hasattr(os, 'execvpe'):
+        try:
+            raise SystemExit(subprocess.run(cmd, env=env).returncode)
+        except FileNotFoundError:
+            raise click.ClickException("kubectl not found, please install it and make sure it is in your PATH")
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    try:
+        os.execvpe('kubectl', cmd, env)
+    except FileNotFoundError:
+        raise click.ClickException("kubectl not found, please install it and make sure it is in your PATH")
 
 
 @click.group(help="Nodepool related commands.")
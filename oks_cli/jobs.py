@@ -0,0 +1,64 @@
+import click
+import os
+import time
+from .utils import print_output, print_table, list_jobs, load_job, cancel_job, is_job_active, get_job_log_path, \
+                   prune_jobs
+
+def job_completer(ctx, param, incomplete):
+    """Autocomplete job IDs starting with input."""
+    return [job["id"] for job in list_jobs() if job["id"].startswith(incomplete)]
+
+# DEFINE THE JOBS COMMAND GROUP
+@click.group(help="Background jobs related commands.")
+def jobs():
+    """CLI command group for the background jobs, such as cluster creations waiting for their project."""
+    pass
+
+# LIST JOBS
+@jobs.command('list', help="List background jobs")
+@click.option('--output', '-o', type=click.Choice(["json", "yaml", "table"]), default="table", help="Specify output format, default is table")
+def jobs_list(output):
+    """List the background jobs with their status, a job whose worker died is reported as lost."""
+    prune_jobs()
+    data = list_jobs()
+
+    for job in data:
+        if job["status"] in ("queued", "running") and not is_job_active(job):
+            job["status"] = "lost"
+
+    if output == "table":
+        fields = [["id", "id"], ["description", "description"], ["profile", "profile"], ["status", "status"],
+                  ["created at", "created_at"], ["updated at", "updated_at"]]
+        print_table(data, fields)
+    else:
+        print_output(data, output)
+
+# PRINT JOB LOGS
+@jobs.command('logs', help="Print the logs of a background job")
+@click.option('--job-id', '--id', required=True, help="Job ID", shell_complete=job_completer)
+@click.option('--follow', '-f', is_flag=True, help="Keep printing the logs until the job is over")
+def jobs_logs(job_id, follow):
+    """Print the log of a job, following it while the job is queued or running."""
+    load_job(job_id)
+    log_path = get_job_log_path(job_id)
+    offset = 0
+
+    while True:
+        if os.path.exists(log_path):
+            with open(log_path, 'r') as file:
+                file.seek(offset)
+                content = file.read()
+                offset = file.tell()
+            click.echo(content, nl=False)
+
+        if not follow or not is_job_active(load_job(job_id)):
+            break
+        time.sleep(1)
+
+# CANCEL JOB
+@jobs.command('cancel', help="Cancel a queued or running background job")
+@click.option('--job-id', '--id', required=True, help="Job ID", shell_complete=job_completer)
+@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json")
+def jobs_cancel(job_id, output):
+    """Cancel a job and stop its worker."""
+    print_output(cancel_job(job_id), output)
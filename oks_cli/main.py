@@ -3,18 +3,45 @@ import click
 import os
 import json
 import logging
-from .project import project
-from .cluster import cluster
-from .profile import profile
-from .cache import cache
-from .quotas import quotas
-from .netpeering import netpeering
-from .user import user
+import importlib
 
-from .utils import ctx_update, install_completions, profile_completer, cluster_completer, project_completer
+from .utils import ctx_update, clear_request_cache, install_completions, profile_completer, cluster_completer, project_completer
+
+class LazyGroup(click.Group):
+    """Click group importing a subcommand module only when the subcommand is resolved."""
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # map of command name to "module.attribute" import path
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(super().list_commands(ctx) + list(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return self._lazy_load(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _lazy_load(self, cmd_name):
+        module_name, attr_name = self.lazy_subcommands[cmd_name].rsplit(".", 1)
+        module = importlib.import_module(module_name, __package__)
+        cmd = getattr(module, attr_name)
+        if not isinstance(cmd, click.Command):
+            raise ValueError(f"Lazy loading of {module_name}.{attr_name} did not return a click command")
+        return cmd
 
 # Main CLI entry point
-@click.group(invoke_without_command=True)
+@click.group(cls=LazyGroup, invoke_without_command=True, lazy_subcommands={
+    "project": ".project.project",
+    "cluster": ".cluster.cluster",
+    "profile": ".profile.profile",
+    "cache": ".cache.cache",
+    "quotas": ".quotas.quotas",
+    "netpeering": ".netpeering.netpeering",
+    "user": ".user.user",
+    "apply": ".apply.apply",
+    "jobs": ".jobs.jobs",
+})
 @click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
 @click.option('--project-name', '-p', required=False, help="Project Name", shell_complete=project_completer)
 @click.option('--cluster-name', '--name', '-c', required=False, help="Cluster Name", shell_complete=cluster_completer)
@@ -28,6 +55,7 @@ def cli(ctx, project_name, cluster_name, profile, verbose):
     Each scope has several actions like 'list', 'get', 'create', etc.
     """
     ctx_update(ctx, project_name, cluster_name, profile)
+    clear_request_cache()
 
     LOGLEVEL = os.environ.get('LOGLEVEL', 'WARNING').upper()
 
@@ -56,22 +84,13 @@ def cli(ctx, project_name, cluster_name, profile, verbose):
     if cluster_name != None:
         ctx.obj['cluster_name'] = cluster_name
 
-# Register the project and cluster groups with the main CLI
-cli.add_command(project)
-cli.add_command(cluster)
-cli.add_command(profile)
-cli.add_command(cache)
-cli.add_command(quotas)
-cli.add_command(netpeering)
-cli.add_command(user)
-
 def recursive_help(cmd, parent=None):
     """Recursively prints help for all commands and subcommands."""
     ctx = click.core.Context(cmd, info_name=cmd.name, parent=parent)
     click.echo(cmd.get_help(ctx))
-    commands = getattr(cmd, 'commands', {})
-    for sub in commands.values():
-        recursive_help(sub, ctx)
+    if isinstance(cmd, click.Group):
+        for name in cmd.list_commands(ctx):
+            recursive_help(cmd.get_command(ctx, name), ctx)
 
 @cli.command('fullhelp', help="Display detailed help information for all commands.")
 def fullhelp():
@@ -1,6 +1,5 @@
 import click
 import json
-import yaml
 import time
 import ipaddress
 import uuid
@@ -9,7 +8,8 @@ from subprocess import CalledProcessError
 from .utils import cluster_completer, print_output, find_project_id_by_name,   \
                    find_cluster_id_by_name, login_profile, ctx_update,         \
                    profile_completer, project_completer, find_project_by_name, \
-                   do_request, get_cluster_name, get_project_name, get_template
+                   do_request, get_cluster_name, get_project_name, get_template, \
+                   yaml_dump
 from .cluster import _run_kubectl
 
 @click.group(help="NetPeering related commands.")
@@ -215,7 +215,7 @@ def _dry_run(name_nr: str, name_na: str, output: str):
 
     if output == "yaml":
         # print multiple yaml, separated by --- (kubernetes friendly format for multiple manifests)
-        output_data = yaml.dump_all(manifests, sort_keys=False)
+        output_data = yaml_dump(manifests, multi=True)
         click.echo(output_data)
     else:
         print_output([netpeering_request, netpeering_acceptance], output)
@@ -19,7 +19,8 @@ def profile():
 @click.option('--region', required=True, help="Region name", type=click.Choice(['eu-west-2', 'cloudgouv-eu-west-1']))
 @click.option('--endpoint', required=False, help="API endpoint", type=click.STRING)
 @click.option('--jwt', help="Enable JWT, by default is false", type=click.BOOL)
-def add_profile(profile_name, access_key, secret_key, username, password, region, endpoint, jwt):
+@click.option('--rate-limit', required=False, help="Maximum API requests per second for this profile, 0 disables the limit", type=click.FloatRange(min=0))
+def add_profile(profile_name, access_key, secret_key, username, password, region, endpoint, jwt, rate_limit):
     """Add a new profile with AK/SK or username/password authentication."""
     if not profile_name:
         profile_name = "default"
@@ -56,6 +57,9 @@ def add_profile(profile_name, access_key, secret_key, username, password, region
     if jwt is not None:
         obj["jwt"] = jwt
 
+    if rate_limit is not None:
+        obj["rate_limit"] = rate_limit
+
     set_profile(profile_name, obj)
 
     profile_name_styled = click.style(profile_name, bold=True)
@@ -67,8 +71,9 @@ def add_profile(profile_name, access_key, secret_key, username, password, region
 @click.option('--region', required=False, help="Region name", type=click.Choice(['eu-west-2', 'cloudgouv-eu-west-1']))
 @click.option('--endpoint', required=False, help="API endpoint", type=click.STRING)
 @click.option('--jwt', required=False, help="Enable jwt, by default is false", type=click.BOOL)
+@click.option('--rate-limit', required=False, help="Maximum API requests per second for this profile, 0 disables the limit", type=click.FloatRange(min=0))
 @click.option('--force', is_flag=True, help="Force update profile name without confirmation")
-def update_profile(profile_name, region, endpoint, jwt, new_name, force):
+def update_profile(profile_name, region, endpoint, jwt, rate_limit, new_name, force):
     """Update configuration settings for an existing profile."""
     profiles = profile_list()
     if profile_name not in profiles:
@@ -85,6 +90,9 @@ def update_profile(profile_name, region, endpoint, jwt, new_name, force):
     if jwt is not None:
         profile["jwt"] = jwt
 
+    if rate_limit is not None:
+        profile["rate_limit"] = rate_limit
+
     if new_name is not None:
         old_profile = click.style(profile_name, bold=True)
         new_profile = click.style(new_name, bold=True)
@@ -1,16 +1,15 @@
 import click
-import time
 import datetime
-import dateutil.parser
-import human_readable
-import prettytable
-import os
 from prettytable import TableStyle
 
 from .utils import do_request, print_output, print_table, find_project_id_by_name, get_project_id, set_project_id, \
                    detect_and_parse_input, transform_tuple, ctx_update, set_cluster_id, get_template, get_project_name, \
                    format_changed_row, is_interesting_status, login_profile, profile_completer, project_completer, \
-                   format_row, apply_set_fields
+                   format_row, apply_set_fields, NOT_MODIFIED, WatchScheduler, \
+                   parse_wait_condition, parse_duration, wait_for_resource, WAIT_EXIT_TIMEOUT, \
+                   WAIT_EXIT_FAILED, print_event, parse_query, TableRenderer, getenv, parse_profile_names, \
+                   resolve_profile_names, list_from_profiles, parse_selector, parse_name_regex, select_resources, \
+                   delete_resources
 
 # DEIFNE THE PROJECT COMMAND GROUP
 @click.group(help="Project related commands.")
@@ -75,17 +74,21 @@ def project_logout(ctx, profile):
 @click.option('--msword', is_flag=True, help="Microsoft Word table format")
 @click.option('--uuid', is_flag=True, help="Show UUID")
 @click.option('--watch', '-w', is_flag=True, help="Watch the changes")
-@click.option('--output', '-o',  type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json")
+@click.option('--interval', type=click.FloatRange(min=0.1), default=2, show_default=True, help="Seconds between watch polls while projects are in progress")
+@click.option('--max-interval', type=click.FloatRange(min=0.1), default=30, show_default=True, help="Maximum seconds between watch polls once all projects are stable")
+@click.option('--output', '-o',  type=click.Choice(["json", "ndjson", "yaml"]), help="Specify output format, ndjson watches emit change events")
+@click.option('--query', callback=parse_query, help="JMESPath query applied to the result before printing, e.g. \"[?status=='ready'].name\"")
 @click.option('--profile', help="Configuration profile to use")
+@click.option('--profiles', callback=parse_profile_names, help="Comma-separated profiles to list the projects of, queried concurrently")
+@click.option('--all-profiles', is_flag=True, help="List the projects of all the configured profiles")
 @click.pass_context
-def project_list(ctx, project_name, deleted, plain, msword, uuid, watch, output, profile):
+def project_list(ctx, project_name, deleted, plain, msword, uuid, watch, interval, max_interval, output, query, profile, profiles, all_profiles):
     """List projects with filtering, formatting, and live watch capabilities."""
     project_name, _, profile = ctx_update(ctx, project_name, None, profile)
-    login_profile(profile)
+    profiles = resolve_profile_names(profiles, all_profiles)
 
-    profile_name = os.getenv('OKS_PROFILE')
-    region_name = os.getenv('OKS_REGION')
-    project_id = get_project_id()
+    if profiles and watch:
+        raise click.BadOptionUsage("watch", "--watch can not be used with --profiles or --all-profiles")
 
     params = {}
     if project_name:
@@ -94,52 +97,106 @@ def project_list(ctx, project_name, deleted, plain, msword, uuid, watch, output,
     if deleted:
         params['deleted'] = True
 
-    data = do_request("GET", 'projects', params=params)
+    if profiles:
+        default_project_ids = set()
 
-    if output:
-        print_output(data, output)
+        def list_profile_projects():
+            default_project_ids.add(get_project_id())
+            return do_request("GET", 'projects', params=params)
+
+        data = list_from_profiles(profiles, list_profile_projects)
+    else:
+        login_profile(profile)
+
+        profile_name = getenv('OKS_PROFILE')
+        region_name = getenv('OKS_REGION')
+        default_project_ids = {get_project_id()}
+
+        data = do_request("GET", 'projects', params=params, conditional=watch)
+
+    # a projection can not be rendered as a table
+    if query and not output:
+        output = "json"
+    events = output == "ndjson" and watch
+
+    if output and not events:
+        print_output(data, output, query)
         return
 
     field_names = ["PROJECT", "PROFILE", "REGION", "CREATED", "UPDATED", "STATUS", "DEFAULT"]
     if uuid:
         field_names.append('UUID')
 
-    table = prettytable.PrettyTable()
-    table.field_names = field_names
-
-    table._min_width = {"CREATED": 13, "UPDATED": 13, "STATUS": 10}
-
+    style = None
     if plain or watch:
-        table.set_style(TableStyle.PLAIN_COLUMNS)
+        style = TableStyle.PLAIN_COLUMNS
 
     if msword:
-        table.set_style(TableStyle.MSWORD_FRIENDLY)
+        style = TableStyle.MSWORD_FRIENDLY
+
+    table = TableRenderer(field_names, style=style, min_width={"CREATED": 13, "UPDATED": 13, "STATUS": 10})
+
+    def build_row(project, now=None):
+        row, _, _ = format_row(project, project.get('name'), project.get('id') in default_project_ids, now)
+        if profiles:
+            row.insert(1, project.get('profile'))
+            row.insert(2, project.get('region'))
+        else:
+            row.insert(1, profile_name)
+            row.insert(2, region_name)
+        return row
+
+    def emit(event_type, project):
+        if events:
+            print_event(event_type, project, query)
+        else:
+            row = build_row(project)
+            click.echo(format_changed_row(table, row))
 
     initial_projects = {}
+    # all the rows are relative to the same time
+    now = datetime.datetime.now(datetime.timezone.utc)
 
     for project in data:
-        row, _, name = format_row(project, project.get('name'), project_id == project.get('id'))
-        row.insert(1, profile_name)
-        row.insert(2, region_name)
+        initial_projects[project.get('name')] = project
+        if events:
+            print_event("ADDED", project, query)
+            continue
+        row = build_row(project, now)
         if uuid:
             row.append(project.get('id'))
         table.add_row(row)
-        initial_projects[name] = project
 
-    click.echo(table)
+    if not events:
+        click.echo(table)
 
     if watch:
-        total_sleep = 0
+        scheduler = WatchScheduler(interval, max_interval)
+        scheduler.update([p.get('status') for p in data])
         try:
             while True:
-                time.sleep(2)
-                total_sleep += 2
+                scheduler.sleep()
                 try:
-                    data = do_request("GET", 'projects', params=params)
+                    projects_data = do_request("GET", 'projects', params=params, conditional=True)
                 except click.ClickException as err:
-                    click.echo(f"Error during watch: {err}")
+                    click.echo(f"Error during watch: {err}", err=events)
+                    scheduler.failed(getattr(err, "retry_after", None))
                     continue
 
+                # NDJSON watches only emit changes
+                remind = scheduler.remind_due() and not events
+
+                # nothing changed since the last poll, only remind the projects still in progress
+                if projects_data is NOT_MODIFIED:
+                    if remind:
+                        for project in data:
+                            if is_interesting_status(project.get('status')):
+                                emit("MODIFIED", project)
+                    scheduler.update([p.get('status') for p in data])
+                    continue
+
+                data = projects_data
+
                 current_project_names = {project['name'] for project in data}
 
                 for name, project in list(initial_projects.items()):
@@ -147,41 +204,34 @@ def project_list(ctx, project_name, deleted, plain, msword, uuid, watch, output,
                         deleted_project = project.copy()
                         deleted_project['status'] = 'deleted'
 
-                        row, current_status, _ = format_row(deleted_project, deleted_project.get('name'), project_id == deleted_project.get('id'))
-                        row.insert(1, profile_name)
-                        row.insert(2, region_name)
-                        new_table = format_changed_row(table, row)
-
-                        click.echo(new_table)
+                        emit("DELETED", deleted_project)
 
                         del initial_projects[name]
 
                 for project in data:
-                    row, current_status, name = format_row(project, project.get('name'), project_id == project.get('id'))
-                    row.insert(1, profile_name)
-                    row.insert(2, region_name)
+                    name = project.get('name')
+                    current_status = project.get('status')
 
                     if name not in initial_projects:
-                        new_table = format_changed_row(table, row)
-                        click.echo(new_table)
+                        emit("ADDED", project)
                         initial_projects[name] = project
                         continue
 
                     stored_project = initial_projects[name]
                     project_status = stored_project.get('status')
                     if project_status != current_status:
-                        new_table = format_changed_row(table, row)
-                        click.echo(new_table)
+                        emit("MODIFIED", project)
                         initial_projects[name] = project
                         continue
 
-                    if total_sleep % 10 == 0 and is_interesting_status(current_status):
-                        new_table = format_changed_row(table, row)
-                        click.echo(new_table)
+                    if remind and is_interesting_status(current_status):
+                        emit("MODIFIED", project)
                         initial_projects[name] = project
 
+                scheduler.update([p.get('status') for p in data])
+
         except KeyboardInterrupt:
-            click.echo("\nWatch stopped.")
+            click.echo("\nWatch stopped.", err=events)
 
 # CREATE PROJECT BY NAME
 @project.command('create', help="Create a new project")
@@ -209,8 +259,8 @@ def project_create(ctx, project_name, description, cidr, quirk, tags, disable_ap
         project_config = detect_and_parse_input(input_data)
     else:
         project_config = get_template("project")
-        if os.getenv("OKS_REGION"):
-            project_config["region"] = os.getenv("OKS_REGION")
+        if getenv("OKS_REGION"):
+            project_config["region"] = getenv("OKS_REGION")
 
     if project_name:
         project_config['name'] = project_name
@@ -251,9 +301,10 @@ def project_create(ctx, project_name, description, cidr, quirk, tags, disable_ap
 @project.command('get', help="Get default project or the project by name")
 @click.option('--project-name', '-p', help="Name of the project", shell_complete=project_completer)
 @click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json")
+@click.option('--query', callback=parse_query, help="JMESPath query applied to the result before printing, e.g. \"[?status=='ready'].name\"")
 @click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
 @click.pass_context
-def project_get(ctx, project_name, output, profile):
+def project_get(ctx, project_name, output, query, profile):
     """Retrieve and display project details by name or default project."""
     project_name, _, profile = ctx_update(ctx, project_name, None, profile)
     login_profile(profile)
@@ -261,21 +312,139 @@ def project_get(ctx, project_name, output, profile):
     project_id = find_project_id_by_name(project_name)
 
     data = do_request("GET", f'projects/{project_id}')
-    print_output(data, output)
+    print_output(data, output, query)
+
+# WAIT FOR PROJECT STATUS
+@project.command('wait', help="Wait for a project to reach a status or to be deleted")
+@click.option('--project-name', '-p', help="Name of the project", shell_complete=project_completer)
+@click.option('--for', 'condition', required=True, callback=parse_wait_condition, help=f"Condition to wait for: 'status=<status>' or 'delete', exits with code {WAIT_EXIT_FAILED} if it can not be met anymore")
+@click.option('--timeout', default="30m", show_default=True, callback=lambda ctx, param, value: parse_duration(value),
+              help=f"Maximum time to wait (30s, 15m, 1h), exits with code {WAIT_EXIT_TIMEOUT} once elapsed")
+@click.option('--interval', type=click.FloatRange(min=0.1), default=2, show_default=True, help="Seconds between polls while the project is in progress")
+@click.option('--max-interval', type=click.FloatRange(min=0.1), default=30, show_default=True, help="Maximum seconds between polls")
+@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Print the project once the condition is met")
+@click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
+@click.pass_context
+def project_wait_command(ctx, project_name, condition, timeout, interval, max_interval, output, profile):
+    """Poll a project until the condition is met, exiting with a distinct code if it failed or timed out."""
+    project_name, _, profile = ctx_update(ctx, project_name, None, profile)
+    login_profile(profile)
+
+    project_id = find_project_id_by_name(project_name)
+
+    data = wait_for_resource(f'projects/{project_id}', project_name or project_id, condition, timeout,
+                             lambda project: project, interval, max_interval)
+
+    if output and data is not None:
+        print_output(data, output)
+
+def _delete_projects(selector, name_regex, max_concurrent, rate, timeout, dry_run, force):
+    """Delete the selected projects along with their clusters, the clusters first.
+    A project protected by disable_api_termination, or owning a protected cluster, is skipped with all its clusters.
+    Returns a summary row per project and cluster.
+    """
+    projects = select_resources(do_request("GET", 'projects'), selector, name_regex)
+    if not projects:
+        raise click.ClickException("No project to delete")
+
+    project_ids = {project['id'] for project in projects}
+    clusters = [cluster for cluster in do_request("GET", 'clusters/all') if cluster.get('project_id') in project_ids]
+
+    result = []
+    for project in projects:
+        owned = [cluster for cluster in clusters if cluster.get('project_id') == project['id']]
+
+        status = None
+        if project.get('disable_api_termination'):
+            status = "skipped: api termination disabled"
+        elif any(cluster.get('disable_api_termination') for cluster in owned):
+            status = "skipped: a cluster has api termination disabled"
+
+        for cluster in owned:
+            cluster_status = None
+            if cluster.get('disable_api_termination'):
+                cluster_status = "skipped: api termination disabled"
+            elif status:
+                cluster_status = "skipped: project is protected"
+            result.append({"kind": "cluster", "project": project['name'], "name": cluster.get('name'), "id": cluster['id'], "status": cluster_status})
+
+        result.append({"kind": "project", "project": project['name'], "name": project['name'], "id": project['id'], "status": status})
+
+    target_clusters = [element for element in result if element["kind"] == "cluster" and element["status"] is None]
+    target_projects = [element for element in result if element["kind"] == "project" and element["status"] is None]
+
+    if dry_run:
+        for element in target_clusters + target_projects:
+            element["status"] = "would be deleted"
+        return result
+
+    if not target_projects:
+        return result
+
+    names = ", ".join(element["name"] for element in target_projects)
+    message = f"Are you sure you want to delete {len(target_projects)} projects: {names}"
+    if target_clusters:
+        message += f", and their {len(target_clusters)} clusters: {', '.join(element['name'] for element in target_clusters)}"
+
+    if force or click.confirm(f"{message}?", abort=True):
+        # a project can only be deleted once its clusters are gone
+        statuses = delete_resources([(f"clusters/{element['id']}", element["name"]) for element in target_clusters],
+                                    max_concurrent, rate, timeout)
+        for element, status in zip(target_clusters, statuses):
+            element["status"] = status
+
+        failed = {element["project"] for element in target_clusters if element["status"] != "deleted"}
+        for element in target_projects:
+            if element["project"] in failed:
+                element["status"] = "skipped: a cluster could not be deleted"
+
+        target_projects = [element for element in target_projects if element["status"] is None]
+        statuses = delete_resources([(f"projects/{element['id']}", element["name"]) for element in target_projects],
+                                    max_concurrent, rate)
+        for element, status in zip(target_projects, statuses):
+            element["status"] = status
+
+        if get_project_id() in [element["id"] for element in target_projects if element["status"] == "deleted"]:
+            set_project_id("")
+            set_cluster_id("")
+
+    return result
 
 # DELETE PROJECT BY NAME
-@project.command('delete', help="Delete a project by name")
+@project.command('delete', help="Delete a project by name, or the projects matching a selector or a name pattern with their clusters")
 @click.option('--project-name', '-p', required=False, help="Project Name", type=click.STRING, shell_complete=project_completer)
-@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json")
+@click.option('--selector', '-l', callback=parse_selector, help="Delete the projects matching comma-separated field=value, field!=value or tag=key=value terms, e.g. tag=env=ci, and their clusters")
+@click.option('--name-regex', callback=parse_name_regex, help="Delete the projects whose whole name matches this regular expression, e.g. 'ci-.*', and their clusters")
+@click.option('--max-concurrent', type=click.IntRange(min=1), default=4, show_default=True, help="Number of projects or clusters deleted concurrently")
+@click.option('--rate', type=click.FloatRange(min=0.1), default=5, show_default=True, help="Maximum DELETE requests per second")
+@click.option('--timeout', default="30m", show_default=True, callback=lambda ctx, param, value: parse_duration(value),
+              help="Maximum time to wait for the clusters to be deleted before their project (30s, 15m, 1h)")
+@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json, a table summary with --selector or --name-regex")
 @click.option('--dry-run', is_flag=True, help="Run without any action")
 @click.option('--force', is_flag=True, help="Force deletion without confirmation")
 @click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
 @click.pass_context
-def project_delete_command(ctx, project_name, output, dry_run, force, profile):
-    """Delete a project by name, with optional dry-run and confirmation."""
+def project_delete_command(ctx, project_name, selector, name_regex, max_concurrent, rate, timeout, output, dry_run, force, profile):
+    """Delete projects by name, selector or name pattern, with optional dry-run and confirmation."""
+    bulk = selector is not None or name_regex is not None
+    if bulk and project_name:
+        raise click.BadOptionUsage("project_name", "--project-name can not be used with --selector or --name-regex")
+
     project_name, _, profile = ctx_update(ctx, project_name, None, profile)
     login_profile(profile)
 
+    if bulk:
+        result = _delete_projects(selector, name_regex, max_concurrent, rate, timeout, dry_run, force)
+
+        if output:
+            print_output(result, output)
+        else:
+            print_table(result, [["kind", "kind"], ["project", "project"], ["name", "name"], ["id", "id"], ["status", "status"]])
+
+        if any(element["status"].startswith(("failed", "skipped")) for element in result):
+            raise SystemExit(1)
+        return
+
     project_id = find_project_id_by_name(project_name)
     project_name = get_project_name(project_name)
 
@@ -378,10 +547,11 @@ def project_get_quotas(ctx, project_name, output, profile):
 # GET PROJECT SNAPSHOTS BY PROJECT NAME
 @project.command('snapshots', help="Get project snapshots")
 @click.option('--project-name', '-p', help="Name of the project", shell_complete=project_completer)
-@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json")
+@click.option('--output', '-o', type=click.Choice(["json", "ndjson", "yaml"]), help="Specify output format, by default is json")
+@click.option('--query', callback=parse_query, help="JMESPath query applied to the result before printing, e.g. \"[*].id\"")
 @click.option('--profile', help="Configuration profile to use", shell_complete=profile_completer)
 @click.pass_context
-def project_get(ctx, project_name, output, profile):
+def project_get(ctx, project_name, output, query, profile):
     """Retrieve snapshots associated with the specified project."""
     project_name, _, profile = ctx_update(ctx, project_name, None, profile)
     login_profile(profile)
@@ -389,15 +559,16 @@ def project_get(ctx, project_name, output, profile):
     project_id = find_project_id_by_name(project_name)
 
     response = do_request("GET", f'projects/{project_id}/snapshots')
-    print_output(response, output)
+    print_output(response, output, query)
 
 # GET PUBLIC IPS BY PROJECT NAME
 @project.command('publicips', help="Get project public ips")
 @click.option('--project-name', '-p', help="Name of the project", shell_complete=project_completer)
-@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json")
+@click.option('--output', '-o', type=click.Choice(["json", "ndjson", "yaml"]), help="Specify output format, by default is json")
+@click.option('--query', callback=parse_query, help="JMESPath query applied to the result before printing, e.g. \"[*].PublicIp\"")
 @click.option('--profile',help="Configuration profile to use")
 @click.pass_context
-def project_get_public_ips(ctx, project_name, output, profile):
+def project_get_public_ips(ctx, project_name, output, query, profile):
     """Retrieve the list of public IPs associated with the specified project."""
     project_name, _, profile = ctx_update(ctx, project_name, None, profile)
     login_profile(profile)
@@ -405,7 +576,7 @@ def project_get_public_ips(ctx, project_name, output, profile):
     project_id = find_project_id_by_name(project_name)
 
     data = do_request("GET", f'projects/{project_id}/public_ips')
-    print_output(data, output)
+    print_output(data, output, query)
 
 
 
@@ -1,15 +1,13 @@
 import click
-from datetime import datetime
-import dateutil.parser
-import human_readable
-import prettytable
+from datetime import datetime, timezone
 import json
 
 from nacl.public import PrivateKey, SealedBox
 from nacl.encoding import Base64Encoder
 from prettytable import TableStyle
 
-from .utils import do_request, print_output, find_project_id_by_name, ctx_update, login_profile, profile_completer, project_completer, JSONClickException
+from .utils import do_request, print_output, find_project_id_by_name, ctx_update, login_profile, profile_completer, project_completer, JSONClickException, \
+                   parse_query, format_relative_times, TableRenderer
 
 # DEIFNE THE USER COMMAND GROUP
 @click.group(help="EIM users related commands.")
@@ -22,11 +20,12 @@ def user(ctx, project_name, profile):
 
 # LIST USERS
 @user.command('list', help="List EIM users")
-@click.option('--output', '-o', type=click.Choice(["json", "yaml"]), help="Specify output format, by default is json")
+@click.option('--output', '-o', type=click.Choice(["json", "ndjson", "yaml"]), help="Specify output format, by default is json")
+@click.option('--query', callback=parse_query, help="JMESPath query applied to the result before printing, e.g. \"[*].UserName\"")
 @click.option('--project-name', '-p', required=False, help="Project Name", shell_complete=project_completer)
 @click.option('--profile', help="Configuration profile to use")
 @click.pass_context
-def user_list(ctx, output, project_name, profile):
+def user_list(ctx, output, query, project_name, profile):
     """List users"""
     project_name, _, profile = ctx_update(ctx, project_name, None, profile)
     login_profile(profile)
@@ -35,19 +34,25 @@ def user_list(ctx, output, project_name, profile):
 
     data = do_request("GET", f'projects/{project_id}/eim_users')
 
+    # a projection can not be rendered as a table
+    if query and not output:
+        output = "json"
+
     if output:
-        print_output(data, output)
+        print_output(data, output, query)
         return
 
     field_names = ["USER", "ACCESS KEY", "STATE", "CREATED", "EXPIRATION DATE"]
-    table = prettytable.PrettyTable()
-    table.field_names = field_names
+    table = TableRenderer(field_names)
 
-    for user in data:
-        access_keys = user.get("AccessKeys", [])
-        access_key = access_keys[0] if access_keys else {}
+    access_keys = [(user.get("AccessKeys") or [{}])[0] for user in data]
 
+    # the dates of all the rows are formatted in one pass, relative to the same time
+    now = datetime.now(timezone.utc)
+    created = format_relative_times([access_key.get("CreationDate") for access_key in access_keys], now)
+    expires = format_relative_times([access_key.get("ExpirationDate") for access_key in access_keys], now)
 
+    for user, access_key, created_at, expires_at in zip(data, access_keys, created, expires):
         state =  access_key.get("State", "N/A")
         if state == 'ACTIVE':
             state = click.style(state, fg='green')
@@ -58,23 +63,11 @@ def user_list(ctx, output, project_name, profile):
         row = [
             user.get("UserName"),
             access_key.get("AccessKeyId", "N/A"),
-            state
+            state,
+            created_at or "N/A",
+            expires_at or "N/A"
         ]
 
-        if "CreationDate" in access_key:
-            created_at = dateutil.parser.parse(access_key.get("CreationDate"))
-            now = datetime.now(tz=created_at.tzinfo)
-            row.append(human_readable.date_time(now - created_at))
-        else:
-            row.append("N/A")
-
-        if "ExpirationDate" in access_key:
-            exp_at = dateutil.parser.parse(access_key.get("ExpirationDate"))
-            now = datetime.now(tz=exp_at.tzinfo)
-            row.append(human_readable.date_time(now - exp_at))
-        else:
-            row.append("N/A")
-
         table.add_row(row)
 
     click.echo(table)
@@ -188,11 +181,7 @@ def user_types(ctx, project_name, output, plain, profile):
         print_output(data, output)
         return
 
-    table = prettytable.PrettyTable()
-    table.field_names = ["USER TYPE", "DESCRIPTION"]
-
-    if plain:
-        table.set_style(TableStyle.PLAIN_COLUMNS)
+    table = TableRenderer(["USER TYPE", "DESCRIPTION"], style=TableStyle.PLAIN_COLUMNS if plain else None)
 
     for entry in data:
         table.add_row([
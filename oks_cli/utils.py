@@ -2,22 +2,23 @@ import click
 import os
 import subprocess
 import logging
-import requests
 from urllib.parse import urljoin, urlencode
 import re
-import yaml
 import json
 import pathlib
 import traceback
 import time
-from datetime import datetime
-import OpenSSL
+from datetime import datetime, timedelta, timezone
 import shutil
-import prettytable
-import dateutil.parser
-import human_readable
 import base64
 import sys
+import atexit
+import copy
+import hashlib
+import contextlib
+import contextvars
+import functools
+import threading
 
 from click.shell_completion import CompletionItem
 
@@ -32,13 +33,205 @@ def get_config_path():
 
 DEFAULT_API_URL = "https://api.{region}.oks.outscale.com/api/v2/"
 
+_session = None
+_session_lock = threading.Lock()
+_index_lock = threading.Lock()
+_request_cache = {}
+_request_cache_lock = threading.Lock()
+_validators = {}
+
+# Returned by conditional GET requests when the resource did not change since the previous one
+NOT_MODIFIED = object()
+
+class ConfigStore:
+    """In-process cache of the profiles file and token files.
+    Each file is read at most once per invocation, writers must call invalidate() for the paths they change.
+    """
+    def __init__(self):
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def _read(self, path, loader):
+        with self._lock:
+            if path not in self._files:
+                if os.path.exists(path):
+                    with open(path, 'r') as file:
+                        self._files[path] = loader(file)
+                else:
+                    self._files[path] = None
+            return self._files[path]
+
+    def profiles(self):
+        """Return the parsed profiles file, or None if it does not exist."""
+        _, PROFILE_FILE = get_config_path()
+        return self._read(PROFILE_FILE, json.load)
+
+    def token(self, profile, token_type):
+        """Return the stored token of the given type for a profile, or None if it does not exist."""
+        CONFIG_FOLDER, _ = get_config_path()
+        return self._read(f"{CONFIG_FOLDER}/{profile}.{token_type}", lambda file: file.read())
+
+    def invalidate(self, *paths):
+        """Forget cached content for the given paths, or for every file if none given."""
+        with self._lock:
+            if not paths:
+                self._files.clear()
+            for path in paths:
+                self._files.pop(path, None)
+
+config_store = ConfigStore()
+
+# settings describing the logged in profile, scoped to the current thread inside profile_context
+PROFILE_ENV = ("OKS_PROFILE", "OKS_REGION", "OKS_ENDPOINT", "OKS_USERNAME", "OKS_PASSWORD",
+               "OKS_ACCESS_KEY", "OKS_SECRET_KEY", "OKS_OTP_CODE", "OKS_RATE_LIMIT")
+_profile_env = contextvars.ContextVar("oks_profile_env", default=None)
+# profile settings written to the process environment by a login rather than exported by the user
+_logged_in_env = set()
+
+def getenv(name, default=None):
+    """Return an OKS_* setting, profile settings come from the current profile_context if any.
+    Inside a profile_context, a setting the profile does not set falls back to the one exported by the user.
+    """
+    env = _profile_env.get()
+    if env is not None and name in PROFILE_ENV:
+        if name in env:
+            return env[name]
+        if name in _logged_in_env:
+            return default
+    return os.environ.get(name, default)
+
+def setenv(name, value):
+    """Set a profile setting in the current profile_context, or in the process environment outside of it."""
+    env = _profile_env.get()
+    if env is not None:
+        env[name] = value
+    else:
+        _logged_in_env.add(name)
+        os.environ[name] = value
+
+@contextlib.contextmanager
+def profile_context(name):
+    """Log in a profile for the calling thread only, without touching os.environ,
+    so that several profiles can be queried concurrently.
+    """
+    token = _profile_env.set({})
+    try:
+        login_profile(name)
+        yield
+    finally:
+        _profile_env.reset(token)
+
+def parse_profile_names(ctx, param, value):
+    """Click callback splitting a comma-separated list of profiles."""
+    if value is None:
+        return None
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if not names:
+        raise click.BadParameter("expected a comma-separated list of profiles")
+    return names
+
+def resolve_profile_names(profiles, all_profiles):
+    """Return the profiles selected by --profiles or --all-profiles, None if neither is set."""
+    if all_profiles:
+        profiles = list(profile_list())
+        if not profiles:
+            raise click.ClickException("No profiles were found. Please add a profile to proceed")
+    return profiles
+
+def list_from_profiles(profiles, func):
+    """Call func() in the context of each profile, concurrently (OKS_PROFILES_PARALLEL, default 8),
+    and merge the returned lists, tagging each object with its "profile" and "region".
+    Profiles that failed are reported on stderr, an error is raised only if all of them failed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def run(name):
+        try:
+            with profile_context(name):
+                items = func()
+                region = getenv("OKS_REGION")
+        except click.ClickException as err:
+            return [], err
+
+        for item in items:
+            item["profile"] = name
+            item.setdefault("region", region)
+        return items, None
+
+    workers = max(1, min(len(profiles), int(os.getenv("OKS_PROFILES_PARALLEL", 8))))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run, profiles))
+
+    merged = []
+    failed = 0
+    for name, (items, error) in zip(profiles, results):
+        if error is not None:
+            failed += 1
+            click.echo(f"Profile {click.style(name, bold=True)}: {error.format_message()}", err=True)
+        merged.extend(items)
+
+    if failed == len(profiles):
+        raise click.ClickException("Could not list from any of the profiles")
+
+    return merged
+
 class JSONClickException(click.ClickException):
+    def __init__(self, message, retry_after=None, status_code=None):
+        super().__init__(message)
+        # seconds the API asked to wait before sending a new request, if any
+        self.retry_after = retry_after
+        self.status_code = status_code
+
     def show(self, file=None):
         click.echo(self.message, file=file)
 
 class _LiteralStr(str): pass
 
-yaml.add_representer(_LiteralStr, lambda dumper, data: dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|'))
+def _literal_str_representer(dumper, data):
+    # the LibYAML emitter only accepts exact str scalars
+    return dumper.represent_scalar('tag:yaml.org,2002:str', str(data), style='|')
+
+def _str_representer(dumper, data):
+    # multiline strings are rendered as literal blocks without copying the payload into _LiteralStr first
+    return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|' if '\n' in data else None)
+
+_yaml_dumpers = {}
+
+def get_yaml_dumper(libyaml=True):
+    """Return the safe YAML dumper, backed by LibYAML when available, rendering multiline strings as literal blocks."""
+    if libyaml not in _yaml_dumpers:
+        import yaml
+
+        base = getattr(yaml, "CSafeDumper", yaml.SafeDumper) if libyaml else yaml.SafeDumper
+
+        class Dumper(base):
+            pass
+
+        Dumper.add_representer(_LiteralStr, _literal_str_representer)
+        Dumper.add_representer(str, _str_representer)
+        _yaml_dumpers[libyaml] = Dumper
+
+    return _yaml_dumpers[libyaml]
+
+def yaml_load(stream):
+    """Safely parse a YAML string or file, with the LibYAML loader when available."""
+    import yaml
+
+    return yaml.load(stream, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+def yaml_load_all(stream):
+    """Safely parse all the documents of a YAML string or file, with the LibYAML loader when available."""
+    import yaml
+
+    return list(yaml.load_all(stream, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)))
+
+def yaml_dump(data, multi=False, **kwargs):
+    """Serialize data (or a list of documents with multi=True) to YAML, keeping the keys order by default."""
+    import yaml
+
+    kwargs.setdefault("sort_keys", False)
+    dump = yaml.dump_all if multi else yaml.dump
+    return dump(data, Dumper=get_yaml_dumper(), **kwargs)
 
 def find_response_object(data):
     """Extract the main object from the API response payload."""
@@ -92,58 +285,364 @@ def find_response_object(data):
 
     raise click.ClickException("The API response format is incorrect.")
 
-def do_request(method, path, *args, **kwargs):
-    """Perform an HTTP request to the API with authentication and error handling."""
-    api_url = os.environ.get("OKS_ENDPOINT")
+def do_request(method, path, *args, use_cache=True, conditional=False, **kwargs):
+    """Perform an HTTP request to the API with authentication and error handling.
+    GET responses are memoized for the rest of the invocation unless use_cache is False, any other method clears them.
+    Conditional GET requests bypass this memo, send the ETag/Last-Modified of the previous conditional request of the
+    same URL and return NOT_MODIFIED on a 304, or when the payload hash did not change on servers without validators.
+    """
+    import requests
+
+    api_url = getenv("OKS_ENDPOINT")
 
     logging.debug("method: %s path: %s args: %s kwargs: %s", method, path, args, kwargs)
 
     url = urljoin(api_url, path)
 
+    cache_key = None
+    validators = None
+    if method.upper() == "GET":
+        cache_key = (getenv("OKS_PROFILE"), url, urlencode(sorted(kwargs.get('params', {}).items())))
+        with _request_cache_lock:
+            if use_cache and not conditional and cache_key in _request_cache:
+                logging.info("%s request %s served from invocation cache", method, url)
+                return copy.deepcopy(_request_cache[cache_key])
+            if conditional:
+                validators = _validators.get(cache_key)
+    else:
+        clear_request_cache()
+
     headers = build_headers()
 
     kwargs.setdefault('headers', {}).update(headers)
 
+    if validators:
+        if validators.get("etag"):
+            kwargs['headers']['If-None-Match'] = validators["etag"]
+        if validators.get("last_modified"):
+            kwargs['headers']['If-Modified-Since'] = validators["last_modified"]
+
     logging.info("%s request %s?%s", method, url,
                  urlencode(kwargs.get('params', {})))
 
-    retries = int(os.getenv('OKS_RETRIES', 3)) if method.upper() == "GET" else 1
-    backoff = 1
+    retries = int(os.getenv('OKS_RETRIES', 3))
+    breaker = get_circuit_breaker(api_url)
+    limiter = get_rate_limiter(api_url)
+    budget = get_retry_budget()
 
     for attempt in range(1, retries + 1):
+        remaining = breaker.remaining()
+        if remaining:
+            errors = {"Error": f"The endpoint {api_url} is unavailable after {breaker.failures} consecutive failures, "
+                               f"not retrying for {remaining:.0f} sec"}
+            raise JSONClickException(json.dumps(errors), remaining, 503)
+
+        if limiter:
+            limiter.acquire()
+
         try:
-            data = requests.request(method, url, *args, **kwargs)
+            data = get_session().request(method, url, *args, **kwargs)
             logging.info("response %s %s %s...", data.status_code,
                         data.reason, data.text[:50])
+            if data.status_code < 500:
+                breaker.succeeded()
+            if data.status_code < 400:
+                budget.earn()
+            if validators and data.status_code == 304:
+                save_tokens(data.headers)
+                return NOT_MODIFIED
             data.raise_for_status()
             save_tokens(data.headers)
             obj = find_response_object(data)
+            if cache_key:
+                with _request_cache_lock:
+                    _request_cache[cache_key] = copy.deepcopy(obj)
+                if conditional:
+                    digest = hashlib.sha256(json.dumps(obj, sort_keys=True).encode('utf-8')).hexdigest()
+                    with _request_cache_lock:
+                        _validators[cache_key] = {
+                            "etag": data.headers.get("ETag"),
+                            "last_modified": data.headers.get("Last-Modified"),
+                            "digest": digest
+                        }
+                    if validators and validators.get("digest") == digest:
+                        logging.info("%s request %s payload unchanged", method, url)
+                        return NOT_MODIFIED
+            else:
+                forget_index_ids(path)
+                update_completion_cache(method, path, obj)
             return obj
         except requests.exceptions.HTTPError as err:
+            if err.response is not None and err.response.status_code >= 500:
+                breaker.failed()
+            if err.response is not None and err.response.status_code == 404:
+                forget_index_ids(path)
+
+                # an ID served by the index may belong to a resource deleted and created again with the same name
+                values = path.split('?')[0].strip('/').split('/')
+                for key in ("params", "json"):
+                    if isinstance(kwargs.get(key), dict):
+                        values += [value for value in kwargs[key].values() if isinstance(value, str)]
+                fresh = refresh_index_ids(values)
+                if fresh:
+                    logging.info("stale index IDs %s, sending the request again", fresh)
+                    for stale, current in fresh.items():
+                        path = "/".join(current if segment == stale else segment for segment in path.split('/'))
+                    for key in ("params", "json"):
+                        if isinstance(kwargs.get(key), dict):
+                            kwargs[key] = {name: fresh.get(value, value) if isinstance(value, str) else value
+                                           for name, value in kwargs[key].items()}
+                    for header in ("If-None-Match", "If-Modified-Since"):
+                        kwargs['headers'].pop(header, None)
+                    return do_request(method, path, *args, use_cache=use_cache, conditional=conditional, **kwargs)
+
             otp_response = handle_otp_error(err, method, path, args, kwargs)
             if otp_response is not None:
                 return otp_response
 
-            if os.environ.get("OKS_OTP_CODE") is not None:
+            if getenv("OKS_OTP_CODE") is not None:
                 raise JSONClickException(err.response.text)
 
             jwt_response = handle_jwt_error(err, method, path, args, kwargs)
             if jwt_response is not None:
                 return jwt_response
 
-            if attempt < retries and method.upper() == "GET":
-                logging.info("GET failed (attempt %s/%s), retrying in %s sec...", attempt, retries, backoff)
-                time.sleep(backoff)
-                backoff *= 2  # exponential backoff
-                continue
+            retry_after = parse_retry_after(err.response.headers.get("Retry-After"))
+
+            if attempt < retries and is_retryable(method, err.response.status_code):
+                delay = get_retry_delay(attempt, retry_after)
+                if delay is not None and budget.take():
+                    logging.info("%s failed with %s (attempt %s/%s), retrying in %.1f sec...",
+                                 method, err.response.status_code, attempt, retries, delay)
+                    time.sleep(delay)
+                    continue
 
             logging.debug(traceback.format_stack(limit = 4))
-            raise JSONClickException(err.response.text)
+            raise JSONClickException(err.response.text, retry_after, err.response.status_code)
 
         except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+            breaker.failed()
+
+            if attempt < retries and method.upper() in IDEMPOTENT_METHODS and budget.take():
+                delay = get_retry_delay(attempt)
+                logging.info("%s failed with %s (attempt %s/%s), retrying in %.1f sec...",
+                             method, err.__class__.__name__, attempt, retries, delay)
+                time.sleep(delay)
+                continue
+
             errors = {"Error": f"Failed to reach the endpoint {url} ({err.__class__.__name__})"}
             raise JSONClickException(json.dumps(errors))
 
+def parse_retry_after(value):
+    """Parse a Retry-After header, in seconds or as an HTTP date, into a number of seconds."""
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Rate limiter shared between threads, allowing rate acquisitions per second with bursts of up to burst.
+    clock and sleep default to the functions of the time module as they were at import time.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = burst
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Wait until a token is available and take it."""
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+
+            self.sleep(delay)
+
+class CircuitBreaker:
+    """Fail fast once an endpoint failed threshold times in a row, letting a single request probe it every cooldown seconds."""
+
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def remaining(self):
+        """Return the seconds to wait before the endpoint can be tried again, 0 if a request can be sent now."""
+        with self.lock:
+            if self.opened_at is None:
+                return 0
+
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining <= 0:
+                # half-open: this request probes the endpoint, the others keep failing fast until it succeeds
+                self.opened_at = time.monotonic()
+                return 0
+            return remaining
+
+    def succeeded(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def failed(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+class RetryBudget:
+    """Retries shared by all the requests of the invocation, so that concurrent callers can not multiply them.
+    Starts with budget retries, each successful request earns ratio retry back, up to budget.
+    """
+
+    def __init__(self, budget, ratio=0.1):
+        self.budget = budget
+        self.ratio = ratio
+        self.tokens = budget
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Take a retry from the budget, False while it is spent."""
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def earn(self):
+        """Give back a fraction of a retry for a successful request."""
+        with self.lock:
+            self.tokens = min(self.budget, self.tokens + self.ratio)
+
+_guards_lock = threading.Lock()
+_rate_limiters = {}
+_circuit_breakers = {}
+_retry_budget = None
+
+# methods which can be sent again after a server error or a lost connection
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+def get_rate_limiter(endpoint):
+    """Return the token bucket of an endpoint, allowing OKS_RATE_LIMIT requests per second (default 10, 0 disables it)
+    with bursts of OKS_RATE_BURST. The rate can also be set per profile with its rate_limit.
+    """
+    rate = float(getenv("OKS_RATE_LIMIT") or 10)
+    if rate <= 0:
+        return None
+
+    burst = int(os.getenv("OKS_RATE_BURST", max(int(rate), 1)))
+    with _guards_lock:
+        if (endpoint, rate, burst) not in _rate_limiters:
+            _rate_limiters[(endpoint, rate, burst)] = TokenBucket(rate, burst)
+        return _rate_limiters[(endpoint, rate, burst)]
+
+def get_circuit_breaker(endpoint):
+    """Return the circuit breaker of an endpoint, opened after OKS_CIRCUIT_THRESHOLD consecutive failures (default 5)
+    for OKS_CIRCUIT_COOLDOWN seconds (default 30).
+    """
+    with _guards_lock:
+        if endpoint not in _circuit_breakers:
+            _circuit_breakers[endpoint] = CircuitBreaker(int(os.getenv("OKS_CIRCUIT_THRESHOLD", 5)),
+                                                         float(os.getenv("OKS_CIRCUIT_COOLDOWN", 30)))
+        return _circuit_breakers[endpoint]
+
+def get_retry_budget():
+    """Return the retry budget of the invocation: up to OKS_RETRY_BUDGET retries (default 10),
+    each successful request earning OKS_RETRY_RATIO retry back (default 0.1).
+    """
+    global _retry_budget
+
+    with _guards_lock:
+        if _retry_budget is None:
+            _retry_budget = RetryBudget(int(os.getenv("OKS_RETRY_BUDGET", 10)), float(os.getenv("OKS_RETRY_RATIO", 0.1)))
+        return _retry_budget
+
+def reset_request_guards():
+    """Forget the rate limiters, circuit breakers and retry budget."""
+    global _retry_budget
+
+    with _guards_lock:
+        _rate_limiters.clear()
+        _circuit_breakers.clear()
+        _retry_budget = None
+
+def is_retryable(method, status_code):
+    """Tell if a request failing with this status can be sent again: 429 and 503 are refused before being processed,
+    other server errors only for idempotent methods.
+    """
+    if status_code in (429, 503):
+        return True
+    return method.upper() in IDEMPOTENT_METHODS and status_code in (500, 502, 504)
+
+def get_retry_delay(attempt, retry_after=None):
+    """Return the seconds to wait before a retry, None if the API asked to wait longer than OKS_RETRY_MAX_DELAY (default 30).
+    Without Retry-After the delay is drawn in [0, OKS_RETRY_BACKOFF * 2^(attempt-1)] so that concurrent clients spread out.
+    """
+    import random
+
+    base = float(os.getenv("OKS_RETRY_BACKOFF", 1))
+    max_delay = float(os.getenv("OKS_RETRY_MAX_DELAY", 30))
+
+    if retry_after is not None:
+        if retry_after > max_delay:
+            return None
+        return retry_after + random.uniform(0, base)
+
+    return random.uniform(0, min(base * 2 ** (attempt - 1), max_delay))
+
+def clear_request_cache():
+    """Forget all GET responses memoized by do_request and the validators of conditional requests."""
+    with _request_cache_lock:
+        _request_cache.clear()
+        _validators.clear()
+
+def get_session():
+    """Return the process-wide HTTP session, keeping connections to the API alive between requests.
+    Pool sizing can be tuned with OKS_POOL_CONNECTIONS (number of hosts kept) and OKS_POOL_MAXSIZE (connections per host).
+    """
+    global _session
+    import requests
+
+    with _session_lock:
+        if _session is None:
+            pool_connections = int(os.getenv('OKS_POOL_CONNECTIONS', 4))
+            pool_maxsize = int(os.getenv('OKS_POOL_MAXSIZE', 10))
+
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            logging.debug("created HTTP session pool_connections: %s pool_maxsize: %s", pool_connections, pool_maxsize)
+
+            atexit.register(session.close)
+            _session = session
+
+    return _session
+
 def build_headers():
     """Build HTTP headers for API requests based on environment authentication settings."""
     headers = {
@@ -151,8 +650,8 @@ def build_headers():
         "Accept": "application/json"
     }
 
-    if os.getenv("OKS_OTP_CODE"):
-        headers["X-OTP-Code"] =  os.getenv("OKS_OTP_CODE")
+    if getenv("OKS_OTP_CODE"):
+        headers["X-OTP-Code"] =  getenv("OKS_OTP_CODE")
 
     if os.getenv("OKS_DEV_HEADER"):
         for header in os.getenv("OKS_DEV_HEADER").split(','):
@@ -163,12 +662,12 @@ def build_headers():
     if is_jwt_enabled() and is_tokens_valid():
         headers["AccessToken"] = get_token('access_token')
         headers["RefreshToken"] = get_token('refresh_token')
-    elif os.getenv("OKS_ACCESS_KEY") and os.getenv("OKS_ACCESS_KEY"):
-        headers["AccessKey"] =  os.getenv("OKS_ACCESS_KEY")
-        headers["SecretKey"] =  os.getenv("OKS_SECRET_KEY")
-    elif os.getenv("OKS_USERNAME") and os.getenv("OKS_PASSWORD"):
-        username = os.getenv("OKS_USERNAME")
-        password = os.getenv("OKS_PASSWORD")
+    elif getenv("OKS_ACCESS_KEY") and getenv("OKS_ACCESS_KEY"):
+        headers["AccessKey"] =  getenv("OKS_ACCESS_KEY")
+        headers["SecretKey"] =  getenv("OKS_SECRET_KEY")
+    elif getenv("OKS_USERNAME") and getenv("OKS_PASSWORD"):
+        username = getenv("OKS_USERNAME")
+        password = getenv("OKS_PASSWORD")
         user_pass = f"{username}:{password}"
         user_pass_bytes = user_pass.encode('utf-8')
         encoded_user_pass = base64.b64encode(user_pass_bytes).decode('utf-8')
@@ -179,47 +678,225 @@ def build_headers():
 
     return headers
 
-def _convert_multiline(obj):
-    """Recursively convert multiline strings"""
-    if isinstance(obj, dict):
-        return {k: _convert_multiline(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [_convert_multiline(i) for i in obj]
-    if isinstance(obj, str) and '\n' in obj:
-        return _LiteralStr(obj)
-    return obj
-
-def print_output(data, output_fromat):
-    """Print data in the specified format: JSON, YAML, or silent."""
+def print_output(data, output_fromat, query=None):
+    """Print data in the specified format: JSON, NDJSON, YAML, or silent.
+    query: compiled --query projection applied to the whole result before serializing, NDJSON then streams its items
+    """
+    if query:
+        data = query(data)
+
+    if output_fromat == "ndjson":
+        print_ndjson(data)
+        return
+
     output_data = json.dumps(data, indent=4)
 
     if output_fromat == "yaml":
-        output_data = yaml.dump(_convert_multiline(data), sort_keys=False)
+        output_data = yaml_dump(data)
 
     elif output_fromat == "silent":
         return
 
     click.echo(output_data)
 
+def print_ndjson(data):
+    """Print a list as newline delimited JSON, one compact object per line written as the list is iterated."""
+    for item in data if isinstance(data, list) else [data]:
+        click.echo(json.dumps(item, separators=(",", ":")))
+
+def print_event(event_type, obj, query=None):
+    """Print a watch change event (ADDED, MODIFIED or DELETED) as one NDJSON line."""
+    if query:
+        obj = query(obj)
+    click.echo(json.dumps({"type": event_type, "object": obj}, separators=(",", ":")))
+
+def compile_query(expression):
+    """Compile a JMESPath --query expression into a function applied to the API response."""
+    import jmespath
+
+    try:
+        compiled = jmespath.compile(expression)
+    except jmespath.exceptions.JMESPathError as err:
+        raise click.BadParameter(f"invalid query {expression!r}: {err}")
+
+    def query(data):
+        try:
+            return compiled.search(data)
+        except jmespath.exceptions.JMESPathError as err:
+            raise click.ClickException(f"query {expression!r} failed: {err}")
+
+    return query
+
+def parse_query(ctx, param, value):
+    """Click callback compiling a --query option once, None when not set."""
+    if value is None:
+        return None
+    return compile_query(value)
+
+_ansi_re = re.compile(r"\x1b\[[0-9;]*m")
+
+def _text_width(text):
+    """Width of a cell on the terminal, ignoring click.style colors."""
+    if "\x1b" in text:
+        text = _ansi_re.sub("", text)
+    if text.isascii():
+        return len(text)
+
+    import wcwidth
+    return wcwidth.width(text)
+
+class TableRenderer:
+    """Render rows like prettytable does with the default, PLAIN_COLUMNS or MSWORD_FRIENDLY style,
+    without building a PrettyTable. Column widths are updated as rows are added and kept, so that rows
+    rendered later (watch updates) line up with the table already printed.
+    """
+    # style name: (border, horizontal rules around the header and table, left padding, right padding)
+    _styles = {
+        "DEFAULT": (True, True, 1, 1),
+        "MSWORD_FRIENDLY": (True, False, 1, 1),
+        "PLAIN_COLUMNS": (False, False, 0, 8),
+    }
+
+    @classmethod
+    def supports(cls, style):
+        """Tell if the style is one the renderer reproduces."""
+        return (getattr(style, "name", style) or "DEFAULT") in cls._styles
+
+    def __init__(self, field_names, style=None, align="c", min_width=None):
+        """style: a prettytable.TableStyle or its name, align: l, r or c, min_width: {field name: width}"""
+        style_name = getattr(style, "name", style) or "DEFAULT"
+        if style_name not in self._styles:
+            raise ValueError(f"Unsupported table style: {style_name}")
+
+        self.field_names = list(field_names)
+        self.border, self.frame, self.lpad, self.rpad = self._styles[style_name]
+        self.align = align
+        self.min_width = [(min_width or {}).get(name, 0) for name in self.field_names]
+        self.rows = []
+        self._header = self._prepare(self.field_names)
+        self._widths = list(self._header[1])
+
+    @property
+    def widths(self):
+        # like prettytable, minimum widths only apply once the table has rows
+        if not self.rows:
+            return self._widths
+        return [max(width, minimum) for width, minimum in zip(self._widths, self.min_width)]
+
+    def add_row(self, row):
+        prepared = self._prepare(row)
+        widths = self._widths
+        for index, width in enumerate(prepared[1]):
+            if width > widths[index]:
+                widths[index] = width
+        self.rows.append(prepared)
+
+    @staticmethod
+    def _prepare(row):
+        """Return the cells as strings, their widths and whether one of them spans several lines."""
+        cells = []
+        cell_widths = []
+        multiline = False
+        for value in row:
+            cell = value if isinstance(value, str) else str(value)
+            if "\t" in cell:
+                cell = cell.expandtabs()
+            if "\n" in cell:
+                multiline = True
+                cell_widths.append(max(_text_width(line) for line in cell.split("\n")))
+            else:
+                cell_widths.append(_text_width(cell))
+            cells.append(cell)
+        return cells, cell_widths, multiline
+
+    def _hrule(self, widths):
+        return "+" + "+".join("-" * (width + self.lpad + self.rpad) for width in widths) + "+"
+
+    def _justify(self, text, width, text_width=None):
+        pad = width - (_text_width(text) if text_width is None else text_width)
+        if pad <= 0:
+            return text
+        if self.align == "l":
+            return text + " " * pad
+        if self.align == "r":
+            return " " * pad + text
+        # same split as str.center
+        left = pad // 2 + (pad & width & 1)
+        return " " * left + text + " " * (pad - left)
+
+    def _lines(self, prepared, widths):
+        cells, cell_widths, multiline = prepared
+        left, right = " " * self.lpad, " " * self.rpad
+
+        if not multiline:
+            parts = [left + self._justify(cell, width, cell_width) + right
+                     for cell, cell_width, width in zip(cells, cell_widths, widths)]
+            yield "|" + "|".join(parts) + "|" if self.border else "".join(parts)
+            return
+
+        height = max(cell.count("\n") for cell in cells) + 1
+        columns = [cell.split("\n") for cell in cells]
+        for y in range(height):
+            parts = [left + self._justify(lines[y] if y < len(lines) else "", width) + right
+                     for lines, width in zip(columns, widths)]
+            if self.border:
+                yield "|" + "|".join(parts) + "|"
+            else:
+                yield "".join(parts)
+
+    def iter_lines(self):
+        """Yield the lines of the whole table, header included."""
+        if not self.rows and not self.border:
+            return
+
+        widths = self.widths
+        hrule = self._hrule(widths) if self.border and self.frame else None
+
+        if hrule:
+            yield hrule
+        yield from self._lines(self._header, widths)
+        if hrule:
+            yield hrule
+        for prepared in self.rows:
+            yield from self._lines(prepared, widths)
+        if hrule:
+            yield hrule
+
+    def render_row(self, row):
+        """Render a single row, without header, with the column widths of the table."""
+        prepared = self._prepare(row)
+        # an empty borderless table is not printed at all, there are no widths to line up with
+        widths = self.widths if self.rows or self.border else [0] * len(row)
+        widths = [max(width, cell_width) for width, cell_width in zip(widths, prepared[1])]
+        lines = list(self._lines(prepared, widths))
+        if self.border and self.frame:
+            hrule = self._hrule(widths)
+            lines = [hrule, *lines, hrule]
+        return "\n".join(lines)
+
+    def __str__(self):
+        return "\n".join(self.iter_lines())
+
 def print_table(data, table_fields, align="l", style=None):
     """Print API returned data as table
     data: list of dict containing data
     table_fields: List of 2 elements list. First element is the table field name, second element is the corresponding dict key in data
     align: Columns alignment (l,r,c)
-    style: Table format other style
+    style: Table format other style (prettytable.TableStyle or its name)
     """
-    table = prettytable.PrettyTable()
-    table.align = align
-    if style and isinstance(style, prettytable.TableStyle):
-        table.set_style(style)
-    fields = []
-    values = []
+    values = [d[1] for d in table_fields]
 
-    for d in table_fields:
-        fields.append(d[0])
-        values.append(d[1])
+    if TableRenderer.supports(style):
+        table = TableRenderer([d[0] for d in table_fields], style=style, align=align)
+    else:
+        # other prettytable styles are left to prettytable, anything else is ignored
+        import prettytable
 
-    table.field_names = fields
+        table = prettytable.PrettyTable()
+        table.align = align
+        if isinstance(style, prettytable.TableStyle):
+            table.set_style(style)
+        table.field_names = [d[0] for d in table_fields]
 
     for d in data:
         table.add_row([d[v] if v in d else "" for v in values])
@@ -231,7 +908,7 @@ def handle_otp_error(err, method, path, args, kwargs):
         response_body = json.loads(err.response.text)
         if response_body.get("otp_required"):
             otp_code = click.prompt('Enter your OTP code', type=int)
-            os.environ["OKS_OTP_CODE"] = str(otp_code)
+            setenv("OKS_OTP_CODE", str(otp_code))
 
             logging.info("Retrying request with user-provided OTP...")
             return do_request(method, path, *args, **kwargs)
@@ -281,14 +958,21 @@ def find_project_id_by_name(project_name):
         if not project_id:
             raise click.BadParameter("--project-name must be specified, or a default project must be set")
     else:
-        data = do_request("GET", 'projects', params={"name": project_name})
-        if len(data) != 1:
-            errors = {"Error": f"{len(data)} projects found by name: {project_name}"}
-            raise JSONClickException(json.dumps(errors))
-        project_id = data.pop()['id']
+        project_id = get_index_id("projects", project_name) or lookup_project_id(project_name)
 
     return project_id
 
+def lookup_project_id(project_name):
+    """Retrieve the project ID by name from the API and remember it in the index."""
+    data = do_request("GET", 'projects', params={"name": project_name})
+    if len(data) != 1:
+        errors = {"Error": f"{len(data)} projects found by name: {project_name}"}
+        raise JSONClickException(json.dumps(errors))
+    project_id = data.pop()['id']
+
+    set_index_id("projects", project_name, project_id)
+    return project_id
+
 def find_cluster_id_by_name(project_id, cluster_name):
     """Retrieve the cluster ID by name within a given project, or use the default cluster if none is provided."""
     if not cluster_name:
@@ -302,24 +986,172 @@ def find_cluster_id_by_name(project_id, cluster_name):
         if cluster['project_id'] != project_id:
             raise JSONClickException(json.dumps(errors))
     else:
-        data = do_request("GET", 'clusters', params={"project_id": project_id, "name": cluster_name})
-        if len(data) != 1:
-            errors = {"Error": f"{len(data)} clusters found by name: {cluster_name}"}
-            raise JSONClickException(json.dumps(errors))
-        cluster_id = data.pop()['id']
+        cluster_id = get_index_id("clusters", f"{project_id}/{cluster_name}") or lookup_cluster_id(project_id, cluster_name)
 
     return cluster_id
 
+def lookup_cluster_id(project_id, cluster_name):
+    """Retrieve the cluster ID by name within a given project from the API and remember it in the index."""
+    data = do_request("GET", 'clusters', params={"project_id": project_id, "name": cluster_name})
+    if len(data) != 1:
+        errors = {"Error": f"{len(data)} clusters found by name: {cluster_name}"}
+        raise JSONClickException(json.dumps(errors))
+    cluster_id = data.pop()['id']
+
+    set_index_id("clusters", f"{project_id}/{cluster_name}", cluster_id)
+    return cluster_id
+
+def get_index_path():
+    """Return path to the name to ID index of the current profile, or None if no profile is set."""
+    if not getenv("OKS_PROFILE"):
+        return
+
+    CONFIG_FOLDER, _ = get_config_path()
+    return f"{CONFIG_FOLDER}/cache/{getenv('OKS_PROFILE')}.index"
+
+def load_index():
+    """Load the name to ID index of the current profile, empty if missing or unreadable."""
+    INDEX_PATH = get_index_path()
+
+    if INDEX_PATH and os.path.exists(INDEX_PATH):
+        try:
+            with open(INDEX_PATH, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            logging.info("ignoring unreadable index %s", INDEX_PATH)
+
+    return {"projects": {}, "clusters": {}}
+
+def save_index(index):
+    """Atomically write the name to ID index of the current profile."""
+    INDEX_PATH = get_index_path()
+
+    if not INDEX_PATH:
+        return
+
+    os.makedirs(os.path.dirname(INDEX_PATH), exist_ok=True)
+
+    with _index_lock:
+        tmp_path = f"{INDEX_PATH}.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, 'w') as file:
+            json.dump(index, file)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, INDEX_PATH)
+
+# IDs served by the index during the invocation, looked up again by name if the API does not know them anymore
+_index_hits = {}
+
+def get_index_id(kind, key):
+    """Return the cached ID for a project name or a 'project_id/cluster_name' key, None if unknown or expired."""
+    entry = load_index().get(kind, {}).get(key)
+    ttl = int(os.getenv('OKS_INDEX_TTL', 300))
+
+    if entry and time.time() - entry.get("saved_at", 0) < ttl:
+        logging.info("index hit %s %s -> %s", kind, key, entry["id"])
+        _index_hits[entry["id"]] = (kind, key)
+        return entry["id"]
+
+def refresh_index_ids(values):
+    """Look up again by name the IDs among values which were served by the index, after the API answered 404.
+    Each ID is looked up once. Returns {stale ID: current ID} for the names now resolving to another ID.
+    """
+    fresh = {}
+
+    for value in values:
+        if value not in _index_hits:
+            continue
+
+        kind, key = _index_hits.pop(value)
+        try:
+            if kind == "projects":
+                current = lookup_project_id(key)
+            else:
+                project_id, _, cluster_name = key.partition('/')
+                current = lookup_cluster_id(project_id, cluster_name)
+        except click.ClickException:
+            logging.info("index entry %s %s not found anymore", kind, key)
+            continue
+
+        if current != value:
+            fresh[value] = current
+
+    return fresh
+
+def set_index_id(kind, key, value):
+    """Remember the ID resolved for a project name or a 'project_id/cluster_name' key."""
+    if not get_index_path():
+        return
+
+    index = load_index()
+    index.setdefault(kind, {})[key] = {"id": value, "saved_at": time.time()}
+    save_index(index)
+
+def get_cached_project_names():
+    """Return the project ID to name map of the index, None if missing or older than OKS_INDEX_TTL seconds."""
+    entries = load_index().get("project_names", {})
+    ttl = int(os.getenv('OKS_INDEX_TTL', 300))
+    now = time.time()
+
+    if not entries or any(now - entry.get("saved_at", 0) >= ttl for entry in entries.values()):
+        return None
+
+    return {project_id: entry["name"] for project_id, entry in entries.items()}
+
+def save_project_names(projects):
+    """Remember the ID to name map of the listed projects, along with their name to ID entries."""
+    names = {project["id"]: project.get("name") for project in projects}
+
+    if get_index_path():
+        index = load_index()
+        now = time.time()
+        index["project_names"] = {project_id: {"id": project_id, "name": name, "saved_at": now}
+                                  for project_id, name in names.items()}
+        for project_id, name in names.items():
+            index.setdefault("projects", {})[name] = {"id": project_id, "saved_at": now}
+        save_index(index)
+
+    return names
+
+def get_project_names(project_ids=()):
+    """Return a project ID to name map, listing projects only when the cached one is stale or misses one of project_ids."""
+    names = get_cached_project_names()
+
+    if names is None or any(project_id not in names for project_id in project_ids):
+        names = save_project_names(do_request("GET", "projects"))
+
+    return names
+
+def forget_index_ids(path):
+    """Drop index entries referring to any ID found in the API path, along with the clusters of a dropped project."""
+    INDEX_PATH = get_index_path()
+
+    if not INDEX_PATH or not os.path.exists(INDEX_PATH):
+        return
+
+    segments = set(path.split('?')[0].strip('/').split('/'))
+    index = load_index()
+    changed = False
+
+    for kind, entries in index.items():
+        for key, entry in list(entries.items()):
+            if entry.get("id") in segments or (kind == "clusters" and key.split('/')[0] in segments):
+                logging.info("dropping index entry %s %s", kind, key)
+                del entries[key]
+                changed = True
+
+    if changed:
+        save_index(index)
+
 def get_project_id():
     """Return the default project ID from the profile configuration file, if available."""
     project_id = None
 
-    if not os.getenv("OKS_PROFILE"):
+    if not getenv("OKS_PROFILE"):
         return
     
     CONFIG_FOLDER, _ = get_config_path()
 
-    PROJECT_ID_FILE = f"{CONFIG_FOLDER}/{os.getenv('OKS_PROFILE')}.project_id"
+    PROJECT_ID_FILE = f"{CONFIG_FOLDER}/{getenv('OKS_PROFILE')}.project_id"
 
     if os.path.exists(PROJECT_ID_FILE):
         with open(PROJECT_ID_FILE, 'r') as file:
@@ -331,12 +1163,12 @@ def get_cluster_id():
     """Return the default cluster ID from the profile configuration file, if available."""
     cluster_id = None
 
-    if not os.getenv("OKS_PROFILE"):
+    if not getenv("OKS_PROFILE"):
         return
     
     CONFIG_FOLDER, _ = get_config_path()
 
-    CLUSTER_ID_FILE = f"{CONFIG_FOLDER}/{os.getenv('OKS_PROFILE')}.cluster_id"
+    CLUSTER_ID_FILE = f"{CONFIG_FOLDER}/{getenv('OKS_PROFILE')}.cluster_id"
 
     if os.path.exists(CLUSTER_ID_FILE):
         with open(CLUSTER_ID_FILE, 'r') as file:
@@ -351,10 +1183,10 @@ def set_cluster_id(cluster_id):
     if not os.path.exists(CONFIG_FOLDER):
         os.makedirs(CONFIG_FOLDER)
 
-    if not os.getenv("OKS_PROFILE"):
+    if not getenv("OKS_PROFILE"):
         return
 
-    CLUSTER_ID_FILE = f"{CONFIG_FOLDER}/{os.getenv('OKS_PROFILE')}.cluster_id"
+    CLUSTER_ID_FILE = f"{CONFIG_FOLDER}/{getenv('OKS_PROFILE')}.cluster_id"
 
     with open(CLUSTER_ID_FILE, 'w') as file:
         file.write(cluster_id)
@@ -368,10 +1200,10 @@ def set_project_id(project_id):
     if not os.path.exists(CONFIG_FOLDER):
         os.makedirs(CONFIG_FOLDER)
 
-    if not os.getenv("OKS_PROFILE"):
+    if not getenv("OKS_PROFILE"):
         return
 
-    PROJECT_ID_FILE = f"{CONFIG_FOLDER}/{os.getenv('OKS_PROFILE')}.project_id"
+    PROJECT_ID_FILE = f"{CONFIG_FOLDER}/{getenv('OKS_PROFILE')}.project_id"
 
     with open(PROJECT_ID_FILE, 'w') as file:
         file.write(project_id)
@@ -383,49 +1215,95 @@ def login_profile(name):
     Load and set environment variables for the given profile name.
     Raises an exception if the profile does not exist or lacks required info.
     """
-    _, PROFILE_FILE = get_config_path()
-
     # check is profile name is defined by user as environment variable
     if name is None:
-        if os.getenv('OKS_PROFILE') is None:
+        if getenv('OKS_PROFILE') is None:
             name = "default"
         else:
-            name = os.getenv('OKS_PROFILE')
+            name = getenv('OKS_PROFILE')
 
-    if os.path.exists(PROFILE_FILE):
-        with open(PROFILE_FILE, 'r') as file:
-            profiles = json.load(file)
+    profiles = config_store.profiles()
 
+    if profiles is not None:
         if name not in profiles:
             raise click.ClickException("Profile %s does not exist" % click.style(name, bold=True))
 
-        os.environ["OKS_PROFILE"] = name
+        setenv("OKS_PROFILE", name)
 
         if profiles[name]['type'] == 'username/password':
-            os.environ["OKS_USERNAME"] = profiles[name]['username']
-            os.environ["OKS_PASSWORD"] = profiles[name]['password']
+            setenv("OKS_USERNAME", profiles[name]['username'])
+            setenv("OKS_PASSWORD", profiles[name]['password'])
         else: # profiles[name]['type'] == 'ak/sk'
-            os.environ["OKS_ACCESS_KEY"] = profiles[name]['access_key']
-            os.environ["OKS_SECRET_KEY"] = profiles[name]['secret_key']
+            setenv("OKS_ACCESS_KEY", profiles[name]['access_key'])
+            setenv("OKS_SECRET_KEY", profiles[name]['secret_key'])
 
-        if not os.environ.get("OKS_ENDPOINT"):
+        if not getenv("OKS_ENDPOINT"):
             if 'endpoint' in profiles[name]:
-                os.environ["OKS_ENDPOINT"] = profiles[name]['endpoint']
+                setenv("OKS_ENDPOINT", profiles[name]['endpoint'])
             elif 'region_name' in profiles[name]:
-                os.environ["OKS_ENDPOINT"] = DEFAULT_API_URL.format(region=profiles[name]['region_name'])
+                setenv("OKS_ENDPOINT", DEFAULT_API_URL.format(region=profiles[name]['region_name']))
             else:
                 raise click.ClickException(f"Unable to find API endpoint for {click.style(name, bold=True)} profile")
 
         if 'region_name' in profiles[name]:
-            os.environ["OKS_REGION"] = profiles[name]['region_name']
+            setenv("OKS_REGION", profiles[name]['region_name'])
 
-        return profiles[name]
+        if not getenv("OKS_RATE_LIMIT") and 'rate_limit' in profiles[name]:
+            setenv("OKS_RATE_LIMIT", str(profiles[name]['rate_limit']))
 
-    return {}
+        return copy.deepcopy(profiles[name])
 
-def format_row(data: dict, name: str, is_default: bool):
-    """Parse status and dates from a cluster of project object and returns elements"""
+    return {}
 
+def parse_timestamp(value):
+    """Parse an API timestamp with datetime.fromisoformat, falling back to dateutil for non ISO 8601 formats."""
+    if isinstance(value, datetime):
+        return value
+    try:
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value)
+    except (AttributeError, ValueError):
+        import dateutil.parser
+        return dateutil.parser.parse(value)
+
+@functools.lru_cache(maxsize=4096)
+def _relative_time(future, days, seconds):
+    """human_readable.date_time of a delta, memoized by (future, days, seconds if less than a day)."""
+    import human_readable
+
+    delta = timedelta(days=days, seconds=seconds)
+    return human_readable.date_time(-delta if future else delta)
+
+def format_relative_times(values, now=None):
+    """Format timestamps relative to now like human_readable.date_time ('3 days ago') in one pass.
+    now (timezone aware) is computed once for all the values, None values are returned as None.
+    """
+    now = now or datetime.now(timezone.utc)
+    # naive timestamps are local times
+    local_now = now.astimezone().replace(tzinfo=None)
+    results = []
+
+    for value in values:
+        if value is None:
+            results.append(None)
+            continue
+
+        date = parse_timestamp(value)
+        delta = (now if date.tzinfo else local_now) - date
+        future = delta < timedelta(0)
+        if future:
+            delta = -delta
+
+        # past a day the text only depends on the number of days
+        results.append(_relative_time(future, delta.days, 0 if delta.days else delta.seconds))
+
+    return results
+
+def format_row(data: dict, name: str, is_default: bool, now=None):
+    """Parse status and dates from a cluster of project object and returns elements
+    now: time the dates are relative to, computed once by the callers rendering many rows
+    """
     if not data.get('status'):
         raise click.ClickException("Can't find 'status' in project/cluster data")
 
@@ -444,33 +1322,27 @@ def format_row(data: dict, name: str, is_default: bool):
     else:
         default = ""
 
-    created_at = dateutil.parser.parse(data['created_at'])
-    updated_at = dateutil.parser.parse(data['updated_at'])
-    now = datetime.now(tz=created_at.tzinfo)
+    created_at, updated_at = format_relative_times([data['created_at'], data['updated_at']], now)
 
-    row = [click.style(name, bold=True), human_readable.date_time(now - created_at), human_readable.date_time(now - updated_at), msg, default]
+    row = [click.style(name, bold=True), created_at, updated_at, msg, default]
     return row, status, name
 
 def profile_list():
     """Return all profiles as a dict, or empty if none."""
-    _, PROFILE_FILE = get_config_path()
+    profiles = config_store.profiles()
 
-    if os.path.exists(PROFILE_FILE):
-        with open(PROFILE_FILE, 'r') as file:
-            profiles = json.load(file)
-            return profiles
+    if profiles is not None:
+        # callers are free to modify the returned profiles
+        return copy.deepcopy(profiles)
     
     return {}
 
 def get_profiles():
     """Return list of profile names, or empty list."""
-    _, PROFILE_FILE = get_config_path()
+    data = config_store.profiles()
 
-    if os.path.exists(PROFILE_FILE):
-        with open(PROFILE_FILE, 'r') as f:
-            data = json.load(f)
-            if isinstance(data, dict):
-                return list(data.keys())
+    if isinstance(data, dict):
+        return list(data.keys())
     return []
 
 def profile_completer(ctx, param, incomplete):
@@ -478,6 +1350,152 @@ def profile_completer(ctx, param, incomplete):
     profiles = get_profiles()
     return [CompletionItem(p) for p in profiles if p.startswith(incomplete)]
 
+def get_completion_cache_path():
+    """Return path to the completion candidates cache of the current profile, or None if no profile is set."""
+    if not getenv("OKS_PROFILE"):
+        return
+
+    CONFIG_FOLDER, _ = get_config_path()
+    return f"{CONFIG_FOLDER}/cache/{getenv('OKS_PROFILE')}.completion"
+
+def load_completion_cache():
+    """Load the completion candidates of the current profile, empty if missing or unreadable."""
+    COMPLETION_PATH = get_completion_cache_path()
+
+    if COMPLETION_PATH and os.path.exists(COMPLETION_PATH):
+        try:
+            with open(COMPLETION_PATH, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            logging.info("ignoring unreadable completion cache %s", COMPLETION_PATH)
+
+    return {}
+
+def save_completion_cache(cache):
+    """Atomically write the completion candidates of the current profile."""
+    COMPLETION_PATH = get_completion_cache_path()
+
+    if not COMPLETION_PATH:
+        return
+
+    os.makedirs(os.path.dirname(COMPLETION_PATH), exist_ok=True)
+
+    # unique per thread too, the cache being written by concurrent requests
+    tmp_path = f"{COMPLETION_PATH}.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, 'w') as file:
+        json.dump(cache, file)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, COMPLETION_PATH)
+
+def refresh_completion_cache(key):
+    """Fetch completion candidates from the API for 'projects' or 'clusters:<project_id>' and store them."""
+    if key == "projects":
+        data = do_request("GET", "projects")
+    else:
+        project_id = key.split(":", 1)[1]
+        params = {"project_id": project_id} if project_id else {}
+        data = do_request("GET", "clusters", params=params)
+
+    items = [{"id": item.get("id"), "name": item.get("name"), "project_id": item.get("project_id")} for item in data]
+
+    cache = load_completion_cache()
+    cache[key] = {"items": items, "saved_at": time.time()}
+    save_completion_cache(cache)
+
+    return items
+
+def run_detached(func, *args, log_path=None):
+    """Run func from a detached child process so the caller returns immediately, synchronously without os.fork.
+    The child output, with the traceback of an error, goes to log_path if given, and is discarded otherwise. Returns the child PID.
+    """
+    if not hasattr(os, "fork"):
+        func(*args)
+        return None
+
+    pid = os.fork()
+
+    if pid == 0:  # Child process
+        global _session
+        status = 0
+        try:
+            # never share the parent connections, nor keep the shell waiting on our stdout
+            _session = None
+            os.setsid()
+            devnull = os.open(os.devnull, os.O_RDWR)
+            output = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600) if log_path else devnull
+            os.dup2(devnull, 0)
+            for fd in (1, 2):
+                os.dup2(output, fd)
+            func(*args)
+        except SystemExit as e:
+            status = 0 if e.code in (None, 0) else 1
+        except BaseException:
+            # written to log_path, so that a failed background run can be diagnosed
+            os.write(2, traceback.format_exc().encode())
+            status = 1
+        finally:
+            # os._exit does not flush what func printed
+            with contextlib.suppress(Exception):
+                sys.stdout.flush()
+                sys.stderr.flush()
+            os._exit(status)
+
+    return pid
+
+def _revalidate_completion_cache(key):
+    """Refresh a stale completion entry from a detached child process, so the completion returns immediately."""
+    run_detached(refresh_completion_cache, key)
+
+def get_completion_items(key):
+    """Return cached completion candidates, stale-while-revalidate.
+    Entries older than OKS_COMPLETION_TTL seconds (default 60) are still returned but refreshed in background.
+    """
+    cache = load_completion_cache()
+    entry = cache.get(key)
+
+    if entry is None:
+        return refresh_completion_cache(key)
+
+    ttl = int(os.getenv('OKS_COMPLETION_TTL', 60))
+    now = time.time()
+
+    if now - entry.get("saved_at", 0) > ttl and now - entry.get("refreshing_at", 0) > ttl:
+        logging.info("completion cache %s is stale, refreshing in background", key)
+        entry["refreshing_at"] = now
+        save_completion_cache(cache)
+        _revalidate_completion_cache(key)
+
+    return entry["items"]
+
+def update_completion_cache(method, path, obj):
+    """Apply a successful create/update/delete of a project or cluster to the completion candidates."""
+    segments = path.split('?')[0].strip('/').split('/')
+
+    if segments[0] not in ("projects", "clusters") or len(segments) > 2:
+        return
+
+    cache = load_completion_cache()
+    if not cache:
+        return
+
+    kind = segments[0]
+    keys = [key for key in cache if key == kind or key.startswith(f"{kind}:")]
+
+    if method.upper() == "DELETE":
+        for key in keys:
+            cache[key]["items"] = [item for item in cache[key]["items"] if item.get("id") != segments[-1]]
+    elif isinstance(obj, dict) and obj.get("id") and obj.get("name"):
+        item = {"id": obj.get("id"), "name": obj.get("name"), "project_id": obj.get("project_id")}
+        for key in keys:
+            items = [i for i in cache[key]["items"] if i.get("id") != item["id"]]
+            if kind == "projects" or key in ("clusters:", f"clusters:{item['project_id']}"):
+                items.append(item)
+            cache[key]["items"] = items
+    else:
+        return
+
+    save_completion_cache(cache)
+
 def cluster_completer(ctx, param, incomplete):
     profile = (
         ctx.params.get("profile")
@@ -496,9 +1514,8 @@ def cluster_completer(ctx, param, incomplete):
 
     project_id = None
     try:
-        projects = do_request("GET", "projects")
         if project_name:
-            for p in projects:
+            for p in get_completion_items("projects"):
                 if p["name"] == project_name:
                     project_id = p["id"]
                     break
@@ -507,12 +1524,8 @@ def cluster_completer(ctx, param, incomplete):
     except Exception:
         return []
 
-    params = {}
-    if project_id:
-        params["project_id"] = project_id
-
     try:
-        data = do_request("GET", "clusters", params=params)
+        data = get_completion_items(f"clusters:{project_id or ''}")
     except Exception:
         return []
 
@@ -535,7 +1548,7 @@ def project_completer(ctx, param, incomplete):
         return []
 
     try:
-        data = do_request("GET", "projects")
+        data = get_completion_items("projects")
     except Exception:
         return []
 
@@ -566,6 +1579,7 @@ def set_profile(name, obj: dict):
             file.write(profiles)
 
     os.chmod(PROFILE_FILE, 0o600)
+    config_store.invalidate(PROFILE_FILE)
 
 def remove_profile(name):
     """Remove a profile by name from the profiles file."""
@@ -582,6 +1596,8 @@ def remove_profile(name):
             file.write(profiles)
             file.truncate()
 
+        config_store.invalidate(PROFILE_FILE)
+
 def get_cache(project, cluster, name, user, group):
     """Return path to cached item if it exists, else None."""
     CONFIG_FOLDER, _ = get_config_path()
@@ -618,6 +1634,9 @@ def save_cache(project, cluster, name, data, user, group):
 
     os.chmod(item_path, 0o600)
 
+    if name == 'kubeconfig':
+        save_kubeconfig_metadata(item_path, data)
+
     return item_path
 
 def clear_cache():
@@ -626,6 +1645,111 @@ def clear_cache():
     cache = pathlib.Path(CONFIG_FOLDER).joinpath("cache")
     shutil.rmtree(cache)
 
+def fetch_kubeconfig(project_id, cluster_id, user=None, group=None, ttl=None, nacl=False):
+    """Fetch a cluster kubeconfig from the API and save it in cache, returns the kubeconfig and its path."""
+    logging.info("extracting kubeconfig by api")
+
+    params = {}
+    if user:
+        params["user"] = user
+    if group:
+        params["group"] = group
+    if ttl:
+        params["ttl"] = ttl
+
+    if nacl:
+        from nacl.public import PrivateKey, SealedBox
+        from nacl.encoding import Base64Encoder
+
+        ephemeral = PrivateKey.generate()
+        unsealbox = SealedBox(ephemeral)
+
+        headers = {
+          'x-encrypt-nacl': ephemeral.public_key.encode(Base64Encoder).decode('ascii')
+        }
+        kubeconfig_raw = do_request("POST", f'clusters/{cluster_id}/kubeconfig', params = params, headers = headers)['data']['kubeconfig']
+    else:
+        kubeconfig_raw = do_request("GET", f'clusters/{cluster_id}/kubeconfig', params = params, use_cache = False)['data']['kubeconfig']
+
+    if not kubeconfig_raw:
+        logging.error("empty response")
+        raise SystemExit()
+    elif nacl:
+        logging.info("decrypting received kubeconfig")
+        kubeconfig = unsealbox.decrypt(kubeconfig_raw.encode('ascii'), encoder = Base64Encoder).decode('ascii')
+    else:
+        kubeconfig = kubeconfig_raw
+
+    return kubeconfig, save_cache(project_id, cluster_id, 'kubeconfig', kubeconfig, user, group)
+
+def parse_duration(value):
+    """Parse a duration in human readable format (30s, 15m, 5h, 1d, 1w) into a timedelta."""
+    match = re.fullmatch(r"\s*(\d+)\s*([smhdw])\s*", str(value))
+    if not match:
+        raise click.BadParameter(f"invalid duration '{value}', expected a number followed by s, m, h, d or w")
+
+    amount, unit = int(match.group(1)), match.group(2)
+    units = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+    return timedelta(**{units[unit]: amount})
+
+def get_kubeconfig_renew_window():
+    """Return the OKS_KUBECONFIG_RENEW_BEFORE window, None when background renewal is disabled."""
+    value = os.getenv("OKS_KUBECONFIG_RENEW_BEFORE")
+    if not value:
+        return None
+
+    try:
+        return parse_duration(value)
+    except click.BadParameter as e:
+        logging.warning(f"ignoring OKS_KUBECONFIG_RENEW_BEFORE: {e.message}")
+        return None
+
+def is_kubeconfig_expiring(kubeconfig_path, within):
+    """Check if the client certificate of a cached kubeconfig expires within the given timedelta."""
+    not_after_date = get_kubeconfig_expiration_date(kubeconfig_path)
+
+    if not not_after_date:
+        return False
+    return not_after_date - datetime.now() <= within
+
+def renew_kubeconfig_in_background(project_id, cluster_id, kubeconfig_path, user=None, group=None):
+    """Renew a still valid kubeconfig from a detached process when it expires within OKS_KUBECONFIG_RENEW_BEFORE."""
+    within = get_kubeconfig_renew_window()
+
+    if within is None or not is_kubeconfig_expiring(kubeconfig_path, within):
+        return
+
+    logging.info("kubeconfig %s expires soon, renewing it in background", kubeconfig_path)
+    run_detached(fetch_kubeconfig, project_id, cluster_id, user, group)
+
+def list_cached_kubeconfigs(project_id=None, cluster_id=None):
+    """List cached kubeconfigs of all clusters, or only the given project and cluster."""
+    CONFIG_FOLDER, _ = get_config_path()
+    cache_path = pathlib.Path(CONFIG_FOLDER).joinpath("cache")
+    uuid = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    table = []
+
+    if not cache_path.is_dir():
+        return table
+
+    for entry in sorted(os.listdir(cache_path)):
+        if not cache_path.joinpath(entry).is_dir():
+            continue
+
+        match = re.fullmatch(f"({uuid})-({uuid})", entry) or re.fullmatch(r"([^-]+)-(.+)", entry)
+        if not match:
+            continue
+
+        project, cluster = match.groups()
+        if project_id and project != project_id or cluster_id and cluster != cluster_id:
+            continue
+
+        for element in get_all_cache(project, cluster, "kubeconfig"):
+            if element.get("cache_path"):
+                table.append({"project_id": project, "cluster_id": cluster, **element})
+
+    return table
+
 def get_all_cache(project, cluster, name):
     """Retrieve all cache entries for a project and cluster."""
     CONFIG_FOLDER, _ = get_config_path()
@@ -663,11 +1787,11 @@ def save_tokens(headers):
     if not headers.get('Access-Token') or not headers['Refresh-Token']:
         return
 
-    if not os.getenv("OKS_PROFILE"):
+    if not getenv("OKS_PROFILE"):
         return
 
-    ACCESS_TOKEN_FILE = f"{CONFIG_FOLDER}/{os.getenv('OKS_PROFILE')}.access_token"
-    REFRESH_TOKEN_FILE = f"{CONFIG_FOLDER}/{os.getenv('OKS_PROFILE')}.refresh_token"
+    ACCESS_TOKEN_FILE = f"{CONFIG_FOLDER}/{getenv('OKS_PROFILE')}.access_token"
+    REFRESH_TOKEN_FILE = f"{CONFIG_FOLDER}/{getenv('OKS_PROFILE')}.refresh_token"
 
     with open(ACCESS_TOKEN_FILE, 'w') as file:
         file.write(headers['Access-Token'])
@@ -678,44 +1802,39 @@ def save_tokens(headers):
     os.chmod(ACCESS_TOKEN_FILE, 0o600)
     os.chmod(REFRESH_TOKEN_FILE, 0o600)
 
+    config_store.invalidate(ACCESS_TOKEN_FILE, REFRESH_TOKEN_FILE)
+
 def is_tokens_valid():
     """Check if stored refresh token is still valid."""
-    CONFIG_FOLDER, _ = get_config_path()
-    if not os.getenv("OKS_PROFILE"):
+    if not getenv("OKS_PROFILE"):
         return
 
-    REFRESH_TOKEN_FILE = f"{CONFIG_FOLDER}/{os.getenv('OKS_PROFILE')}.refresh_token"
+    refresh_token = config_store.token(getenv('OKS_PROFILE'), 'refresh_token')
 
-    if not os.path.exists(REFRESH_TOKEN_FILE):
+    if refresh_token is None:
         return False
 
-    with open(REFRESH_TOKEN_FILE, 'r') as file:
-        refresh_token = file.read()
-
-        decoded_refresh_token = parse_jwt(refresh_token)
+    decoded_refresh_token = parse_jwt(refresh_token)
 
-        if decoded_refresh_token and decoded_refresh_token.get('exp'):
+    if decoded_refresh_token and decoded_refresh_token.get('exp'):
 
-            current_time = int(time.time())
+        current_time = int(time.time())
 
-            if decoded_refresh_token['exp'] >= current_time + 5: # 5sec margin
-                return True
+        if decoded_refresh_token['exp'] >= current_time + 5: # 5sec margin
+            return True
 
     return False
 
 def is_jwt_enabled():
     """Return True if JWT is enabled in the current profile."""
-    _, PROFILE_FILE = get_config_path()
-
-    if not os.getenv("OKS_PROFILE"):
+    if not getenv("OKS_PROFILE"):
         return
 
-    name = os.getenv("OKS_PROFILE")
+    name = getenv("OKS_PROFILE")
 
-    if os.path.exists(PROFILE_FILE):
-        with open(PROFILE_FILE, 'r') as file:
-            profiles = json.load(file)
+    profiles = config_store.profiles()
 
+    if profiles is not None:
         if name not in profiles:
             raise click.ClickException("Profile %s does not exist" % click.style(name, bold=True))
 
@@ -725,41 +1844,64 @@ def is_jwt_enabled():
 
 def get_token(token_type):
     """Retrieve stored token (access or refresh) for current profile."""
-    CONFIG_FOLDER, _ = get_config_path()
-
-    if not os.getenv("OKS_PROFILE"):
+    if not getenv("OKS_PROFILE"):
         return
 
-    TOKEN_FILE = f"{CONFIG_FOLDER}/{os.getenv('OKS_PROFILE')}.{token_type}"
+    token = config_store.token(getenv('OKS_PROFILE'), token_type)
 
-    if not os.path.exists(TOKEN_FILE):
+    if token is None:
         return ""
 
-    with open(TOKEN_FILE, 'r') as file:
-        token = file.read()
-        return token
+    return token
 
 def remove_jwt_token(token_type):
     """Delete the specified JWT token file for current profile."""
     CONFIG_FOLDER, _ = get_config_path()
 
-    if not os.getenv("OKS_PROFILE"):
+    if not getenv("OKS_PROFILE"):
         return
 
-    TOKEN_FILE = f"{CONFIG_FOLDER}/{os.getenv('OKS_PROFILE')}.{token_type}"
+    TOKEN_FILE = f"{CONFIG_FOLDER}/{getenv('OKS_PROFILE')}.{token_type}"
 
     if os.path.exists(TOKEN_FILE):
         os.remove(TOKEN_FILE)
 
+    config_store.invalidate(TOKEN_FILE)
+
 def detect_and_parse_input(input_data):
     """Parse input as JSON or YAML; raise error if invalid."""
+    import yaml
+
     try:
         return json.loads(input_data)
     except json.JSONDecodeError:
         pass
 
     try:
-        return yaml.safe_load(input_data)
+        return yaml_load(input_data)
+    except yaml.YAMLError:
+        pass
+
+    raise click.BadParameter("Input file is neither valid JSON nor YAML.")
+
+def detect_and_parse_documents(input_data):
+    """Parse a JSON object or list, or a multi-document YAML, into a list of documents; raise error if invalid."""
+    import yaml
+
+    try:
+        data = json.loads(input_data)
+        return data if isinstance(data, list) else [data]
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        documents = []
+        for document in yaml_load_all(input_data):
+            if isinstance(document, list):
+                documents.extend(document)
+            elif document is not None:
+                documents.append(document)
+        return documents
     except yaml.YAMLError:
         pass
 
@@ -778,7 +1920,7 @@ def verify_certificate(kubeconfig_str):
 
 def get_expiration_date(kubeconfig_str):
     """Extract and return the client certificate expiration date."""
-    kubeconfig = yaml.safe_load(kubeconfig_str)
+    kubeconfig = yaml_load(kubeconfig_str)
 
     try:
         for user_entry in kubeconfig.get('users', []):
@@ -797,8 +1939,110 @@ def get_expiration_date(kubeconfig_str):
     except AttributeError as e:
         logging.warning(f"Error occured reading kubeconfig: {e}")
 
+def kubeconfig_metadata(kubeconfig_str):
+    """Parse a kubeconfig and return its client certificate expiration date and subject, server URL and checksum."""
+    import yaml
+
+    metadata = {
+        "expires_at": None,
+        "cn": None,
+        "server": None,
+        "checksum": hashlib.sha256(kubeconfig_str.encode('utf-8')).hexdigest()
+    }
+
+    try:
+        kubeconfig = yaml_load(kubeconfig_str)
+    except yaml.YAMLError as e:
+        logging.warning(f"Error occured reading kubeconfig: {e}")
+        return metadata
+
+    if not isinstance(kubeconfig, dict):
+        return metadata
+
+    for cluster in kubeconfig.get('clusters') or []:
+        server = (cluster.get('cluster') or {}).get('server')
+        if server:
+            metadata["server"] = server
+            break
+
+    for user_entry in kubeconfig.get('users') or []:
+        cert_str = (user_entry.get('user') or {}).get('client-certificate-data')
+        if not cert_str:
+            continue
+
+        cert = decode_parse_certificate(cert_str)
+        if not cert:
+            continue
+
+        expires_at = datetime.strptime(cert.get_notAfter().decode('ascii'), '%Y%m%d%H%M%SZ')
+        cn = cert.get_subject().get_components()
+        cn_user = f"CN={cn[0][1].decode('utf-8')}" if cn else ""
+        cn_group = f"/O={cn[1][1].decode('utf-8')}" if len(cn) > 1 else ""
+
+        metadata.update({"expires_at": expires_at.isoformat(), "cn": f"{cn_user}{cn_group}"})
+        break
+
+    return metadata
+
+def save_kubeconfig_metadata(kubeconfig_path, kubeconfig_str, metadata=None):
+    """Write the metadata sidecar next to a cached kubeconfig, parsing the kubeconfig unless metadata is given."""
+    if metadata is None:
+        metadata = kubeconfig_metadata(kubeconfig_str)
+
+    stat = os.stat(kubeconfig_path)
+    metadata.update({"mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+
+    META_PATH = f"{kubeconfig_path}.meta"
+    with open(META_PATH, 'w') as file:
+        json.dump(metadata, file)
+    os.chmod(META_PATH, 0o600)
+
+    return metadata
+
+def get_kubeconfig_metadata(kubeconfig_path):
+    """Return the metadata of a cached kubeconfig from its sidecar.
+    The kubeconfig is only read when its size or mtime changed, and only parsed again when its checksum changed.
+    """
+    metadata = None
+
+    try:
+        with open(f"{kubeconfig_path}.meta", 'r') as file:
+            metadata = json.load(file)
+    except (OSError, ValueError):
+        logging.info("no metadata found for %s", kubeconfig_path)
+
+    stat = os.stat(kubeconfig_path)
+    if metadata and metadata.get("mtime_ns") == stat.st_mtime_ns and metadata.get("size") == stat.st_size:
+        return metadata
+
+    with open(kubeconfig_path, 'r') as file:
+        kubeconfig_str = file.read()
+
+    if metadata and metadata.get("checksum") == hashlib.sha256(kubeconfig_str.encode('utf-8')).hexdigest():
+        return save_kubeconfig_metadata(kubeconfig_path, kubeconfig_str, metadata)
+
+    logging.info("kubeconfig %s changed, parsing it again", kubeconfig_path)
+    return save_kubeconfig_metadata(kubeconfig_path, kubeconfig_str)
+
+def get_kubeconfig_expiration_date(kubeconfig_path):
+    """Return the client certificate expiration date of a cached kubeconfig, None if unknown."""
+    expires_at = get_kubeconfig_metadata(kubeconfig_path).get("expires_at")
+
+    if expires_at:
+        return datetime.fromisoformat(expires_at)
+
+def is_kubeconfig_valid(kubeconfig_path):
+    """Check if the client certificate of a cached kubeconfig is still valid."""
+    not_after_date = get_kubeconfig_expiration_date(kubeconfig_path)
+
+    if not_after_date:
+        return not_after_date >= datetime.now()
+    return False
+
 def decode_parse_certificate(cert_str):
     """Parse base64 encoded certificate data and returns cert (X509) object"""
+    import OpenSSL
+
     try:
         ca_cert = base64.b64decode(cert_str)
         cert = OpenSSL.crypto.load_certificate(OpenSSL.crypto.FILETYPE_PEM, ca_cert)
@@ -814,7 +2058,7 @@ def kubeconfig_parse_fields(kubeconfig, cluster_name, user, group):
     user: user name of this kubeconfig (if set)
     group: user group name of this kubeconfig (if set)
     """
-    kubeconfig_str = yaml.safe_load(kubeconfig)
+    kubeconfig_str = yaml_load(kubeconfig)
     kubedata = []
 
     # Ensure loaded YAML returnes a valid dict object
@@ -851,6 +2095,348 @@ def kubeconfig_parse_fields(kubeconfig, cluster_name, user, group):
 
     return kubedata
 
+class KubeClientUnsupported(Exception):
+    """Raised when a kubeconfig or a kubectl command can not be handled by KubeClient."""
+
+class KubeAPIError(Exception):
+    """Error returned by the Kubernetes API, formatted like kubectl does."""
+
+_kube_clients = {}
+
+class KubeClient:
+    """Lightweight Kubernetes REST client for the OKS custom resources, using a cached kubeconfig.
+    Credentials and API discovery are extracted once next to the kubeconfig and reused until it changes.
+    """
+
+    def __init__(self, kubeconfig_path):
+        import requests
+
+        self.kubeconfig_path = pathlib.Path(kubeconfig_path)
+        self.config = self._load_config()
+        self.discovery = None
+
+        self.session = requests.Session()
+        if self.config["cert"]:
+            self.session.cert = (self.config["cert"], self.config["key"])
+        self.session.verify = False if self.config["insecure"] else (self.config["ca"] or True)
+        if self.config["token"]:
+            self.session.headers["Authorization"] = f"Bearer {self.config['token']}"
+
+    def _load_config(self):
+        """Return server and credentials of the kubeconfig current context, extracting them if it changed."""
+        checksum = get_kubeconfig_metadata(self.kubeconfig_path)["checksum"]
+        config_path = self.kubeconfig_path.with_name("kubeclient.json")
+
+        try:
+            with open(config_path, 'r') as file:
+                config = json.load(file)
+            if config.get("checksum") == checksum:
+                return config
+        except (OSError, ValueError):
+            logging.info("no client config found for %s", self.kubeconfig_path)
+
+        config = self._extract_config(checksum)
+        with open(config_path, 'w') as file:
+            json.dump(config, file)
+        os.chmod(config_path, 0o600)
+
+        # discovery may differ on a new cluster endpoint
+        self.kubeconfig_path.with_name("discovery.json").unlink(missing_ok=True)
+
+        return config
+
+    def _extract_config(self, checksum):
+        import yaml
+
+        with open(self.kubeconfig_path, 'r') as file:
+            try:
+                kubeconfig = yaml_load(file)
+            except yaml.YAMLError:
+                kubeconfig = None
+
+        if not isinstance(kubeconfig, dict):
+            raise KubeClientUnsupported("kubeconfig can not be parsed")
+
+        def named(section, name):
+            for entry in kubeconfig.get(section) or []:
+                if isinstance(entry, dict) and (not name or entry.get("name") == name):
+                    return entry.get(section[:-1]) or {}
+            return {}
+
+        context = named("contexts", kubeconfig.get("current-context"))
+        cluster = named("clusters", context.get("cluster"))
+        user = named("users", context.get("user"))
+
+        if not cluster.get("server"):
+            raise KubeClientUnsupported("kubeconfig has no server")
+        if user.get("exec") or user.get("auth-provider"):
+            raise KubeClientUnsupported("kubeconfig uses an authentication plugin")
+
+        config = {
+            "checksum": checksum,
+            "server": cluster["server"].rstrip("/"),
+            "namespace": context.get("namespace") or "default",
+            "token": user.get("token"),
+            "insecure": bool(cluster.get("insecure-skip-tls-verify")),
+            "ca": cluster.get("certificate-authority"),
+            "cert": user.get("client-certificate"),
+            "key": user.get("client-key")
+        }
+
+        for key, section, data_key, filename in (("ca", cluster, "certificate-authority-data", "ca.crt"),
+                                                  ("cert", user, "client-certificate-data", "client.crt"),
+                                                  ("key", user, "client-key-data", "client.key")):
+            if section.get(data_key):
+                path = self.kubeconfig_path.with_name(filename)
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, 'wb') as file:
+                    file.write(base64.b64decode(section[data_key]))
+                config[key] = str(path)
+
+        if not config["token"] and not (config["cert"] and config["key"]):
+            raise KubeClientUnsupported("kubeconfig has no client certificate nor token")
+
+        return config
+
+    def request(self, method, path, **kwargs):
+        """Send a request to the Kubernetes API and return the decoded JSON response."""
+        kwargs.setdefault("timeout", int(os.getenv("OKS_KUBE_TIMEOUT", 30)))
+        response = self.session.request(method, f"{self.config['server']}{path}", **kwargs)
+
+        if response.status_code >= 400:
+            try:
+                status = response.json()
+            except ValueError:
+                status = {"message": response.text}
+            reason = status.get("reason") or response.reason
+            raise KubeAPIError(f"Error from server ({reason}): {status.get('message')}")
+
+        return response.json()
+
+    def _discover(self):
+        """List the custom resources served by the cluster, as kubectl discovery does for API groups."""
+        resources = []
+
+        for group in self.request("GET", "/apis").get("groups", []):
+            name = group.get("name", "")
+            # built-in groups never hold the OKS resources
+            if "." not in name or name.endswith(".k8s.io"):
+                continue
+
+            group_version = group["preferredVersion"]["groupVersion"]
+            for resource in self.request("GET", f"/apis/{group_version}").get("resources", []):
+                if "/" in resource["name"]:
+                    continue
+                resources.append({
+                    "groupVersion": group_version,
+                    "name": resource["name"],
+                    "singularName": resource.get("singularName") or resource["kind"].lower(),
+                    "kind": resource["kind"],
+                    "shortNames": resource.get("shortNames") or [],
+                    "namespaced": resource.get("namespaced", False)
+                })
+
+        with open(self.kubeconfig_path.with_name("discovery.json"), 'w') as file:
+            json.dump(resources, file)
+
+        return resources
+
+    def resource(self, name, group_version=None):
+        """Resolve a resource plural, singular, kind or short name to its discovery entry."""
+        name = name.lower()
+
+        def find(resources):
+            for resource in resources:
+                names = [resource["name"], resource["singularName"], resource["kind"].lower(), *resource["shortNames"]]
+                if name in names and group_version in (None, resource["groupVersion"]):
+                    return resource
+
+        if self.discovery is None:
+            try:
+                with open(self.kubeconfig_path.with_name("discovery.json"), 'r') as file:
+                    self.discovery = json.load(file)
+            except (OSError, ValueError):
+                self.discovery = self._discover()
+
+        resource = find(self.discovery)
+        if resource is None:
+            self.discovery = self._discover()
+            resource = find(self.discovery)
+        if resource is None:
+            raise KubeClientUnsupported(f"resource {name} is not served as a custom resource")
+
+        return resource
+
+    def path(self, resource, name=None, namespace=None):
+        """Build the API path of a resource collection or object."""
+        path = f"/apis/{resource['groupVersion']}"
+        if resource["namespaced"]:
+            path += f"/namespaces/{namespace or self.config['namespace']}"
+        path += f"/{resource['name']}"
+        if name:
+            path += f"/{name}"
+        return path
+
+    def get(self, resource, name=None, table=False):
+        """Get an object or list objects, as a meta.k8s.io Table if requested."""
+        headers = {"Accept": "application/json;as=Table;v=v1;g=meta.k8s.io,application/json"} if table else {}
+        return self.request("GET", self.path(resource, name), headers=headers)
+
+    def create(self, obj):
+        """Create an object from its manifest."""
+        resource = self.resource(obj.get("kind", ""), obj.get("apiVersion"))
+        namespace = (obj.get("metadata") or {}).get("namespace")
+        return resource, self.request("POST", self.path(resource, namespace=namespace), json=obj)
+
+    def delete(self, resource, name):
+        """Delete an object by name."""
+        return self.request("DELETE", self.path(resource, name))
+
+def get_kube_client(kubeconfig_path):
+    """Return a KubeClient for the cached kubeconfig, shared within the invocation."""
+    key = str(kubeconfig_path)
+    client = _kube_clients.get(key)
+
+    if client is None or client.config["checksum"] != get_kubeconfig_metadata(kubeconfig_path)["checksum"]:
+        client = _kube_clients[key] = KubeClient(kubeconfig_path)
+
+    return client
+
+def _parse_kubectl_args(args):
+    """Return the kubectl get/create/delete command described by args, None for anything else."""
+    args = list(args)
+    output = None
+
+    if "-o" in args:
+        index = args.index("-o")
+        if index + 1 >= len(args):
+            return None
+        output = args[index + 1]
+        del args[index:index + 2]
+
+    if output not in (None, "json", "yaml", "wide"):
+        return None
+
+    if args == ["create", "-f", "-"]:
+        return {"verb": "create", "output": output}
+
+    if any(arg.startswith("-") for arg in args):
+        return None
+
+    if args[:1] == ["get"] and len(args) in (2, 3):
+        return {"verb": "get", "resource": args[1], "name": args[2] if len(args) == 3 else None, "output": output}
+
+    if args[:1] == ["delete"] and len(args) == 3 and output is None:
+        return {"verb": "delete", "resource": args[1], "name": args[2], "output": output}
+
+    return None
+
+def _kube_age(timestamp):
+    """Format a creation timestamp as kubectl short age (42s, 5m, 3h, 12d)."""
+    try:
+        created = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    except ValueError:
+        return str(timestamp)
+
+    seconds = int((datetime.now(created.tzinfo) - created).total_seconds())
+    for unit, size, limit in (("s", 1, 120), ("m", 60, 7200), ("h", 3600, 172800)):
+        if seconds < limit:
+            return f"{max(seconds, 0) // size}{unit}"
+    return f"{seconds // 86400}d"
+
+def _format_kube_table(table, wide):
+    """Render a meta.k8s.io Table like kubectl plain output."""
+    columns = [(i, c) for i, c in enumerate(table.get("columnDefinitions", [])) if wide or not c.get("priority")]
+    lines = [[c["name"].upper() for _, c in columns]]
+
+    for row in table.get("rows", []):
+        cells = []
+        for i, column in columns:
+            value = row["cells"][i] if i < len(row["cells"]) else None
+            if value is None or value == "":
+                value = "<none>"
+            elif column.get("format") == "date":
+                value = _kube_age(value)
+            cells.append(str(value))
+        lines.append(cells)
+
+    widths = [max(len(line[i]) for line in lines) for i in range(len(columns))]
+    return "".join("   ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() + "\n" for line in lines)
+
+def _format_kube_object(obj, output):
+    """Render an API object like kubectl -o json or -o yaml."""
+    if output == "yaml":
+        return yaml_dump(obj, sort_keys=True)
+    return json.dumps(obj, indent=4) + "\n"
+
+def run_kubectl_native(kubeconfig_path, args, input=None, capture=False):
+    """Run the simple kubectl get/create/delete commands used by oks-cli directly against the Kubernetes API.
+    Returns a CompletedProcess like subprocess.run, or None when the command has to go through kubectl.
+    """
+    import requests
+
+    if os.getenv("OKS_KUBE_CLIENT", "native") == "kubectl":
+        return None
+
+    command = _parse_kubectl_args(args)
+    if command is None:
+        return None
+
+    stderr = ""
+
+    try:
+        client = get_kube_client(kubeconfig_path)
+
+        if command["verb"] == "create":
+            try:
+                obj = json.loads(input or "")
+            except ValueError:
+                return None
+            resource, created = client.create(obj)
+            if command["output"]:
+                stdout = _format_kube_object(created, command["output"])
+            else:
+                stdout = f"{resource['singularName']}.{resource['groupVersion'].split('/')[0]}/{created['metadata']['name']} created\n"
+
+        elif command["verb"] == "delete":
+            resource = client.resource(command["resource"])
+            client.delete(resource, command["name"])
+            stdout = f"{resource['singularName']}.{resource['groupVersion'].split('/')[0]} \"{command['name']}\" deleted\n"
+
+        else:
+            resource = client.resource(command["resource"])
+            if command["output"] in ("json", "yaml"):
+                data = client.get(resource, command["name"])
+                if not command["name"]:
+                    items = [{"apiVersion": resource["groupVersion"], "kind": resource["kind"], **item} for item in data.get("items", [])]
+                    data = {"apiVersion": "v1", "items": items, "kind": "List", "metadata": {"resourceVersion": ""}}
+                stdout = _format_kube_object(data, command["output"])
+            else:
+                table = client.get(resource, command["name"], table=True)
+                if table.get("rows"):
+                    stdout = _format_kube_table(table, command["output"] == "wide")
+                else:
+                    stdout = ""
+                    stderr = f"No resources found in {client.config['namespace']} namespace.\n"
+
+    except KubeClientUnsupported as e:
+        logging.info("falling back to kubectl: %s", e)
+        return None
+    except KubeAPIError as e:
+        click.echo(str(e), err=True)
+        raise SystemExit(1)
+    except requests.exceptions.RequestException as e:
+        click.echo(f"Unable to connect to the server: {e}", err=True)
+        raise SystemExit(1)
+
+    if capture:
+        return subprocess.CompletedProcess(["kubectl"] + list(args), 0, stdout.encode("utf-8"), stderr.encode("utf-8"))
+
+    click.echo(stdout, nl=False)
+    if stderr:
+        click.echo(stderr, err=True, nl=False)
+    return subprocess.CompletedProcess(["kubectl"] + list(args), 0)
+
 def retrieve_cp_sized(filepath, endpoint, key = None):
     """Fetch control plane sizes from API and save to file."""
     cp_list = do_request("GET", endpoint)
@@ -869,10 +2455,10 @@ def shell_completions(ctx, param: click.core.Option, incomplete):
 
     # Check if OKS_PROFILE is set somehow
     if profile is None:
-        if os.getenv('OKS_PROFILE') is None:
+        if getenv('OKS_PROFILE') is None:
             profile = 'default'
         else:
-            profile = os.getenv('OKS_PROFILE')
+            profile = getenv('OKS_PROFILE')
 
     if profile not in profiles:
         return []
@@ -1027,24 +2613,203 @@ def transform_tuple(data):
     """Convert tuple to list unless it contains only an empty string."""
     return [] if data == ('',) else list(data)
 
-def cluster_create_in_background(cluster_config, text):
-    """Forks and retries cluster creation in background until project ready or failed."""
-    pid = os.fork()
+def get_jobs_path():
+    """Return the folder of the background jobs, creating it if needed."""
+    CONFIG_FOLDER, _ = get_config_path()
+    JOBS_PATH = f"{CONFIG_FOLDER}/jobs"
+    os.makedirs(JOBS_PATH, exist_ok=True)
+    return JOBS_PATH
+
+def get_job_path(job_id, extension="json"):
+    """Return the path of a file of a job, raise error if the ID is not one generated by submit_job."""
+    if not re.fullmatch(r"[0-9a-f]+", job_id):
+        raise click.ClickException(f"Job {job_id} not found")
+    return f"{get_jobs_path()}/{job_id}.{extension}"
+
+def get_job_log_path(job_id):
+    """Return the path of the log file of a job."""
+    return get_job_path(job_id, "log")
+
+@contextlib.contextmanager
+def job_lock(job_id):
+    """Hold the exclusive lock of a job, serializing its state transitions between the CLI and the job worker."""
+    try:
+        import fcntl
+    except ImportError:  # no fork either, jobs run synchronously
+        yield
+        return
 
-    if pid == 0:  # Child process
-        time.sleep(120) # Initial 2 mins pause
-        for i in range(30): # retry every 30 seconds during 15 mins
-            project = do_request("GET", f"projects/{cluster_config.get('project_id')}")
+    with open(get_job_path(job_id, "lock"), 'a') as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
 
-            if project.get("status") == "ready":
-                do_request("POST", 'clusters', json=cluster_config)
-                return
-            elif project.get("status") == "failed":
+def save_job(job):
+    """Atomically write the state of a job, shared between the CLI and the job worker."""
+    job["updated_at"] = datetime.now(timezone.utc).isoformat()
+    JOB_PATH = get_job_path(job["id"])
+
+    tmp_path = f"{JOB_PATH}.{os.getpid()}"
+    with open(tmp_path, 'w') as file:
+        json.dump(job, file)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, JOB_PATH)
+
+def load_job(job_id):
+    """Read the state of a job, raise error if it does not exist."""
+    JOB_PATH = get_job_path(job_id)
+
+    try:
+        with open(JOB_PATH, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        raise click.ClickException(f"Job {job_id} not found")
+
+def list_jobs():
+    """Return all the jobs, oldest first."""
+    jobs = []
+
+    for entry in os.listdir(get_jobs_path()):
+        if entry.endswith(".json"):
+            try:
+                jobs.append(load_job(entry[:-len(".json")]))
+            except click.ClickException:
+                logging.info("ignoring unreadable job %s", entry)
+
+    return sorted(jobs, key=lambda job: job["created_at"])
+
+def is_job_active(job):
+    """Tell if a job is still queued or running, a job whose worker died is not."""
+    if job["status"] not in ("queued", "running"):
+        return False
+    if job.get("pid"):
+        try:
+            os.kill(job["pid"], 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            pass
+    return True
+
+def prune_jobs():
+    """Remove the files of the jobs over for more than OKS_JOB_RETENTION seconds (default 7 days)."""
+    retention = timedelta(seconds=int(os.getenv("OKS_JOB_RETENTION", 7 * 24 * 3600)))
+    now = datetime.now(timezone.utc)
+
+    for job in list_jobs():
+        if is_job_active(job) or now - datetime.fromisoformat(job["updated_at"]) < retention:
+            continue
+
+        logging.info("removing job %s finished at %s", job["id"], job["updated_at"])
+        for extension in ("json", "log", "lock"):
+            try:
+                os.remove(get_job_path(job["id"], extension))
+            except FileNotFoundError:
+                pass
+
+def submit_job(description, request, wait=None):
+    """Queue a request to send once the optional wait condition is met, and start its detached worker.
+    request: {"method", "path", "json"}
+    wait: {"path", "name", "status", "timeout"} of the resource the request depends on
+    """
+    job = {
+        "id": os.urandom(6).hex(),
+        "description": description,
+        "profile": getenv("OKS_PROFILE"),
+        "status": "queued",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "pid": None,
+        "wait": wait,
+        "request": request,
+    }
+    prune_jobs()
+    save_job(job)
+
+    pid = run_detached(run_job, job["id"], log_path=get_job_log_path(job["id"]))
+    if pid:
+        with job_lock(job["id"]):
+            # unless the worker already claimed it, a queued job is active as long as its worker is alive
+            job = load_job(job["id"])
+            if job["pid"] is None:
+                job["pid"] = pid
+                save_job(job)
+    return job
+
+def run_job(job_id):
+    """Run a queued job from its worker: wait for the resource it depends on, then send its request.
+    Status changes and errors are printed to the job log.
+    """
+    with job_lock(job_id):
+        job = load_job(job_id)
+        if job["status"] != "queued":
+            return
+
+        job.update(status="running", pid=os.getpid())
+        save_job(job)
+    click.echo(f"{datetime.now():%Y-%m-%d %H:%M:%S} started job {job_id}: {job['description']}")
+
+    try:
+        wait = job.get("wait")
+        if wait:
+            wait_for_resource(wait["path"], wait["name"], ("status", wait["status"]), timedelta(seconds=wait["timeout"]),
+                              lambda obj: obj.get("statuses") or obj)
+
+        request = job["request"]
+        with job_lock(job_id):
+            # a cancellation received from now on stops the worker with SIGTERM
+            if load_job(job_id)["status"] == "canceled":
                 return
+            click.echo(f"{datetime.now():%Y-%m-%d %H:%M:%S} {request['method']} {request['path']}")
+
+        data = do_request(request["method"], request["path"], json=request.get("json"))
+        job["status"] = "succeeded"
+        job["result"] = data
+    except SystemExit:
+        # wait_for_resource already printed why
+        job["status"] = "failed"
+    except Exception as e:
+        click.echo(f"Error: {e.format_message() if isinstance(e, click.ClickException) else e}")
+        job["status"] = "failed"
+
+    with job_lock(job_id):
+        # do not overwrite a cancellation received meanwhile
+        if load_job(job_id)["status"] == "canceled":
+            return
+        save_job(job)
+    click.echo(f"{datetime.now():%Y-%m-%d %H:%M:%S} job {job_id} {job['status']}")
+
+def cancel_job(job_id):
+    """Cancel a queued or running job, stopping its worker."""
+    import signal
+
+    with job_lock(job_id):
+        job = load_job(job_id)
+        if not is_job_active(job):
+            raise click.ClickException(f"Job {job_id} is already {job['status']}")
+
+        job["status"] = "canceled"
+        save_job(job)
+
+    if job.get("pid"):
+        try:
+            os.kill(job["pid"], signal.SIGTERM)
+        except OSError:
+            logging.info("job %s worker %s already stopped", job_id, job["pid"])
+
+    return job
 
-            time.sleep(30)
-    else:  # Parent process
-        click.echo(f"Task for create cluster started in background. PID: {pid}" + text)
+def cluster_create_in_background(cluster_config, text):
+    """Queue the creation of a cluster, sent by a background job as soon as its project is ready."""
+    project_id = cluster_config.get('project_id')
+    job = submit_job(f"create cluster {cluster_config.get('name')}",
+                     {"method": "POST", "path": "clusters", "json": cluster_config},
+                     {"path": f"projects/{project_id}", "name": f"project {project_id}", "status": "ready",
+                      "timeout": int(os.getenv("OKS_JOB_TIMEOUT", 1800))})
+
+    click.echo(f"Task for create cluster started in background. Job: {job['id']}\n"
+               f"To follow it: $ oks-cli jobs logs --job-id {job['id']}" + text)
 
 def get_template(type):
     """Fetch and cache template, refresh if older than 15 minutes."""
@@ -1118,27 +2883,236 @@ def get_cluster_name(cluster_name):
         return cluster_name
 
 def format_changed_row(table, row):
-    """Format a single changed row maintaining table style."""
-    new_table = prettytable.PrettyTable()
-    new_table.field_names = table.field_names
-    if table._style:
-        new_table.set_style(table._style)
-    new_table.header = False
-
-    # Set the min width for each column
-    for i, width in enumerate(table._widths):
-        if i < len(new_table.field_names):
-            new_table.min_width[new_table.field_names[i]] = width
-
-    new_table.add_row(row)
-
-    return new_table
+    """Format a single changed row maintaining table style and column widths."""
+    return table.render_row(row)
 
 def is_interesting_status(status):
     """Check if status is in the list of interesting statuses."""
     interesting_statuses = ["pending", "deploying", "updating", "upgrading", "deleting"]
     return status in interesting_statuses
 
+class WatchScheduler:
+    """Pace the polls of a watch loop.
+    Polls every interval seconds while a resource is in progress, then backs off exponentially up to max_interval
+    once all are stable. A Retry-After sent by the API always delays the next poll at least that long.
+    """
+
+    def __init__(self, interval=2, max_interval=30, reminder_interval=10):
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.reminder_interval = reminder_interval
+        self.delay = interval
+        self.retry_after = None
+        self.elapsed = 0
+        self.last_reminder = 0
+
+    def sleep(self, limit=None):
+        """Wait until the next poll, at most limit seconds if given."""
+        delay = max(self.delay, self.retry_after or 0)
+        if limit is not None:
+            delay = max(min(delay, limit), 0)
+        self.retry_after = None
+        logging.debug("next watch poll in %s sec", delay)
+        time.sleep(delay)
+        self.elapsed += delay
+
+    def update(self, statuses):
+        """Schedule the next poll from the current statuses of the watched resources."""
+        if any(is_interesting_status(status) for status in statuses):
+            self.delay = self.interval
+        else:
+            self.delay = min(self.delay * 2, self.max_interval)
+
+    def failed(self, retry_after=None):
+        """Schedule the next poll after a failed one, honouring the Retry-After of the API."""
+        self.retry_after = retry_after
+        self.delay = min(self.delay * 2, self.max_interval)
+
+    def remind_due(self):
+        """Tell if the resources in progress should be printed again."""
+        if self.elapsed - self.last_reminder >= self.reminder_interval:
+            self.last_reminder = self.elapsed
+            return True
+        return False
+
+WAIT_EXIT_FAILED = 3
+WAIT_EXIT_TIMEOUT = 4
+
+def parse_wait_condition(ctx, param, value):
+    """Click callback parsing a --for condition, 'status=<status>' or 'delete'."""
+    if value == "delete":
+        return ("delete", None)
+
+    key, _, status = value.partition("=")
+    if key != "status" or not status:
+        raise click.BadParameter("expected 'status=<status>' or 'delete'")
+    return ("status", status)
+
+def wait_for_resource(path, name, condition, timeout, get_statuses, interval=2, max_interval=30, changed_since=None):
+    """Poll a project or cluster until the condition is met, printing status changes on stderr.
+    Returns the last object fetched (None once deleted), exits with WAIT_EXIT_FAILED if the resource failed or vanished
+    and with WAIT_EXIT_TIMEOUT once timeout (a timedelta) elapsed. Other API errors are reported and polled through.
+    changed_since: updated_at of the statuses before an action, the status condition is only met by a newer update
+    """
+    kind, expected = condition
+    deadline = time.monotonic() + timeout.total_seconds()
+    scheduler = WatchScheduler(interval, max_interval)
+    obj = None
+    last_status = None
+
+    while True:
+        try:
+            data = do_request("GET", path, conditional=True)
+        except JSONClickException as err:
+            if err.status_code != 404:
+                # other errors are transient as far as the wait is concerned, they only delay the next poll
+                click.echo(f"Error while waiting for {name}: {err}", err=True)
+                scheduler.failed(err.retry_after)
+                data = NOT_MODIFIED
+            elif kind == "delete":
+                click.echo(f"{name} deleted", err=True)
+                return None
+            else:
+                click.echo(f"{name} does not exist anymore", err=True)
+                raise SystemExit(WAIT_EXIT_FAILED)
+
+        if data is not NOT_MODIFIED:
+            obj = data
+            statuses = get_statuses(obj)
+            row, status, _ = format_row(statuses, name, False)
+
+            if status != last_status:
+                click.echo(f"{row[0]}  {row[3]}  (updated {row[2]})", err=True)
+                last_status = status
+
+            if kind == "status" and status == expected and (changed_since is None or statuses.get("updated_at") != changed_since):
+                return obj
+            if kind == "delete" and status == "deleted":
+                return None
+            if status in ("failed", "deleted"):
+                click.echo(f"{name} is {status}", err=True)
+                raise SystemExit(WAIT_EXIT_FAILED)
+
+            scheduler.update([status])
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            target = "deleted" if kind == "delete" else f"status {expected}"
+            click.echo(f"Timed out waiting for {name} to be {target}", err=True)
+            raise SystemExit(WAIT_EXIT_TIMEOUT)
+
+        scheduler.sleep(remaining)
+
+def parse_selector(ctx, param, value):
+    """Click callback parsing a --selector, comma-separated 'field=value', 'field!=value', 'tag=key=value' or 'tag=key!=value'
+    terms. Fields are dotted paths in the object, e.g. 'statuses.status=ready'. Returns a list of (path, operator, value).
+    """
+    if value is None:
+        return None
+
+    term_re = re.compile(r"\s*([^=!]+?)\s*(!=|=)\s*(.*?)\s*")
+    terms = []
+    for term in value.split(","):
+        match = term_re.fullmatch(term)
+        if match and match.group(1) == "tag" and match.group(2) == "=":
+            match = term_re.fullmatch(match.group(3))
+            if not match:
+                raise click.BadParameter(f"malformed selector term '{term}', expected tag=key=value or tag=key!=value")
+            path = ["tags", match.group(1)]
+        elif match:
+            path = match.group(1).split(".")
+        else:
+            raise click.BadParameter(f"malformed selector term '{term}', expected field=value, field!=value or tag=key=value")
+        terms.append((path, match.group(2), match.group(3)))
+    return terms
+
+def match_selector(obj, selector):
+    """Tell if an object matches all the terms of a parsed --selector."""
+    for path, operator, expected in selector:
+        value = obj
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+
+        matched = value is not None and str(value) == expected
+        if matched != (operator == "="):
+            return False
+    return True
+
+def parse_name_regex(ctx, param, value):
+    """Click callback compiling a --name-regex, matched against whole names."""
+    if value is None:
+        return None
+
+    try:
+        return re.compile(value)
+    except re.error as err:
+        raise click.BadParameter(f"invalid regular expression: {err}")
+
+def select_resources(items, selector=None, name_regex=None):
+    """Return the projects or clusters matching a parsed --selector and whose whole name matches --name-regex."""
+    return [item for item in items
+            if (selector is None or match_selector(item, selector))
+            and (name_regex is None or name_regex.fullmatch(item.get("name") or ""))]
+
+def delete_resources(resources, max_concurrent=4, rate=5, timeout=None):
+    """Delete the projects or clusters concurrently, sending at most rate DELETE requests per second.
+    resources: list of (API path, name); with a timeout each resource is also waited for until it is gone.
+    Returns "deleted" or "failed: <reason>" for each resource.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    bucket = TokenBucket(rate)
+
+    def delete(resource):
+        path, name = resource
+        bucket.acquire()
+
+        try:
+            do_request("DELETE", path)
+            if timeout is None:
+                click.echo(f"{name} deletion requested", err=True)
+            else:
+                wait_for_resource(path, name, ("delete", None), timeout, lambda obj: obj.get("statuses") or obj)
+        except click.ClickException as e:
+            return f"failed: {e.format_message()}"
+        except SystemExit:
+            # wait_for_resource already printed why
+            return "failed: not deleted"
+
+        return "deleted"
+
+    with ThreadPoolExecutor(max_workers=max_concurrent) as executor:
+        # workers run in the caller's context, which holds the logged in profile
+        futures = [executor.submit(contextvars.copy_context().run, delete, resource) for resource in resources]
+        return [future.result() for future in futures]
+
+def run_in_waves(items, func, max_concurrent=1, max_failures=0):
+    """Call func(item) on the items by waves of max_concurrent concurrent calls, each wave once the previous one is over.
+    func returns a status, those starting with "failed" count as failures as do raised errors.
+    Once there were more than max_failures failures the remaining items are "skipped". Returns the statuses in items order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def run(item):
+        try:
+            return func(item)
+        except Exception as e:
+            logging.info("%s failed: %s", item, e)
+            return f"failed: {e.format_message() if isinstance(e, click.ClickException) else e}"
+
+    statuses = []
+    with ThreadPoolExecutor(max_workers=max_concurrent) as executor:
+        for start in range(0, len(items), max_concurrent):
+            if sum(status.startswith("failed") for status in statuses) > max_failures:
+                statuses.extend(["skipped"] * (len(items) - start))
+                break
+
+            # workers run in the caller's context, which holds the logged in profile
+            wave = [executor.submit(contextvars.copy_context().run, run, item) for item in items[start:start + max_concurrent]]
+            statuses.extend(future.result() for future in wave)
+
+    return statuses
+
 def normalize_key_path(key_path: str) -> str:
     return re.sub(r'\[(\d+)\]', r'.\1', key_path)
 
@@ -33,7 +33,9 @@ setup(
         "requests>=2.32.3",
         "urllib3>=2.2.3",
         "human-readable",
+        "jmespath>=1.0.1",
         "prettytable",
+        "wcwidth>=0.3.0",
         "python-dateutil",
         "altgraph>=0.17.4",
         "pynacl>=1.5.0",
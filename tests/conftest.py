@@ -22,6 +22,13 @@ def fake_config(monkeypatch, tmp_path):
 
     monkeypatch.setattr("os.path.expanduser", fake_expanduser)
 
+@pytest.fixture(autouse=True)
+def clear_request_cache():
+    from oks_cli import utils
+    utils.clear_request_cache()
+    utils.reset_request_guards()
+    utils._index_hits.clear()
+
 @pytest.fixture()
 def add_default_profile():
     config_path = os.path.expanduser("~/.oks_cli/config.json")
@@ -37,4 +44,43 @@ def add_default_profile():
                 }
             }
             profiles = json.dumps(profiles)
-            file.write(profiles)
\ No newline at end of file
+            file.write(profiles)
+
+@pytest.fixture()
+def make_kubeconfig():
+    """Build a kubeconfig holding a self-signed client certificate valid for the given number of days."""
+    import base64
+    import datetime
+    import yaml
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    def _make_kubeconfig(days=30, user="admin", group="system:masters", server="https://12345.oks.outscale.com:6443", token=None):
+        key = ec.generate_private_key(ec.SECP256R1())
+        subject = x509.Name([
+            x509.NameAttribute(NameOID.COMMON_NAME, user),
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, group),
+        ])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = x509.CertificateBuilder() \
+            .subject_name(subject).issuer_name(subject) \
+            .public_key(key.public_key()).serial_number(x509.random_serial_number()) \
+            .not_valid_before(now - datetime.timedelta(days=1)) \
+            .not_valid_after(now + datetime.timedelta(days=days)) \
+            .sign(key, hashes.SHA256())
+        cert_data = base64.b64encode(cert.public_bytes(serialization.Encoding.PEM)).decode()
+        key_data = base64.b64encode(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                                      serialization.NoEncryption())).decode()
+
+        return yaml.safe_dump({
+            "apiVersion": "v1",
+            "kind": "Config",
+            "clusters": [{"name": "test", "cluster": {"server": server}}],
+            "users": [{"name": "admin", "user": {"client-certificate-data": cert_data, "client-key-data": key_data, **({"token": token} if token else {})}}],
+            "contexts": [{"name": "test", "context": {"cluster": "test", "user": "admin"}}],
+            "current-context": "test",
+        })
+
+    return _make_kubeconfig
@@ -0,0 +1,157 @@
+from click.testing import CliRunner
+from oks_cli.main import cli
+from unittest.mock import patch, MagicMock
+import json
+import requests
+
+MANIFESTS = """
+kind: project
+name: p1
+description: first
+---
+kind: Cluster
+project_name: p1
+name: c1
+version: "1.32"
+---
+kind: cluster
+project_name: p2
+name: c2
+description: new
+"""
+
+def _response(key, value):
+    return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, key: value})
+
+def _error_response():
+    response = MagicMock(status_code=500, headers={}, text='{"Error": "boom"}')
+    response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    return response
+
+def _fake_api(calls, fail_project=False):
+    """Route the requests of an environment holding project p2 and its cluster c2, recording the writes."""
+    def route(method, url, **kwargs):
+        path = url.split("/api/v2/")[-1]
+        if method != "GET":
+            calls.append((method, path, kwargs.get("json")))
+
+        if method == "GET" and path == "projects":
+            return _response("Projects", [{"id": "id2", "name": "p2", "status": "ready"}])
+        if method == "GET" and path == "clusters/all":
+            return _response("Clusters", [{"id": "cid2", "project_id": "id2", "name": "c2", "description": "old"}])
+        if method == "GET" and path == "templates/cluster":
+            return _response("Template", {"version": "1.31", "admin_whitelist": []})
+        if method == "POST" and path == "projects":
+            if fail_project:
+                return _error_response()
+            return _response("Project", {"id": "id1", "name": "p1", "status": "ready"})
+        if method == "POST" and path == "clusters":
+            return _response("Cluster", {"id": "cid1", **kwargs["json"]})
+        if method == "PATCH":
+            return _response("Cluster", {"id": "cid2"})
+        raise AssertionError(f"unexpected request {method} {path}")
+    return route
+
+# Test the "apply --dry-run" command: verifies the plan against the live state, without any write
+@patch("requests.Session.request")
+def test_apply_dry_run(mock_request, add_default_profile):
+    calls = []
+    mock_request.side_effect = _fake_api(calls)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["apply", "-f", "-", "--dry-run", "-o", "json"], input=MANIFESTS)
+    assert result.exit_code == 0
+    assert calls == []
+    assert [(r["kind"], r["name"], r["action"], r["status"]) for r in json.loads(result.stdout)] == [
+        ("project", "p1", "create", "would be created"),
+        ("cluster", "c1", "create", "would be created"),
+        ("cluster", "c2", "update", "would be updated")]
+    assert json.loads(result.stdout)[2]["changes"] == {"description": {"from": "old", "to": "new"}}
+
+# Test the "apply" command: verifies a cluster is created once its project is, with only the changed fields updated
+@patch("requests.Session.request")
+def test_apply_creates_and_updates(mock_request, add_default_profile):
+    calls = []
+    mock_request.side_effect = _fake_api(calls)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["apply", "-f", "-", "-o", "json"], input=MANIFESTS)
+    assert result.exit_code == 0
+    assert [r["status"] for r in json.loads(result.stdout)] == ["created", "created", "updated"]
+
+    assert ("PATCH", "clusters/cid2", {"description": "new"}) in calls
+    writes = [(method, path) for method, path, _ in calls]
+    assert writes.index(("POST", "projects")) < writes.index(("POST", "clusters"))
+    cluster = next(body for method, path, body in calls if path == "clusters")
+    assert cluster["project_id"] == "id1"
+    assert cluster["version"] == "1.32"
+
+# Test the "apply" command: verifies the clusters of a project that could not be created are skipped
+@patch("requests.Session.request")
+def test_apply_skips_dependents_of_failed_resources(mock_request, add_default_profile):
+    calls = []
+    mock_request.side_effect = _fake_api(calls, fail_project=True)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["apply", "-f", "-", "-o", "json"], input=MANIFESTS)
+    assert result.exit_code == 1
+    statuses = [r["status"] for r in json.loads(result.stdout)]
+    assert statuses[0].startswith("failed")
+    assert statuses[1] == "skipped: a dependency failed"
+    assert statuses[2] == "updated"
+    assert ("POST", "clusters") not in [(method, path) for method, path, _ in calls]
+
+# Test the "apply" command: verifies invalid documents are rejected
+def test_apply_invalid_document(add_default_profile):
+    runner = CliRunner()
+    result = runner.invoke(cli, ["apply", "-f", "-"], input="kind: nodepool\nname: np\n")
+    assert result.exit_code == 2
+    assert "kind must be one of project, cluster" in result.output
+
+# Test the "apply" command: verifies a second apply of the same file is a no-op, fields only set at creation or
+# normalized by the API not being seen as changed
+@patch("requests.Session.request")
+def test_apply_twice_writes_once(mock_request, add_default_profile):
+    live = {"id": "cid2", "project_id": "id2", "name": "c2", "description": "old", "cidr_pods": "10.91.0.0/16",
+            "admin_whitelist": ["10.0.0.0/8", "1.2.3.4/32"], "quirks": ["a", "b"],
+            "admission_flags": {"enable_admission_plugins": ["AlwaysPullImages"],
+                                "applied_admission_plugins": ["AlwaysPullImages", "NodeRestriction"]}}
+    writes = []
+
+    def route(method, url, **kwargs):
+        path = url.split("/api/v2/")[-1]
+        if method == "GET" and path == "projects":
+            return _response("Projects", [{"id": "id2", "name": "p2", "status": "ready"}])
+        if method == "GET" and path == "clusters/all":
+            return _response("Clusters", [dict(live)])
+        if method == "GET" and path == "myip":
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "x_real_ip": "1.2.3.4", "Data": {}})
+        if method == "PATCH" and path == "clusters/cid2":
+            writes.append(kwargs["json"])
+            live.update(kwargs["json"])
+            return _response("Cluster", dict(live))
+        raise AssertionError(f"unexpected request {method} {path}")
+    mock_request.side_effect = route
+
+    manifest = """
+kind: cluster
+project_name: p2
+name: c2
+description: new
+cidr_pods: 10.91.0.0/16
+cidr_service: 10.92.0.0/16
+admin_whitelist: [my-ip, 10.0.0.0/8]
+quirks: [b, a]
+tags: {}
+admission_flags:
+  enable_admission_plugins: [AlwaysPullImages]
+"""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["apply", "-f", "-", "-o", "json"], input=manifest)
+    assert result.exit_code == 0
+    assert writes == [{"description": "new"}]
+
+    result = runner.invoke(cli, ["apply", "-f", "-", "-o", "json"], input=manifest)
+    assert result.exit_code == 0
+    assert [(r["action"], r["status"]) for r in json.loads(result.stdout)] == [("unchanged", "unchanged")]
+    assert writes == [{"description": "new"}]
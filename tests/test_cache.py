@@ -1,3 +1,4 @@
+import json
 from click.testing import CliRunner
 from oks_cli.main import cli
 from unittest.mock import patch, MagicMock
@@ -7,7 +8,7 @@ def test_cache_clear_command():
     result = runner.invoke(cli, ["cache", "clear", "--force"])
     assert result.exit_code == 0
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cache_kubeconfigs_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -17,4 +18,82 @@ def test_cache_kubeconfigs_command(mock_request, add_default_profile):
     runner = CliRunner()
     result = runner.invoke(cli, ["--profile", "default", "cache", "kubeconfigs", "-p", "test", "-c", "test"])
     assert result.exit_code == 0
-    assert '| user | group | expiration date |' in result.output
\ No newline at end of file
+    assert '| user | group | expiration date |' in result.output
+
+@patch("requests.Session.request")
+def test_cache_refresh_command(mock_request, add_default_profile, make_kubeconfig):
+    from oks_cli.utils import save_cache
+    renewed = make_kubeconfig(days=30)
+    save_cache("12345", "11111", "kubeconfig", make_kubeconfig(days=30), None, None)
+    expiring = make_kubeconfig(days=0)
+    expiring_path = save_cache("12345", "22222", "kubeconfig", expiring, None, None)
+    save_cache("12345", "33333", "kubeconfig", make_kubeconfig(days=0), "alice", "dev")
+    # cached by another profile
+    save_cache("67890", "99999", "kubeconfig", make_kubeconfig(days=0), None, None)
+
+    def route(method, url, **kwargs):
+        if url.endswith("clusters/all"):
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": [
+                {"id": "11111"}, {"id": "22222"}, {"id": "33333"}]})
+        return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {"data": {"kubeconfig": renewed}}})
+    mock_request.side_effect = route
+
+    # the dry run lists the expiring kubeconfigs of the profile without renewing them
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--profile", "default", "cache", "refresh", "--expiring-within", "1d", "--dry-run", "-o", "json"])
+    assert result.exit_code == 0
+    output = json.loads(result.stdout)
+    assert sorted(e["cluster_id"] for e in output) == ["22222", "33333"]
+    assert all(e["status"] == "would be renewed" for e in output)
+    assert "Skipping 1 kubeconfigs of clusters not in the profile: 99999" in result.stderr
+    assert [call.args[0] for call in mock_request.call_args_list] == ["GET"]
+    with open(expiring_path) as file:
+        assert file.read() == expiring
+
+    mock_request.reset_mock()
+    result = runner.invoke(cli, ["--profile", "default", "cache", "refresh", "--expiring-within", "1d", "-o", "json"])
+    assert result.exit_code == 0
+
+    output = json.loads(result.stdout)
+    assert sorted(e["cluster_id"] for e in output) == ["22222", "33333"]
+    assert all(e["status"] == "renewed" for e in output)
+
+    paths = sorted(call.args[1] for call in mock_request.call_args_list)
+    assert paths[0].endswith("clusters/22222/kubeconfig")
+    assert paths[1].endswith("clusters/33333/kubeconfig")
+    assert paths[2].endswith("clusters/all")
+    params = {call.args[1].split("/")[-2]: call.kwargs["params"] for call in mock_request.call_args_list
+              if call.args[1].endswith("kubeconfig")}
+    assert params["33333"] == {"user": "alice", "group": "dev"}
+    with open(expiring_path) as file:
+        assert file.read() == renewed
+
+    # nothing of the profile expires anymore
+    result = runner.invoke(cli, ["--profile", "default", "cache", "refresh", "--expiring-within", "1d", "--dry-run"])
+    assert result.exit_code == 0
+    assert "would be renewed" not in result.stdout
+
+@patch("oks_cli.utils.os.fork")
+@patch("oks_cli.cluster.os.execvpe")
+@patch("requests.Session.request")
+def test_kubectl_renews_expiring_kubeconfig_in_background(mock_request, mock_execvpe, mock_fork, add_default_profile, make_kubeconfig, monkeypatch):
+    from oks_cli.utils import save_cache
+    save_cache("12345", "12345", "kubeconfig", make_kubeconfig(days=0.5), None, None)
+
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "12345"}]}),
+    ]
+    mock_fork.return_value = 1234
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "-p", "test", "-c", "test", "kubectl", "get", "pods"])
+    assert result.exit_code == 0
+    mock_fork.assert_not_called()
+
+    monkeypatch.setenv("OKS_KUBECONFIG_RENEW_BEFORE", "1d")
+    result = runner.invoke(cli, ["cluster", "-p", "test", "-c", "test", "kubectl", "get", "pods"])
+    assert result.exit_code == 0
+    mock_fork.assert_called_once()
+    assert mock_execvpe.call_count == 2
+    assert mock_request.call_count == 2
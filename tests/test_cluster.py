@@ -4,9 +4,10 @@ from unittest.mock import patch, MagicMock
 
 import json 
 import yaml
+import requests
 
 # Test the "cluster list" command: verifies region and profile are shown
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_list_command_with_region_and_profile(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -29,7 +30,7 @@ def test_cluster_list_command_with_region_and_profile(mock_request, add_default_
     assert 'default' in result.output
 
 # Test the "cluster list" command: verifies listing clusters in a project
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_list_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -41,8 +42,75 @@ def test_cluster_list_command(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert '"name": "test"' in result.output
 
+# Test the "cluster list" command with ndjson output: verifies one compact object is printed per line
+@patch("requests.Session.request")
+def test_cluster_list_ndjson(mock_request, add_default_profile):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "1", "name": "a"}, {"id": "2", "name": "b"}]}),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--profile", "default", "cluster", "list", "-p", "test", '-o', 'ndjson'])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == ['{"id":"1","name":"a"}', '{"id":"2","name":"b"}']
+
+# Test the "cluster list" command with ndjson output and a query: verifies the query applies to the whole list, as with json
+@patch("requests.Session.request")
+def test_cluster_list_ndjson_query(mock_request, add_default_profile):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Clusters": [
+            {"id": "1", "name": "a", "statuses": {"status": "ready"}}, {"id": "2", "name": "b", "statuses": {"status": "failed"}}]}),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "list", "-p", "test", "-o", "ndjson", "--query", "[?statuses.status=='ready'].name"])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == ['"a"']
+
+# Test the "cluster list --profiles -A" command: verifies the clusters of all the profiles are merged and tagged
+@patch("requests.Session.request")
+def test_cluster_list_profiles_all_projects(mock_request, add_default_profile):
+    from oks_cli.utils import set_profile
+    set_profile("other", {"region_name": "us-east-2", "type": "ak/sk", "access_key": "AK2", "secret_key": "SK2", "jwt": False})
+
+    def route(method, url, **kwargs):
+        suffix = "2" if "us-east-2" in url else "1"
+        if url.endswith("projects"):
+            body = {"Projects": [{"id": "p" + suffix, "name": "project" + suffix}]}
+        else:
+            body = {"Clusters": [{"id": "c" + suffix, "name": "cluster" + suffix, "project_id": "p" + suffix}]}
+        return MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, **body})
+    mock_request.side_effect = route
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "list", "-A", "--profiles", "default,other", "-o", "json"])
+    assert result.exit_code == 0
+    assert [(c["name"], c["project_name"], c["profile"], c["region"]) for c in json.loads(result.output)] == [
+        ("cluster1", "project1", "default", "eu-west-2"), ("cluster2", "project2", "other", "us-east-2")]
+
+# Test the "cluster list --query" command: verifies only the projection is printed, as JSON by default
+@patch("requests.Session.request")
+def test_cluster_list_query(mock_request, add_default_profile):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Clusters": [
+            {"id": "1", "name": "a", "statuses": {"status": "ready"}},
+            {"id": "2", "name": "b", "statuses": {"status": "deploying"}}]}),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--profile", "default", "cluster", "list", "-p", "test", "--query", "[?statuses.status=='ready'].name"])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == ["a"]
+
+    result = runner.invoke(cli, ["--profile", "default", "cluster", "list", "-p", "test", "--query", "[?"])
+    assert result.exit_code == 2
+    assert "invalid query" in result.output
+
 # Test the "cluster list" command with all arguments: verifies that advanced filters
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_list_all_args(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -66,16 +134,16 @@ def test_cluster_list_all_args(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert "test-cluster" in result.output
 
-# Test the "cluster list" command with --all(-A) flag
-@patch("oks_cli.utils.requests.request")
-def test_cluster_list_all(mock_request, add_default_profile):
-    mock_request.side_effect = [
-        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345", "name": "test-project"}]}),
-        MagicMock(status_code=200, headers={}, json=lambda: {
+def _route_all_clusters(project_id="12345"):
+    """Answer projects and clusters/all requests by URL, as they are sent concurrently."""
+    def route(method, url, **kwargs):
+        if url.endswith("/projects"):
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345", "name": "test-project"}]})
+        return MagicMock(status_code=200, headers={}, json=lambda: {
             "ResponseContext": {},
             "Clusters": [{
                 "id": "67890",
-                "project_id": "12345",
+                "project_id": project_id,
                 "name": "test-cluster",
                 "statuses": {
                     "status": "ready",
@@ -83,8 +151,13 @@ def test_cluster_list_all(mock_request, add_default_profile):
                     "updated_at": "2019-08-24T14:15:22Z"
                 }
             }]
-        }),
-    ]
+        })
+    return route
+
+# Test the "cluster list" command with --all(-A) flag
+@patch("requests.Session.request")
+def test_cluster_list_all(mock_request, add_default_profile):
+    mock_request.side_effect = _route_all_clusters()
 
     runner = CliRunner()
     result = runner.invoke(cli, [
@@ -97,8 +170,33 @@ def test_cluster_list_all(mock_request, add_default_profile):
     assert "test-project" in result.output
     assert "test-cluster" in result.output
 
+# Test the "cluster list -A" command: verifies the project names are cached between invocations
+@patch("requests.Session.request")
+def test_cluster_list_all_caches_project_names(mock_request, add_default_profile):
+    mock_request.side_effect = _route_all_clusters()
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "list", "-A", "--profile", "default", "-o", "json"])
+    assert result.exit_code == 0
+    assert mock_request.call_count == 2
+
+    # served from the cached names, without starting a thread
+    with patch("oks_cli.cluster.ThreadPoolExecutor") as executor:
+        result = runner.invoke(cli, ["cluster", "list", "-A", "--profile", "default", "-o", "json"])
+    assert result.exit_code == 0
+    executor.assert_not_called()
+    assert json.loads(result.output)[0]["project_name"] == "test-project"
+    assert mock_request.call_count == 3
+    assert mock_request.call_args.args[1].endswith("clusters/all")
+
+    # an unknown project shows up: projects are listed again
+    mock_request.side_effect = _route_all_clusters(project_id="54321")
+    result = runner.invoke(cli, ["cluster", "list", "-A", "--profile", "default", "-o", "json"])
+    assert result.exit_code == 0
+    assert mock_request.call_count == 5
+
 # Test the "cluster get" command: verifies fetching details of a specific cluster
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_get_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -112,7 +210,7 @@ def test_cluster_get_command(mock_request, add_default_profile):
     assert '"name": "test"' in result.output
 
 # Test the "cluster get" command with JSON output: verifies retrieving
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_get_json(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -137,7 +235,7 @@ def test_cluster_get_json(mock_request, add_default_profile):
     assert data["name"] == "test"
 
 # Test the "cluster get" command with YAML output: verifies retrieving
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_get_yaml(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -163,7 +261,7 @@ def test_cluster_get_yaml(mock_request, add_default_profile):
 
 
 # Test the "cluster create" command: verifies creating a new cluster in a project
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_create_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -178,7 +276,7 @@ def test_cluster_create_command(mock_request, add_default_profile):
     assert '"name": "test"' in result.output
 
 # Test the "cluster create" command with all arguments: verifies creating a cluster
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 @patch("oks_cli.cluster.get_template")
 def test_cluster_create_all_args(mock_get_template, mock_request, add_default_profile):
     mock_request.side_effect = [
@@ -215,7 +313,7 @@ def test_cluster_create_all_args(mock_get_template, mock_request, add_default_pr
     assert output["cp_multi_az"] is False
 
 # Test the "cluster update" command: verifies updating a cluster description (dry-run)
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_update_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -228,7 +326,7 @@ def test_cluster_update_command(mock_request, add_default_profile):
     assert '"description": "test"' in result.output
 
 # Test the "cluster update" command with all arguments: verifies updating a cluster
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_update_all_args(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(
@@ -264,7 +362,7 @@ def test_cluster_update_all_args(mock_request, add_default_profile):
     assert output["quirks"] == ["special-feature"]
 
 # Test the "cluster upgrade" command: verifies upgrading a cluster
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_upgrade_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -277,8 +375,130 @@ def test_cluster_upgrade_command(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert '"name": "test"' in result.output
 
+def _fleet_api(events, final_status="ready", latest=(), failed_upgrades=()):
+    """Route the requests of a project of 3 clusters, 2 of them tagged env=staging, recording the upgrades and polls.
+    The clusters of latest are already on 1.32, the upgrades of failed_upgrades are rejected.
+    """
+    clusters = [{"id": f"id{i}", "name": f"c{i}", "version": "1.32" if f"id{i}" in latest else "1.31",
+                 "tags": {"env": "staging" if i < 3 else "prod"},
+                 "statuses": {"status": "ready", "created_at": "2023-01-01T00:00:00Z", "updated_at": "2023-01-01T00:00:00Z"}}
+                for i in (1, 2, 3)]
+    polls = {}
+
+    def route(method, url, **kwargs):
+        path = url.split("/api/v2/")[-1]
+        if path == "projects":
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]})
+        if path == "clusters":
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": clusters})
+        if path == "clusters/limits/kubernetes_versions":
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Versions": ["1.31", "1.32"]})
+
+        cluster_id = path.split("/")[1]
+        events.append((method, cluster_id))
+        if method == "PATCH" and cluster_id in failed_upgrades:
+            error = MagicMock(status_code=409, headers={}, text='{"Error": "upgrade in progress"}')
+            error.raise_for_status.side_effect = requests.exceptions.HTTPError(response=error)
+            return error
+        if method == "PATCH":
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {"id": cluster_id}})
+
+        # the status before the upgrade is seen first, then the upgrade
+        poll = polls[cluster_id] = polls.get(cluster_id, 0) + 1
+        status, updated_at, version = [("ready", "2023-01-01T00:00:00Z", "1.31"), ("upgrading", "2023-01-02T00:00:00Z", "1.31"),
+                                       (final_status, "2023-01-03T00:00:00Z", "1.32")][min(poll, 3) - 1]
+        return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {
+            "id": cluster_id, "version": version,
+            "statuses": {"status": status, "created_at": "2023-01-01T00:00:00Z", "updated_at": updated_at}}})
+    return route
+
+# Test the "cluster upgrade --selector" command: verifies the selected clusters are upgraded one wave after the other
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_cluster_upgrade_selector_waves(mock_sleep, mock_request, add_default_profile):
+    events = []
+    mock_request.side_effect = _fleet_api(events)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "upgrade", "-p", "test", "--selector", "tag=env=staging", "--force", "-o", "json"])
+    assert result.exit_code == 0
+    assert [(c["name"], c["upgraded_version"], c["status"]) for c in json.loads(result.stdout)] == [
+        ("c1", "1.32", "upgraded"), ("c2", "1.32", "upgraded")]
+
+    # c2 is upgraded once c1 is ready again, c3 is not selected
+    assert events == [("PATCH", "id1")] + [("GET", "id1")] * 3 + [("PATCH", "id2")] + [("GET", "id2")] * 3
+
+    result = runner.invoke(cli, ["cluster", "upgrade", "-p", "test", "--all", "--dry-run"])
+    assert result.exit_code == 0
+    assert result.output.count("would be upgraded") == 3
+
+    result = runner.invoke(cli, ["cluster", "upgrade", "-p", "test", "-c", "c1", "--all"])
+    assert result.exit_code == 2
+
+# Test the "cluster upgrade --all" command: verifies the next waves are skipped once --max-failures is exceeded
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_cluster_upgrade_all_max_failures(mock_sleep, mock_request, add_default_profile):
+    events = []
+    mock_request.side_effect = _fleet_api(events, final_status="failed")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "upgrade", "-p", "test", "--all", "--max-concurrent", "2", "--force", "-o", "json"])
+    assert result.exit_code == 1
+    assert [c["status"] for c in json.loads(result.stdout)] == ["failed: not ready", "failed: not ready", "skipped"]
+    assert ("PATCH", "id3") not in events
+
+# Test the "cluster upgrade --all" command: verifies clusters on the latest version are not waited for and rejected upgrades are reported
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_cluster_upgrade_all_up_to_date_and_rejected(mock_sleep, mock_request, add_default_profile):
+    events = []
+    mock_request.side_effect = _fleet_api(events, latest=("id1",), failed_upgrades=("id2",))
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "upgrade", "-p", "test", "--all", "--max-failures", "1", "--force", "-o", "json"])
+    assert result.exit_code == 1
+    assert [(c["name"], c["upgraded_version"], c["status"]) for c in json.loads(result.stdout)] == [
+        ("c1", "1.32", "up to date"), ("c2", None, 'failed: {"Error": "upgrade in progress"}'), ("c3", "1.32", "upgraded")]
+    assert ("PATCH", "id1") not in events
+    assert "[1/3] c1 up to date" in result.stderr
+    assert '[2/3] c2 failed: {"Error": "upgrade in progress"}' in result.stderr
+
+# Test the "cluster delete --selector" command: verifies one confirmation for all the selected clusters, protected ones skipped
+@patch("requests.Session.request")
+def test_cluster_delete_selector(mock_request, add_default_profile):
+    clusters = [{"id": "c1", "name": "a", "tags": {"env": "ci"}}, {"id": "c2", "name": "b", "tags": {"env": "ci"}},
+                {"id": "c3", "name": "c", "tags": {"env": "ci"}, "disable_api_termination": True},
+                {"id": "c4", "name": "d", "tags": {"env": "prod"}}]
+    deleted = []
+
+    def route(method, url, **kwargs):
+        path = url.split("/api/v2/")[-1]
+        if method == "DELETE":
+            deleted.append(path)
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Details": "deleting"})
+        if path == "projects":
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]})
+        return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": clusters})
+    mock_request.side_effect = route
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "delete", "-p", "test", "--selector", "tag=env=ci"], input="n\n")
+    assert result.exit_code == 1
+    assert "delete 2 clusters: a, b?" in result.output
+    assert deleted == []
+
+    result = runner.invoke(cli, ["cluster", "delete", "-p", "test", "--selector", "tag=env=ci"], input="y\n")
+    assert result.exit_code == 1
+    assert sorted(deleted) == ["clusters/c1", "clusters/c2"]
+    assert "skipped: api termination disabled" in result.stdout
+
+    result = runner.invoke(cli, ["cluster", "delete", "-p", "test", "--name-regex", "a|b", "--force", "-o", "json"])
+    assert result.exit_code == 0
+    assert [e["status"] for e in json.loads(result.stdout)] == ["deleted", "deleted"]
+
 # Test the "cluster upgrade" command with JSON output
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_upgrade_command_json(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -301,7 +521,7 @@ def test_cluster_upgrade_command_json(mock_request, add_default_profile):
     assert output["name"] == "test"
 
 # Test the "cluster upgrade" command with YAML output
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_upgrade_command_yaml(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -324,7 +544,7 @@ def test_cluster_upgrade_command_yaml(mock_request, add_default_profile):
     assert output["name"] == "test"
 
 # Test the "cluster delete" command: verifies dry-run deletion message
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_delete_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -337,7 +557,7 @@ def test_cluster_delete_command(mock_request, add_default_profile):
     assert 'Dry run: The cluster would be deleted.' in result.output
 
 # Test the "cluster kubeconfig" command: verifies retrieving the kubeconfig of a cluster
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_kubeconfig_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -351,7 +571,7 @@ def test_cluster_kubeconfig_command(mock_request, add_default_profile):
     assert 'kubeconfig' in result.output
 
 # Test the "cluster kubeconfig --output table" command: verifies retrieving the kubeconfig and output as table
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_kubeconfig_info_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -365,7 +585,7 @@ def test_cluster_kubeconfig_info_command(mock_request, add_default_profile):
     assert 'Something went wrong, could not parse kubeconfig' in result.output
 
 # Test the "cluster delete" command with JSON output
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_delete_command_json(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -388,7 +608,7 @@ def test_cluster_delete_command_json(mock_request, add_default_profile):
     assert output["name"] == "test"
 
 # Test the "cluster delete" command with YAML output
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_delete_command_yaml(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -411,47 +631,61 @@ def test_cluster_delete_command_yaml(mock_request, add_default_profile):
     assert output["name"] == "test"
 
 
-# Test the "cluster kubectl" command: verifies running kubectl with the cluster's kubeconfig
-@patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
-def test_cluster_kubectl_command(mock_request, mock_run, add_default_profile):
+# Test the "cluster kubectl" command: verifies exec'ing kubectl with the cluster's kubeconfig
+@patch("oks_cli.cluster.os.execvpe")
+@patch("requests.Session.request")
+def test_cluster_kubectl_command(mock_request, mock_execvpe, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "12345"}]}),
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Cluster":  {"data": {"kubeconfig": "kubeconfig"}}})
     ]
 
-    mock_run.side_effect = [
-        MagicMock(returncode = 0, stdout = "Success", stderr = "")
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "-p", "test", "-c", "test", "kubectl", "logs", "-f", "pod"])
+    mock_execvpe.assert_called_once()
+
+    file, args, env = mock_execvpe.call_args.args
+
+    assert result.exit_code == 0
+    assert ".oks_cli/cache/12345-12345/default/default/kubeconfig" in env["KUBECONFIG"]
+    assert file == "kubectl"
+    assert args == ["kubectl", "logs", "-f", "pod"]
+
+# Test the "cluster kubectl" command: verifies a clear error when kubectl is not installed
+@patch("oks_cli.cluster.os.execvpe", side_effect=FileNotFoundError)
+@patch("requests.Session.request")
+def test_cluster_kubectl_command_not_found(mock_request, mock_execvpe, add_default_profile):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Cluster":  {"data": {"kubeconfig": "kubeconfig"}}})
     ]
 
     runner = CliRunner()
     result = runner.invoke(cli, ["cluster", "-p", "test", "-c", "test", "kubectl", "get", "pods"])
-    mock_run.assert_called()
 
-    args, kwargs = mock_run.call_args
-
-    assert result.exit_code == 0
-    assert ".oks_cli/cache/12345-12345/default/default/kubeconfig" in kwargs["env"]["KUBECONFIG"]
-    assert args[0] == ["kubectl", "get", "pods"]
+    assert result.exit_code == 1
+    assert "kubectl not found" in result.output
 
 # Test the "cluster create by one-click" command: verifies creating cluster interactively
 @patch("oks_cli.utils.os.fork")
 @patch("oks_cli.utils.time.sleep")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_create_by_one_click_command(mock_request,  mock_sleep, mock_fork):
 
-    mock_fork.return_value = 0 
+    mock_fork.return_value = 1234
 
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": []}),  # GET projects
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Template": {"name": "test"}}),  # get cluster template
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Template": {"name": "test"}}),  # get project template
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Project": {"name": "default", "id": "12345"}}), # create new project
-        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"name": "default", "id": "12345"}]}),  # find_project_id_by_name
-        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"name": "default", "id": "12345"}]}),  # login into project
-        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Project": {"id": "12345", "status": "pending"}}),  # background wait till ready
-        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Project": {"id": "12345", "status": "ready"}}),  # background
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"name": "default", "id": "12345"}]}),  # find_project_id_by_name, reused to login into project
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Project": {"id": "12345", "status": "pending",
+                  "created_at": "2023-01-01T00:00:00Z", "updated_at": "2023-01-01T00:00:00Z"}}),  # background wait till ready
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Project": {"id": "12345", "status": "ready",
+                  "created_at": "2023-01-01T00:00:00Z", "updated_at": "2023-01-01T00:00:00Z"}}),  # background
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Cluster": {"id": "cl123", "name": "test"}})
     ]
 
@@ -468,8 +702,22 @@ def test_cluster_create_by_one_click_command(mock_request,  mock_sleep, mock_for
 
     result = runner.invoke(cli, ["cluster", "create",  "-p", "default", "-c", "test"], input=input_data)
     assert result.exit_code == 0
-
-@patch("oks_cli.utils.requests.request")
+    mock_fork.assert_called_once()
+
+    # the queued job is run by the detached worker, run it here
+    from oks_cli.utils import list_jobs, load_job, run_job
+    job = list_jobs()[0]
+    assert job["status"] == "queued"
+    assert job["pid"] == 1234
+    assert f"jobs logs --job-id {job['id']}" in result.output
+
+    run_job(job["id"])
+    job = load_job(job["id"])
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"id": "cl123", "name": "test"}
+    assert mock_request.call_args.args[:1] == ("POST",)
+
+@patch("requests.Session.request")
 @patch("time.sleep")
 def test_cluster_list_watch_command(mock_sleep, mock_request, add_default_profile):
     """Test the cluster list command with --watch option"""
@@ -558,3 +806,132 @@ def test_cluster_list_watch_command(mock_sleep, mock_request, add_default_profil
     
     assert mock_request.call_count >= 3
 
+
+# Test the "cluster list --watch" command: verifies the polling interval follows the clusters statuses
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_cluster_list_watch_adaptive_interval(mock_sleep, mock_request, add_default_profile):
+    def clusters(status):
+        return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": [{
+            "id": "12345", "name": "test-cluster",
+            "statuses": {"status": status, "created_at": "2023-01-01T00:00:00Z", "updated_at": "2023-01-01T00:00:00Z"}}]})
+
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        clusters("deploying"),
+        clusters("deploying"),
+        clusters("ready"),
+        clusters("ready"),
+        clusters("ready"),
+        clusters("ready"),
+    ]
+
+    def side_effect_sleep(duration):
+        if mock_sleep.call_count > 5:
+            raise KeyboardInterrupt()
+
+    mock_sleep.side_effect = side_effect_sleep
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "list", "-p", "test", "--watch", "--interval", "1", "--max-interval", "3"])
+
+    assert result.exit_code == 0
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [1, 1, 2, 3, 3, 3]
+
+def _cluster_response(status):
+    return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {
+        "id": "12345", "name": "test",
+        "statuses": {"status": status, "created_at": "2023-01-01T00:00:00Z", "updated_at": "2023-01-01T00:00:00Z"}}})
+
+def _not_found_response():
+    response = MagicMock(status_code=404, headers={}, text='{"Error": "not found"}')
+    response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    return response
+
+# Test the "cluster wait" command: verifies polling until the cluster is ready
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_cluster_wait_command(mock_sleep, mock_request, add_default_profile):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "12345"}]}),
+        _cluster_response("deploying"),
+        _cluster_response("deploying"),
+        _cluster_response("ready"),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "wait", "-p", "test", "-c", "test", "--for", "status=ready", "-o", "json"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["statuses"]["status"] == "ready"
+    assert mock_sleep.call_count == 2
+
+# Test the "cluster wait" command: verifies an API error while polling only delays the next poll
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_cluster_wait_command_survives_api_error(mock_sleep, mock_request, add_default_profile, monkeypatch):
+    monkeypatch.setenv("OKS_RETRIES", "1")
+    error = MagicMock(status_code=500, headers={"Retry-After": "7"}, text='{"Error": "internal error"}')
+    error.raise_for_status.side_effect = requests.exceptions.HTTPError(response=error)
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "12345"}]}),
+        _cluster_response("deploying"),
+        error,
+        _cluster_response("ready"),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "wait", "-p", "test", "-c", "test", "--for", "status=ready", "-o", "json"])
+
+    assert result.exit_code == 0
+    assert "Error while waiting for test" in result.output
+    assert json.loads(result.stdout)["statuses"]["status"] == "ready"
+    assert mock_sleep.call_args_list[1].args[0] >= 7
+
+# Test the "cluster wait --for delete" command: verifies a 404 ends the wait
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_cluster_wait_delete_command(mock_sleep, mock_request, add_default_profile):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "12345"}]}),
+        _cluster_response("deleting"),
+        _not_found_response(),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "wait", "-p", "test", "-c", "test", "--for", "delete"])
+
+    assert result.exit_code == 0
+    assert "test deleted" in result.output
+    assert mock_request.call_count == 4
+
+# Test the "cluster wait" command: verifies the exit codes on failure and timeout
+@patch("oks_cli.utils.time.monotonic")
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_cluster_wait_command_failure_and_timeout(mock_sleep, mock_request, mock_monotonic, add_default_profile):
+    from oks_cli.utils import WAIT_EXIT_FAILED, WAIT_EXIT_TIMEOUT
+    mock_monotonic.side_effect = [0, 10, 0, 10, 70]
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "12345"}]}),
+        _cluster_response("pending"),
+        _cluster_response("failed"),
+        _cluster_response("pending"),
+        _cluster_response("pending"),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "wait", "-p", "test", "-c", "test", "--for", "status=ready", "--timeout", "1m"])
+    assert result.exit_code == WAIT_EXIT_FAILED
+    assert "test is failed" in result.output
+
+    result = runner.invoke(cli, ["cluster", "wait", "-p", "test", "-c", "test", "--for", "status=ready", "--timeout", "1m"])
+    assert result.exit_code == WAIT_EXIT_TIMEOUT
+    assert "Timed out waiting for test to be status ready" in result.output
+
+    result = runner.invoke(cli, ["cluster", "wait", "-p", "test", "-c", "test", "--for", "ready"])
+    assert result.exit_code == 2
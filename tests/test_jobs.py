@@ -0,0 +1,123 @@
+from click.testing import CliRunner
+from oks_cli.main import cli
+from oks_cli.utils import save_job, load_job, get_job_log_path, login_profile, run_job
+from unittest.mock import patch, MagicMock
+import json
+import os
+import requests
+
+def _job(job_id, status, pid=None):
+    job = {"id": job_id, "description": f"create cluster {job_id}", "profile": "default", "status": status,
+           "created_at": f"2025-01-01T00:00:0{len(job_id)}+00:00", "pid": pid, "wait": None,
+           "request": {"method": "POST", "path": "clusters", "json": {}}}
+    save_job(job)
+    return job
+
+# Test the "jobs list" command: verifies the jobs are listed oldest first, a queued or running job without worker as lost
+def test_jobs_list_command():
+    _job("a", "succeeded")
+    _job("bb", "queued")
+    _job("ccc", "running", pid=2 ** 22 + 1)
+    _job("dddd", "queued", pid=2 ** 22 + 2)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["jobs", "list", "-o", "json"])
+    assert result.exit_code == 0
+    assert [(job["id"], job["status"]) for job in json.loads(result.output)] == [
+        ("a", "succeeded"), ("bb", "queued"), ("ccc", "lost"), ("dddd", "lost")]
+
+    result = runner.invoke(cli, ["jobs", "list"])
+    assert result.exit_code == 0
+    assert "create cluster bb" in result.output
+
+# Test the "jobs logs" command: verifies the log of the job is printed
+def test_jobs_logs_command():
+    _job("a", "succeeded")
+    with open(get_job_log_path("a"), "w") as file:
+        file.write("project 12345  ready\nPOST clusters\n")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["jobs", "logs", "--job-id", "a", "--follow"])
+    assert result.exit_code == 0
+    assert result.output == "project 12345  ready\nPOST clusters\n"
+
+    result = runner.invoke(cli, ["jobs", "logs", "--job-id", "unknown"])
+    assert result.exit_code == 1
+    assert "Job unknown not found" in result.output
+
+# Test the "jobs cancel" command: verifies an active job is canceled and its worker stopped, not a finished one
+@patch("oks_cli.utils.os.kill")
+def test_jobs_cancel_command(mock_kill):
+    _job("a", "running", pid=1234)
+    _job("b", "succeeded")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["jobs", "cancel", "--job-id", "a"])
+    assert result.exit_code == 0
+    assert load_job("a")["status"] == "canceled"
+    assert mock_kill.call_args.args[0] == 1234
+
+    result = runner.invoke(cli, ["jobs", "cancel", "--job-id", "b"])
+    assert result.exit_code == 1
+    assert "Job b is already succeeded" in result.output
+
+def _project_response(status):
+    return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Project": {
+        "id": "12345", "status": status, "created_at": "2023-01-01T00:00:00Z", "updated_at": "2023-01-01T00:00:00Z"}})
+
+# Test the job worker: verifies an API error while waiting for the project only delays the next poll
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_run_job_survives_api_error(mock_sleep, mock_request, add_default_profile, monkeypatch):
+    monkeypatch.setenv("OKS_RETRIES", "1")
+    error = MagicMock(status_code=502, headers={}, text='{"Error": "bad gateway"}')
+    error.raise_for_status.side_effect = requests.exceptions.HTTPError(response=error)
+    mock_request.side_effect = [
+        _project_response("pending"),
+        error,
+        _project_response("ready"),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {"id": "cl123"}}),
+    ]
+    job = _job("ab", "queued")
+    job["wait"] = {"path": "projects/12345", "name": "project 12345", "status": "ready", "timeout": 60}
+    save_job(job)
+    login_profile("default")
+
+    run_job("ab")
+    assert load_job("ab")["status"] == "succeeded"
+    assert mock_request.call_args.args[0] == "POST"
+
+# Test the job worker: verifies a job canceled while queued is never run
+@patch("requests.Session.request")
+def test_run_job_canceled_while_queued(mock_request, add_default_profile):
+    _job("ab", "queued")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["jobs", "cancel", "--job-id", "ab"])
+    assert result.exit_code == 0
+
+    run_job("ab")
+    assert load_job("ab")["status"] == "canceled"
+    mock_request.assert_not_called()
+
+# Test the "jobs list" command: verifies the jobs over for longer than the retention are removed
+def test_jobs_list_prunes_old_jobs(monkeypatch):
+    _job("a", "succeeded")
+    _job("bb", "queued")
+    with open(get_job_log_path("a"), "w") as file:
+        file.write("done\n")
+    monkeypatch.setenv("OKS_JOB_RETENTION", "0")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["jobs", "list", "-o", "json"])
+    assert result.exit_code == 0
+    assert [job["id"] for job in json.loads(result.output)] == ["bb"]
+    assert not os.path.exists(get_job_log_path("a"))
+
+# Test the jobs commands: verifies a job ID can not point outside the jobs folder
+def test_jobs_reject_invalid_id():
+    runner = CliRunner()
+    for command in ("logs", "cancel"):
+        result = runner.invoke(cli, ["jobs", command, "--job-id", "../config"])
+        assert result.exit_code == 1
+        assert "Job ../config not found" in result.output
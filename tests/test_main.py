@@ -0,0 +1,45 @@
+import json
+import subprocess
+import sys
+
+from click.testing import CliRunner
+from oks_cli.main import cli
+
+# Dependencies only needed once a subcommand actually runs
+HEAVY_MODULES = ["requests", "OpenSSL", "nacl", "prettytable", "dateutil", "human_readable", "yaml"]
+
+
+def loaded_modules(code):
+    """Run python code in a fresh interpreter and return the modules it loaded."""
+    code = f"{code}\nimport sys, json; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_startup_does_not_import_heavy_dependencies():
+    modules = loaded_modules("import oks_cli.main")
+
+    assert not [m for m in modules if m.split(".")[0] in HEAVY_MODULES]
+    assert "oks_cli.cluster" not in modules
+
+
+def test_version_command_does_not_load_subcommands():
+    modules = loaded_modules("from oks_cli.main import cli; cli(['version'], standalone_mode=False)")
+
+    assert not [m for m in modules if m.split(".")[0] in HEAVY_MODULES]
+    assert not [m for m in modules if m in ["oks_cli.project", "oks_cli.cluster", "oks_cli.netpeering", "oks_cli.user"]]
+
+
+def test_subcommand_is_loaded_on_demand():
+    modules = loaded_modules("from oks_cli.main import cli; cli(['cluster', '--help'], standalone_mode=False)")
+
+    assert "oks_cli.cluster" in modules
+    assert "oks_cli.user" not in modules
+
+
+def test_fullhelp_lists_lazy_commands():
+    runner = CliRunner()
+    result = runner.invoke(cli, ["fullhelp"])
+    assert result.exit_code == 0
+    assert "Cluster related commands." in result.output
+    assert "Nodepool related commands." in result.output
@@ -6,7 +6,7 @@ import yaml
 
 
 # Test the "netpeering" command: verifies it displays help
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_command(mock_request):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -26,7 +26,7 @@ def test_netpeering_command(mock_request):
 
 # Test the "netpeering list" command: verifies output is table
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_list_table_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -60,7 +60,7 @@ def test_netpeering_list_table_command(mock_request, mock_run, add_default_profi
 
 # Test the "netpeering list" command: verifies output is yaml
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_list_yaml_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -86,7 +86,7 @@ def test_netpeering_list_yaml_command(mock_request, mock_run, add_default_profil
 
 # Test the "netpeering list -o wide" command: verifies output is wide and empty
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_list_wide_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -121,7 +121,7 @@ def test_netpeering_delete_command(add_default_profile):
     assert "--project-name must be specified" in result.stderr
 
 # Test the "netpeering delete --dry-run" command: verifies output is error and some option is missing
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_delete_dryrun_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -136,7 +136,7 @@ def test_netpeering_delete_dryrun_command(mock_request, add_default_profile):
     assert "Missing option '--netpeering-id'" in result.stderr
 
 # Test the "netpeering delete --dry-run --netpeering-id xxxxx" command: verifies dry-run option works as expected
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_delete_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -152,7 +152,7 @@ def test_netpeering_delete_command(mock_request, add_default_profile):
 
 # Test the "netpeering delete --netpeering-id xxxxx --force" command: verifies delete option works as expected
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_delete_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -182,7 +182,7 @@ def test_netpeering_delete_command(mock_request, mock_run, add_default_profile):
 
 # Test the "netpeering delete --netpeering-id xxxxx --force" command: verifies delete option fails with the right error message
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_delete_failed_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -209,7 +209,7 @@ def test_netpeering_delete_failed_command(mock_request, mock_run, add_default_pr
     assert "Could not delete NetPeering pcx-4034e83f" in result.stderr
 
 # Test the "netpeering get" command: verifies the command show missing option
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_get_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -225,7 +225,7 @@ def test_netpeering_get_command(mock_request, add_default_profile):
 
 # Test the "netpeering get --netpeering-id pcx-33e30194" command: verifies the command shows output in default json format
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_get_peeringid_json_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -252,7 +252,7 @@ def test_netpeering_get_peeringid_json_command(mock_request, mock_run, add_defau
 
 # Test the "netpeering get --netpeering-id pcx-33e30194 -o wide" command: verifies the command shows output in wide format
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_get_peeringid_wide_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -279,7 +279,7 @@ def test_netpeering_get_peeringid_wide_command(mock_request, mock_run, add_defau
 
 # Test the "netpeering get --netpeering-id pcx-33e30194 -o wide" command: verifies the command shows output in wide format
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_get_peeringid_yaml_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -308,7 +308,7 @@ def test_netpeering_get_peeringid_yaml_command(mock_request, mock_run, add_defau
 ######### CREATE NETPEERING TESTS #############
 
 # Test the "netpeering create" command: verifies an error is thrown about overlaping networks
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_create_netoverlap_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         # Project A
@@ -328,7 +328,7 @@ def test_netpeering_create_netoverlap_command(mock_request, add_default_profile)
 
 # Test the "netpeering create" command: verifies that a NetPeering already exists
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_create_peering_exists_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
 
@@ -336,8 +336,8 @@ def test_netpeering_create_peering_exists_command(mock_request, mock_run, add_de
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345", "name": "projectA", "cidr": "10.50.0.0/16"}]}),
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "12345", "project_id": "12345", "name": "clusterA"}]}),
         # Project B - gather_info
-        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345", "name": "projectB", "cidr": "10.51.0.0/16"}]}),
-        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "12345", "project_id": "12345", "name": "clusterB"}]}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "67890", "name": "projectB", "cidr": "10.51.0.0/16"}]}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "67890", "project_id": "67890", "name": "clusterB"}]}),
 
         
         # GET vpc and account id for Project A
@@ -402,7 +402,7 @@ def test_netpeering_create_peering_exists_command(mock_request, mock_run, add_de
     assert fake_response in result.output
 
 # Test the "netpeering create" command: verifies dry run
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_create_dryrun_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         # Project A - gather_info
@@ -453,7 +453,7 @@ def test_netpeering_create_dryrun_command(mock_request, add_default_profile):
 # Test the "netpeering create" command: verifies that a NetPeering fails because of an error during apply
 @patch("time.sleep")
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_create_requestexception_command(mock_request, mock_run, mock_sleep, add_default_profile):
     mock_request.side_effect = [
         # Project A - gather_info
@@ -539,7 +539,7 @@ def test_netpeering_create_requestexception_command(mock_request, mock_run, mock
 # Test the "netpeering create" command: verifies that a NetPeering state is in wrong state
 @patch("time.sleep")
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_create_netpeering_wrongstate_command(mock_request, mock_run, mock_sleep, add_default_profile):
     mock_request.side_effect = [
         # Project A - gather_info
@@ -649,7 +649,7 @@ def test_netpeering_create_netpeering_wrongstate_command(mock_request, mock_run,
 # Test the "netpeering create" command: verifies that a NetPeeringAcceptance fails
 @patch("time.sleep")
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_create_netpeeringacceptance_fails_command(mock_request, mock_run, mock_sleep, add_default_profile):
     mock_request.side_effect = [
         # Project A - gather_info
@@ -765,7 +765,7 @@ def test_netpeering_create_netpeeringacceptance_fails_command(mock_request, mock
 # Test the "netpeering create" command: verifies that a NetPeering just created has a wrong-state
 @patch("time.sleep")
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_netpeering_create_netpeering_checkstate_ok_command(mock_request, mock_run, mock_sleep, add_default_profile):
     mock_request.side_effect = [
         # Project A - gather_info
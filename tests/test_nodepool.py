@@ -4,7 +4,7 @@ from unittest.mock import patch, MagicMock
 
 
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_nodepool_list_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -27,7 +27,7 @@ def test_nodepool_list_command(mock_request, mock_run, add_default_profile):
     assert args[0] == ["kubectl", "get", "nodepool", "-o", "wide"]
 
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_nodepool_create_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -68,7 +68,7 @@ def test_nodepool_create_command(mock_request, mock_run, add_default_profile):
 
 
 @patch("oks_cli.utils.subprocess.run")
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_nodepool_delete_command(mock_request, mock_run, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
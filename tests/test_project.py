@@ -6,7 +6,7 @@ import json
 
 # START PROJECT LIST COMMAND
 # Test the "project list" command: verifies region and profile are shown
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_list_command_with_region_and_profile(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {
@@ -27,7 +27,7 @@ def test_project_list_command_with_region_and_profile(mock_request, add_default_
     assert 'default' in result.output
 
 # Test the "project list" command: verifies listing 1 projects with json
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_list_command_json(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -38,8 +38,33 @@ def test_project_list_command_json(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert '"id": "12345' in result.output
 
+# Test the "project list --profiles" command: verifies the profiles are queried and their projects tagged
+@patch("requests.Session.request")
+def test_project_list_profiles_fan_out(mock_request, add_default_profile):
+    from oks_cli.utils import set_profile
+    set_profile("other", {"region_name": "cloudgouv-eu-west-1", "type": "ak/sk", "access_key": "AK2", "secret_key": "SK2", "jwt": False})
+
+    def route(method, url, **kwargs):
+        project = {"id": "2" if "cloudgouv-eu-west-1" in url else "1", "name": "test", "status": "ready",
+                   "created_at": "2019-08-24T14:15:22Z", "updated_at": "2019-08-24T14:15:22Z"}
+        return MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [project]})
+    mock_request.side_effect = route
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["project", "list", "--profiles", "default,other", "-o", "json"])
+    assert result.exit_code == 0
+    assert [(p["id"], p["profile"], p["region"]) for p in json.loads(result.output)] == [
+        ("1", "default", "eu-west-2"), ("2", "other", "cloudgouv-eu-west-1")]
+
+    result = runner.invoke(cli, ["project", "list", "--all-profiles"])
+    assert result.exit_code == 0
+    assert "eu-west-2" in result.output and "cloudgouv-eu-west-1" in result.output
+
+    result = runner.invoke(cli, ["project", "list", "--profiles", "default,other", "--watch"])
+    assert result.exit_code == 2
+
 # Test the "project list" command: verifies listing 1 projects with yaml
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_list_command_yaml(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -52,7 +77,7 @@ def test_project_list_command_yaml(mock_request, add_default_profile):
     assert data[0]["id"] == "12345"
 
 # Test the "project list" command: verifies listing multiples projects with json
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_list_multiple_projects_json(mock_request):
     mock_request.return_value = MagicMock(
         status_code=200,
@@ -74,7 +99,7 @@ def test_project_list_multiple_projects_json(mock_request):
     assert '"id": "67890"' in result.output
 
 # Test the "project list" command: verifies listing multiples projects with yaml
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_list_multiple_projects_yaml(mock_request):
     mock_request.return_value = MagicMock(
         status_code=200,
@@ -99,7 +124,7 @@ def test_project_list_multiple_projects_yaml(mock_request):
 
 # START PROJECT GET COMMAND
 # Test the "project get" command: verifies fetching a specific project's details
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_get_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -112,7 +137,7 @@ def test_project_get_command(mock_request, add_default_profile):
     assert '"id": "12345"' in result.output
 
 # Test the "project get" command: verifies fetching a specific project's details with output json
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_get_command_output_json(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -126,7 +151,7 @@ def test_project_get_command_output_json(mock_request, add_default_profile):
     assert '"id": "12345"' in result_json.output
 
 # Test the "project get" command: verifies fetching a specific project's details with output yaml
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_get_command_output_yaml(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -142,7 +167,7 @@ def test_project_get_command_output_yaml(mock_request, add_default_profile):
 
 # START PROJECT CREATE COMMAND
 # Test the "project create" command: verifies dry-run project creation
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_create_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Template": {}})
@@ -154,7 +179,7 @@ def test_project_create_command(mock_request, add_default_profile):
     assert '"name": "test"' in result.output
 
 # Test the "project create" command: verifies all args for project creation
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_create_all_args(mock_request):
     mock_request.return_value = MagicMock(
         status_code=200,
@@ -192,7 +217,7 @@ def test_project_create_all_args(mock_request):
 
 # START PROJECT UPDATE COMMAND
 # Test the "project update" command: verifies updating project description in dry-run mode
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_update_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]})
@@ -204,7 +229,7 @@ def test_project_update_command(mock_request, add_default_profile):
     assert '"description": "test"' in result.output
 
 # Test the "project update" command: verifies all args for project update
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_update_all_args(mock_request, add_default_profile):
     mock_request.return_value = MagicMock(
         status_code=200,
@@ -237,7 +262,7 @@ def test_project_update_all_args(mock_request, add_default_profile):
 
 # START PROJECT DELETE COMMAND
 # Test the "project delete" command: verifies dry-run deletion message
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_delete_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]})
@@ -248,8 +273,52 @@ def test_project_delete_command(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert 'Dry run: The project would be deleted.' in result.output
 
+# Test the "project delete --name-regex" command: verifies clusters are deleted before their project, protected ones skipped
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_project_delete_name_regex(mock_sleep, mock_request, add_default_profile):
+    import requests
+    projects = [{"id": "p1", "name": "ci-1"}, {"id": "p2", "name": "ci-2"}, {"id": "p3", "name": "prod-ci-1"}]
+    clusters = [{"id": "c1", "name": "a", "project_id": "p1"}, {"id": "c2", "name": "b", "project_id": "p1"},
+                {"id": "c3", "name": "c", "project_id": "p2", "disable_api_termination": True},
+                {"id": "c4", "name": "d", "project_id": "p3"}]
+    deleted = []
+
+    def route(method, url, **kwargs):
+        path = url.split("/api/v2/")[-1]
+        if method == "DELETE":
+            deleted.append(path)
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Details": "deleting"})
+        if path == "projects":
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": projects})
+        if path == "clusters/all":
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": clusters})
+
+        # a deleted cluster is gone
+        response = MagicMock(status_code=404, headers={}, text='{"Error": "not found"}')
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+        return response
+    mock_request.side_effect = route
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["project", "delete", "--name-regex", "ci-.*", "--dry-run"])
+    assert result.exit_code == 1
+    assert deleted == []
+    assert result.stdout.count("would be deleted") == 3
+
+    result = runner.invoke(cli, ["project", "delete", "--name-regex", "ci-.*", "--force", "-o", "json"])
+    assert result.exit_code == 1
+    assert [(e["kind"], e["name"], e["status"]) for e in json.loads(result.stdout)] == [
+        ("cluster", "a", "deleted"), ("cluster", "b", "deleted"), ("project", "ci-1", "deleted"),
+        ("cluster", "c", "skipped: api termination disabled"), ("project", "ci-2", "skipped: a cluster has api termination disabled")]
+    assert sorted(deleted[:2]) == ["clusters/c1", "clusters/c2"]
+    assert deleted[2:] == ["projects/p1"]
+
+    result = runner.invoke(cli, ["project", "delete", "--name-regex", "ci-["])
+    assert result.exit_code == 2
+
 # Test the "project delete" command with JSON output: verifies dry-run deletion message is valid JSON
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_delete_json(mock_request, add_default_profile):
     # Simuler la réponse de l'API
     mock_request.return_value = MagicMock(
@@ -276,7 +345,7 @@ def test_project_delete_json(mock_request, add_default_profile):
     assert data["message"] == "Dry run: The project would be deleted."
 
 # Test the "project delete" command with YAML output: verifies dry-run deletion message is valid YAML
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_delete_yaml(mock_request, add_default_profile):
     # Simuler la réponse de l'API
     mock_request.return_value = MagicMock(
@@ -305,7 +374,7 @@ def test_project_delete_yaml(mock_request, add_default_profile):
 
 # START PROJECT QUOTAS COMMAND
 # Test the "project quotas" command: verifies fetching project quotas
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_quotas_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -317,7 +386,7 @@ def test_project_quotas_command(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert '[]' in result.output
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_quotas_json(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -339,7 +408,7 @@ def test_project_quotas_json(mock_request, add_default_profile):
     assert data == []
 
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_quotas_yaml(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -363,7 +432,7 @@ def test_project_quotas_yaml(mock_request, add_default_profile):
 
 # START PROJECT SNAPSHOT COMMAND
 # Test the "project snapshots" command: verifies fetching project snapshots
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_snapshots_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -375,7 +444,7 @@ def test_project_snapshots_command(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert '[]' in result.output
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_snapshots_json(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -396,7 +465,7 @@ def test_project_snapshots_json(mock_request, add_default_profile):
     assert isinstance(data, list)
     assert data == []
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_snapshots_yaml(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -420,7 +489,7 @@ def test_project_snapshots_yaml(mock_request, add_default_profile):
 
 # START PROJECT PUBLICIPS COMMAND
 # Test the "project publicips" command: verifies fetching project public IPs
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_publicips_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -432,7 +501,7 @@ def test_project_publicips_command(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert '[]' in result.output
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_publicips_json(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -453,7 +522,7 @@ def test_project_publicips_json(mock_request, add_default_profile):
     assert isinstance(data, list)
     assert data == []
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_publicips_yaml(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -491,7 +560,7 @@ nets = [{
     ]
 }]
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_nets_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -506,7 +575,7 @@ def test_project_nets_command(mock_request, add_default_profile):
     assert isinstance(data, list)
     assert data == nets
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_nets_json(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -527,7 +596,7 @@ def test_project_nets_json(mock_request, add_default_profile):
     assert isinstance(data, list)
     assert data == nets
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_project_nets_yaml(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -551,7 +620,7 @@ def test_project_nets_yaml(mock_request, add_default_profile):
 
 
 # Test the "project list" command with --watch option
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 @patch("time.sleep")
 def test_project_list_watch_command(mock_sleep, mock_request, add_default_profile):
     """Test the project list command with --watch option"""
@@ -655,4 +724,120 @@ def test_project_list_watch_command(mock_sleep, mock_request, add_default_profil
     assert mock_sleep.called
     
     # Verify multiple API calls were made (at least 3 for watching)
-    assert mock_request.call_count >= 3
\ No newline at end of file
+    assert mock_request.call_count >= 3
+
+# Test the "project list --watch" command: verifies polls are conditional and unchanged payloads are not rendered again
+@patch("oks_cli.project.format_changed_row")
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_project_list_watch_conditional_requests(mock_sleep, mock_request, mock_changed_row, add_default_profile):
+    project = {"id": "12345", "name": "test-project", "created_at": "2023-01-01T00:00:00Z",
+               "updated_at": "2023-01-01T00:00:00Z", "status": "ready"}
+
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={"ETag": '"v1"'}, json=lambda: {"ResponseContext": {}, "Projects": [project]}),
+        MagicMock(status_code=304, headers={}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{**project, "status": "deleting"}]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{**project, "status": "deleting"}]}),
+    ]
+
+    def side_effect_sleep(duration):
+        if mock_sleep.call_count > 3:
+            raise KeyboardInterrupt()
+
+    mock_sleep.side_effect = side_effect_sleep
+    mock_changed_row.return_value = "changed row"
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["project", "list", "--watch"])
+
+    assert result.exit_code == 0
+    assert mock_request.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert "If-None-Match" not in mock_request.call_args_list[3].kwargs["headers"]
+    # only the status change is printed, the 304 and the identical payload are skipped
+    assert mock_changed_row.call_count == 1
+
+# Test the "project list --watch -o ndjson" command: verifies change events are printed instead of table rows
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_project_list_watch_ndjson_events(mock_sleep, mock_request, add_default_profile):
+    project = {"id": "12345", "name": "test-project", "created_at": "2023-01-01T00:00:00Z",
+               "updated_at": "2023-01-01T00:00:00Z", "status": "pending"}
+    other = {**project, "id": "67890", "name": "other-project"}
+
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [project, other]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{**project, "status": "ready"}]}),
+    ]
+
+    def side_effect_sleep(duration):
+        if mock_sleep.call_count > 1:
+            raise KeyboardInterrupt()
+
+    mock_sleep.side_effect = side_effect_sleep
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["project", "list", "--watch", "-o", "ndjson"])
+
+    assert result.exit_code == 0
+    events = [json.loads(line) for line in result.stdout.splitlines() if line]
+    assert [(e["type"], e["object"]["name"], e["object"]["status"]) for e in events] == [
+        ("ADDED", "test-project", "pending"),
+        ("ADDED", "other-project", "pending"),
+        ("DELETED", "other-project", "deleted"),
+        ("MODIFIED", "test-project", "ready"),
+    ]
+
+# Test the "project list --watch -o ndjson --query" command: verifies events carry the projection compiled once
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_project_list_watch_ndjson_query(mock_sleep, mock_request, add_default_profile):
+    from oks_cli import utils
+
+    project = {"id": "12345", "name": "test-project", "created_at": "2023-01-01T00:00:00Z",
+               "updated_at": "2023-01-01T00:00:00Z", "status": "pending"}
+
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [project]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{**project, "status": "ready"}]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": []}),
+    ]
+
+    def side_effect_sleep(duration):
+        if mock_sleep.call_count > 2:
+            raise KeyboardInterrupt()
+
+    mock_sleep.side_effect = side_effect_sleep
+
+    runner = CliRunner()
+    with patch("oks_cli.utils.compile_query", wraps=utils.compile_query) as mock_compile:
+        result = runner.invoke(cli, ["project", "list", "--watch", "-o", "ndjson", "--query", "{name: name, status: status}"])
+
+    assert result.exit_code == 0
+    assert mock_compile.call_count == 1
+    assert [json.loads(line) for line in result.stdout.splitlines() if line] == [
+        {"type": "ADDED", "object": {"name": "test-project", "status": "pending"}},
+        {"type": "MODIFIED", "object": {"name": "test-project", "status": "ready"}},
+        {"type": "DELETED", "object": {"name": "test-project", "status": "deleted"}},
+    ]
+
+# Test the "project wait" command: verifies polling until the project is ready
+@patch("requests.Session.request")
+@patch("time.sleep")
+def test_project_wait_command(mock_sleep, mock_request, add_default_profile):
+    def project_response(status):
+        return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Project": {
+            "id": "12345", "name": "test", "status": status,
+            "created_at": "2023-01-01T00:00:00Z", "updated_at": "2023-01-01T00:00:00Z"}})
+
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        project_response("pending"),
+        project_response("ready"),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["project", "wait", "-p", "test", "--for", "status=ready", "--interval", "5"])
+
+    assert result.exit_code == 0
+    mock_sleep.assert_called_once_with(5)
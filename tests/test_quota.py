@@ -2,7 +2,7 @@ from click.testing import CliRunner
 from oks_cli.main import cli
 from unittest.mock import patch, MagicMock
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_quotas_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda:  {"ResponseContext": {}, "Quotas": []})
@@ -14,7 +14,7 @@ def test_quotas_command(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert "[]" in result.output
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_quotas_command_table(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda:  {"ResponseContext": {}, "Quotas": []})
@@ -42,7 +42,7 @@ def test_bash_completion_suggestions():
     result = runner.invoke(cli, [], env=env)
     assert "plain,cluster" in result.output
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_cluster_dynamic_shell_completion_suggestions(mock_request, add_default_profile):
     def get_env(action: str, flag: str):
         return {
@@ -102,3 +102,78 @@ def test_profile_dynamic_shell_completion_suggestions(add_default_profile):
 
     result = runner.invoke(cli, [], env=env)
     assert "plain,default" in result.output
+
+def get_project_completion_env():
+    return {
+        "_CLI_COMPLETE": "bash_complete",
+        "COMP_WORDS": "cli project get -p",
+        "COMP_CWORD": "4",
+        "COMP_LINE": "cli project get -p ",
+        "COMP_POINT": str(len("cli project get -p ")),
+    }
+
+@patch("requests.Session.request")
+def test_project_completion_served_from_cache(mock_request, add_default_profile):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345", "name": "project-a"}]})
+    ]
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [], env=get_project_completion_env())
+    assert "plain,project-a" in result.output
+
+    result = runner.invoke(cli, [], env=get_project_completion_env())
+    assert "plain,project-a" in result.output
+    assert mock_request.call_count == 1
+
+@patch("oks_cli.utils.os.fork")
+@patch("requests.Session.request")
+def test_stale_completion_revalidated_in_background(mock_request, mock_fork, add_default_profile, monkeypatch):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345", "name": "project-a"}]})
+    ]
+    mock_fork.return_value = 1234  # parent side of the fork
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [], env=get_project_completion_env())
+    assert "plain,project-a" in result.output
+
+    monkeypatch.setenv("OKS_COMPLETION_TTL", "-1")
+    result = runner.invoke(cli, [], env=get_project_completion_env())
+    assert "plain,project-a" in result.output
+    assert mock_request.call_count == 1
+    mock_fork.assert_called_once()
+
+    # a refresh is already running, do not start another one
+    monkeypatch.setenv("OKS_COMPLETION_TTL", "60")
+    result = runner.invoke(cli, [], env=get_project_completion_env())
+    mock_fork.assert_called_once()
+
+@patch("requests.Session.request")
+def test_cluster_completion_follows_mutations(mock_request, add_default_profile):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345", "name": "project-a"}]}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "67890", "name": "cluster-a", "project_id": "12345"}]}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Cluster": {"id": "13579", "name": "cluster-b", "project_id": "12345"}}),
+        MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Details": "deleted"}),
+    ]
+    env = {
+        "_CLI_COMPLETE": "bash_complete",
+        "COMP_WORDS": "cli cluster get -p project-a -c",
+        "COMP_CWORD": "6",
+        "COMP_LINE": "cli cluster get -p project-a -c ",
+        "COMP_POINT": str(len("cli cluster get -p project-a -c ")),
+    }
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [], env=env)
+    assert "plain,cluster-a" in result.output
+
+    from oks_cli.utils import do_request
+    do_request("POST", "clusters", json={"name": "cluster-b"})
+    do_request("DELETE", "clusters/67890")
+
+    result = runner.invoke(cli, [], env=env)
+    assert "plain,cluster-b" in result.output
+    assert "plain,cluster-a" not in result.output
+    assert mock_request.call_count == 4
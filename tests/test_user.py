@@ -2,7 +2,7 @@ from click.testing import CliRunner
 from oks_cli.main import cli
 from unittest.mock import patch, MagicMock
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_user_list_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -14,7 +14,7 @@ def test_user_list_command(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert 'USER | ACCESS KEY' in result.output
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_user_create_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -43,7 +43,7 @@ def test_user_create_command(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert 'bla@email.local' in result.output
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_user_delete_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers = {}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -55,7 +55,7 @@ def test_user_delete_command(mock_request, add_default_profile):
     assert result.exit_code == 0
     assert 'User has been deleted.' in result.output
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
 def test_user_types_command(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
@@ -71,7 +71,29 @@ def test_user_types_command(mock_request, add_default_profile):
     assert 'OKSSnapshotsManager' in result.output
     assert 'OKSVolumesManager' in result.output
 
-@patch("oks_cli.utils.requests.request")
+@patch("requests.Session.request")
+def test_user_types_command_plain(mock_request, add_default_profile):
+    import prettytable
+
+    types = [{"UserType": "OKSSnapshotsManager", "Description": "OKS user with full access to snapshots"},
+             {"UserType": "OKSVolumesManager", "Description": None}]
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "EimUserTypes": types})
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["user", "types", "-p", "test", "--plain"])
+    assert result.exit_code == 0
+
+    table = prettytable.PrettyTable()
+    table.field_names = ["USER TYPE", "DESCRIPTION"]
+    table.set_style(prettytable.TableStyle.PLAIN_COLUMNS)
+    table.add_row(["OKSSnapshotsManager", "OKS user with full access to snapshots"])
+    table.add_row(["OKSVolumesManager", "-"])
+    assert result.output == f"{table}\n"
+
+@patch("requests.Session.request")
 def test_user_types_command_json(mock_request, add_default_profile):
     mock_request.side_effect = [
         MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
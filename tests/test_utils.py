@@ -0,0 +1,918 @@
+import json
+import os
+import socket
+import threading
+import time
+import click
+import requests
+import pytest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from oks_cli import utils
+from oks_cli.utils import do_request
+from oks_cli.main import cli
+from click.testing import CliRunner
+from unittest.mock import patch, MagicMock
+
+
+class _FakeAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        body = json.dumps({"ResponseContext": {}, "Projects": [{"id": "12345", "name": "test"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def fake_api(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeAPIHandler)
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv("OKS_ENDPOINT", f"http://127.0.0.1:{server.server_address[1]}/api/v2/")
+    monkeypatch.setenv("OKS_ACCESS_KEY", "AK")
+    monkeypatch.setenv("OKS_SECRET_KEY", "SK")
+    monkeypatch.delenv("OKS_PROFILE", raising=False)
+    monkeypatch.setattr(utils, "_session", None)
+    # conftest fakes expanduser, which breaks the ~/.netrc lookup of real requests
+    monkeypatch.setattr("requests.sessions.get_netrc_auth", lambda url, raise_errors=False: None)
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_session_is_shared():
+    assert utils.get_session() is utils.get_session()
+
+
+def test_get_session_pool_size(monkeypatch):
+    monkeypatch.setattr(utils, "_session", None)
+    monkeypatch.setenv("OKS_POOL_CONNECTIONS", "2")
+    monkeypatch.setenv("OKS_POOL_MAXSIZE", "5")
+
+    adapter = utils.get_session().get_adapter("https://api.eu-west-2.oks.outscale.com/")
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 5
+
+
+# Benchmark: number of TCP connections opened by a command doing 5 API calls,
+# as `cluster delete` does, with and without the pooled session.
+def test_pooled_session_saves_handshakes(fake_api):
+    calls = 5
+
+    for _ in range(calls):
+        do_request("GET", "projects")
+    pooled = fake_api.connections
+
+    fake_api.connections = 0
+    for _ in range(calls):
+        requests.request("GET", f"{os.environ['OKS_ENDPOINT']}projects").close()
+    unpooled = fake_api.connections
+
+    assert pooled == 1
+    assert unpooled == calls
+
+
+def test_config_store_reads_profiles_once(add_default_profile, monkeypatch):
+    monkeypatch.setattr(utils, "config_store", utils.ConfigStore())
+    monkeypatch.setenv("OKS_PROFILE", "default")
+
+    real_open = open
+    opened = []
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(str(path))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", counting_open)
+
+    for _ in range(3):
+        utils.login_profile("default")
+        utils.build_headers()
+
+    assert len([p for p in opened if p.endswith("config.json")]) == 1
+
+
+def test_config_store_invalidated_on_write(add_default_profile, monkeypatch):
+    monkeypatch.setattr(utils, "config_store", utils.ConfigStore())
+
+    assert utils.get_profiles() == ["default"]
+
+    utils.set_profile("other", {"type": "ak/sk", "access_key": "AK", "secret_key": "SK", "region_name": "eu-west-2"})
+    assert utils.get_profiles() == ["default", "other"]
+
+    utils.remove_profile("other")
+    assert utils.get_profiles() == ["default"]
+
+
+def test_config_store_tokens_invalidated_on_save(add_default_profile, monkeypatch):
+    monkeypatch.setattr(utils, "config_store", utils.ConfigStore())
+    monkeypatch.setenv("OKS_PROFILE", "default")
+
+    assert utils.get_token("access_token") == ""
+
+    utils.save_tokens({"Access-Token": "access", "Refresh-Token": "refresh"})
+    assert utils.get_token("access_token") == "access"
+
+    utils.remove_jwt_token("access_token")
+    assert utils.get_token("access_token") == ""
+
+
+@patch("requests.Session.request")
+def test_index_resolves_names_once(mock_request, add_default_profile):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "67890"}]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {"id": "67890", "name": "test"}}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {"id": "67890", "name": "test"}}),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "get", "-p", "test", "-c", "test"])
+    assert result.exit_code == 0
+
+    result = runner.invoke(cli, ["cluster", "get", "-p", "test", "-c", "test"])
+    assert result.exit_code == 0
+    assert mock_request.call_count == 4
+    assert mock_request.call_args.args[1].endswith("clusters/67890")
+
+
+def test_index_entry_expires(add_default_profile, monkeypatch):
+    monkeypatch.setenv("OKS_PROFILE", "default")
+
+    utils.set_index_id("projects", "test", "12345")
+    assert utils.get_index_id("projects", "test") == "12345"
+
+    monkeypatch.setenv("OKS_INDEX_TTL", "0")
+    assert utils.get_index_id("projects", "test") is None
+
+
+def test_index_forgets_deleted_ids(add_default_profile, monkeypatch):
+    monkeypatch.setenv("OKS_PROFILE", "default")
+
+    utils.set_index_id("projects", "test", "12345")
+    utils.set_index_id("clusters", "12345/test", "67890")
+    utils.set_index_id("clusters", "54321/other", "09876")
+
+    utils.forget_index_ids("clusters/67890")
+    assert utils.get_index_id("clusters", "12345/test") is None
+    assert utils.get_index_id("projects", "test") == "12345"
+
+    utils.forget_index_ids("projects/54321")
+    assert utils.get_index_id("clusters", "54321/other") is None
+
+
+@patch("requests.Session.request")
+def test_index_falls_back_to_api_for_recreated_name(mock_request, add_default_profile, monkeypatch):
+    monkeypatch.setenv("OKS_PROFILE", "default")
+    utils.set_index_id("projects", "test", "old")
+
+    def route(method, url, **kwargs):
+        path = url.split("/api/v2/")[-1]
+        if path == "projects" and kwargs.get("params") == {"name": "test"}:
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "new"}]})
+        if path == "projects/new":
+            return MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Project": {"id": "new", "name": "test"}})
+        response = MagicMock(status_code=404, headers={}, text='{"Error": "not found"}')
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+        return response
+    mock_request.side_effect = route
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["project", "get", "-p", "test", "-o", "json"])
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["id"] == "new"
+    assert [call.args[1].split("/api/v2/")[-1] for call in mock_request.call_args_list] == ["projects/old", "projects", "projects/new"]
+    assert utils.get_index_id("projects", "test") == "new"
+
+
+@patch("requests.Session.request")
+def test_request_cache_deduplicates_gets(mock_request, add_default_profile):
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {"id": "67890", "name": "test"}}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {"id": "67890", "name": "test"}}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {"id": "67890", "name": "updated"}}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Cluster": {"id": "67890", "name": "updated"}}),
+    ]
+    utils.login_profile("default")
+
+    first = do_request("GET", "clusters/67890")
+    first["name"] = "modified by caller"
+    assert do_request("GET", "clusters/67890")["name"] == "test"
+    assert mock_request.call_count == 1
+
+    do_request("PATCH", "clusters/67890", json={"name": "updated"})
+    assert do_request("GET", "clusters/67890")["name"] == "updated"
+    assert mock_request.call_count == 3
+
+    assert do_request("GET", "clusters/67890", use_cache=False)["name"] == "updated"
+    assert mock_request.call_count == 4
+
+
+def test_kubeconfig_metadata_sidecar_written_on_save(make_kubeconfig):
+    path = utils.save_cache("12345", "67890", "kubeconfig", make_kubeconfig(days=30), "default", "default")
+
+    with open(f"{path}.meta") as f:
+        metadata = json.load(f)
+
+    assert metadata["cn"] == "CN=admin/O=system:masters"
+    assert metadata["server"] == "https://12345.oks.outscale.com:6443"
+    assert metadata["size"] == os.stat(path).st_size
+    assert utils.is_kubeconfig_valid(path)
+
+
+def test_kubeconfig_metadata_skips_parsing(make_kubeconfig, monkeypatch):
+    path = utils.save_cache("12345", "67890", "kubeconfig", make_kubeconfig(days=30), "default", "default")
+
+    parse = MagicMock(side_effect=AssertionError("kubeconfig parsed again"))
+    monkeypatch.setattr(utils, "kubeconfig_metadata", parse)
+
+    assert utils.is_kubeconfig_valid(path)
+
+    # touching the file without changing it only costs a checksum
+    os.utime(path, ns=(0, 0))
+    assert utils.is_kubeconfig_valid(path)
+    assert utils.get_kubeconfig_metadata(path)["mtime_ns"] == 0
+
+
+def test_kubeconfig_metadata_reparsed_on_change(make_kubeconfig):
+    path = utils.save_cache("12345", "67890", "kubeconfig", make_kubeconfig(days=30), "default", "default")
+    assert utils.is_kubeconfig_valid(path)
+
+    with open(path, "w") as f:
+        f.write(make_kubeconfig(days=-1))
+    os.utime(path, ns=(1, 1))
+    assert not utils.is_kubeconfig_valid(path)
+
+    os.remove(f"{path}.meta")
+    assert not utils.is_kubeconfig_valid(path)
+
+
+@patch("requests.Session.request")
+def test_cluster_kubeconfig_served_from_cache(mock_request, add_default_profile, make_kubeconfig, monkeypatch):
+    kubeconfig = make_kubeconfig(days=30)
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": [{"id": "12345"}]}),
+        MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Clusters": [{"id": "67890"}]}),
+    ]
+    utils.save_cache("12345", "67890", "kubeconfig", kubeconfig, "default", "default")
+
+    import yaml
+    monkeypatch.setattr(yaml, "load", MagicMock(side_effect=AssertionError("kubeconfig parsed")))
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "kubeconfig", "-p", "test", "-c", "test"])
+    assert result.exit_code == 0
+    assert result.output.strip() == kubeconfig.strip()
+    assert mock_request.call_count == 2
+
+
+def test_compile_query():
+    import click
+
+    clusters = [
+        {"id": "1", "name": "a", "version": "1.31", "statuses": {"status": "ready"}, "tags": {"env": "prod"}},
+        {"id": "2", "name": "b", "version": "1.30", "statuses": {"status": "failed"}},
+    ]
+
+    assert utils.compile_query("[*].name")(clusters) == ["a", "b"]
+    assert utils.compile_query("[?statuses.status=='ready'].name")(clusters) == ["a"]
+    assert utils.compile_query("[?statuses.status=='ready' || !tags].{n: name, s: statuses.status}")(clusters) == \
+        [{"n": "a", "s": "ready"}, {"n": "b", "s": "failed"}]
+    assert utils.compile_query("[?tags] | length(@)")(clusters) == 1
+    assert utils.compile_query("[].[id, tags.env]")(clusters) == [["1", "prod"], ["2", None]]
+    assert utils.compile_query("[?statuses.status!='ready'] | [0].id")(clusters) == "2"
+    assert utils.compile_query("[-1].name")(clusters) == "b"
+    assert utils.compile_query("missing.field")(clusters) is None
+
+    for expression in ["", "[?name==", "a..b", "{a}", "name #"]:
+        with pytest.raises(click.BadParameter):
+            utils.compile_query(expression)
+
+    with pytest.raises(click.ClickException):
+        utils.compile_query("length(@)")(1)
+
+
+@pytest.mark.parametrize("style", [None, "PLAIN_COLUMNS", "MSWORD_FRIENDLY"])
+@pytest.mark.parametrize("align", ["l", "c"])
+def test_table_renderer_matches_prettytable(style, align):
+    import click
+    import prettytable
+
+    fields = ["NAME", "STATUS", "CREATED", "VERSION"]
+    min_width = {"CREATED": 13, "STATUS": 10}
+    rows = [
+        ["a", click.style("ready", fg="green"), "2 days", 1.31],
+        ["déployé-名前", click.style("deploying", fg="yellow"), "now", None],
+        ["multi\nline", "", "tab\there", 3],
+    ]
+    changed = ["a-much-longer-cluster-name", click.style("deleting", fg="yellow"), "now", ""]
+
+    table = prettytable.PrettyTable()
+    table.field_names = fields
+    table.align = align
+    table._min_width = dict(min_width)
+    if style:
+        table.set_style(prettytable.TableStyle[style])
+
+    renderer = utils.TableRenderer(fields, style=style, align=align, min_width=min_width)
+    assert str(renderer) == str(table)
+
+    for row in rows:
+        table.add_row(list(row))
+        renderer.add_row(row)
+    assert str(renderer) == str(table)
+
+    # a changed row keeps the widths of the printed table
+    expected = prettytable.PrettyTable()
+    expected.field_names = fields
+    expected.align = align
+    if style:
+        expected.set_style(prettytable.TableStyle[style])
+    expected.header = False
+    expected.min_width = dict(zip(fields, table._widths))
+    expected.add_row(changed)
+    assert renderer.render_row(changed) == str(expected)
+
+
+def test_print_table_other_styles(capsys):
+    import prettytable
+
+    data = [{"name": "a", "status": "ready"}]
+    fields = [["NAME", "name"], ["STATUS", "status"]]
+
+    table = prettytable.PrettyTable()
+    table.field_names = ["NAME", "STATUS"]
+    table.align = "l"
+    table.add_row(["a", "ready"])
+
+    # unknown styles are ignored
+    utils.print_table(data, fields, style="UNKNOWN")
+    assert capsys.readouterr().out == f"{table}\n"
+
+    # styles the renderer does not reproduce are left to prettytable
+    table.set_style(prettytable.TableStyle.MARKDOWN)
+    utils.print_table(data, fields, style=prettytable.TableStyle.MARKDOWN)
+    assert capsys.readouterr().out == f"{table}\n"
+
+
+# A large listing is rendered by the table renderer as by prettytable.
+def test_table_renderer_large_listing():
+    import prettytable
+
+    fields = ["PROJECT", "CLUSTER", "PROFILE", "REGION", "CREATED", "UPDATED", "STATUS", "DEFAULT"]
+    rows = [[f"project-{i % 50}", f"cluster-{i}", "default", "eu-west-2", "2 days", "3 hours", "ready", ""]
+            for i in range(2000)]
+
+    table = prettytable.PrettyTable()
+    table.field_names = fields
+    table.set_style(prettytable.TableStyle.PLAIN_COLUMNS)
+    renderer = utils.TableRenderer(fields, style="PLAIN_COLUMNS")
+    for row in rows:
+        table.add_row(row)
+        renderer.add_row(row)
+
+    assert str(renderer) == str(table)
+
+
+def _format_relative_time_reference(value, now):
+    import dateutil.parser
+    import human_readable
+
+    # as format_row did: datetime.now(tz=date.tzinfo) - date
+    date = dateutil.parser.parse(value)
+    return human_readable.date_time((now if date.tzinfo else now.astimezone().replace(tzinfo=None)) - date)
+
+
+def test_format_relative_times_matches_human_readable():
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime(2025, 6, 15, 12, 0, 0, 500000, tzinfo=timezone.utc)
+    deltas = [timedelta(0), timedelta(milliseconds=300), timedelta(seconds=59), timedelta(minutes=1, seconds=30),
+              timedelta(hours=5, minutes=59), timedelta(days=1, hours=23), timedelta(days=45), timedelta(days=400),
+              timedelta(days=800), -timedelta(seconds=30), -timedelta(days=3, hours=2)]
+    values = [(now - delta).isoformat().replace("+00:00", "Z") for delta in deltas]
+    values += [(now - delta).astimezone(timezone(timedelta(hours=2))).isoformat() for delta in deltas]
+    values += ["2025-06-13T08:00:00", "Sun, 15 Jun 2025 09:00:00 GMT"]
+
+    assert utils.format_relative_times(values, now) == [_format_relative_time_reference(v, now) for v in values]
+    assert utils.format_relative_times([None], now) == [None]
+
+
+# The rows of a large clusters listing get the same dates as with dateutil and human_readable per row.
+def test_format_row_large_listing():
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime.now(timezone.utc)
+    statuses = [{"status": "ready",
+                 "created_at": (now - timedelta(days=i % 700, seconds=i)).isoformat().replace("+00:00", "Z"),
+                 "updated_at": (now - timedelta(minutes=i % 1440)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")}
+                for i in range(1000)]
+
+    expected = [[_format_relative_time_reference(s["created_at"], now), _format_relative_time_reference(s["updated_at"], now)]
+                for s in statuses]
+    rows = [utils.format_row(s, f"cluster-{i}", False, now)[0] for i, s in enumerate(statuses)]
+
+    assert [row[1:3] for row in rows] == expected
+
+
+def _large_clusters_payload(count=500):
+    return [{"id": f"{i:08d}", "name": f"cluster-{i}", "version": "1.32", "cp_multi_az": False,
+             "admin_whitelist": ["0.0.0.0/0"], "tags": {"env": "test", "team": "k8s"},
+             "description": "multi\nline\ndescription",
+             "statuses": {"status": "ready", "created_at": "2023-01-01T00:00:00Z", "updated_at": "2023-01-01T00:00:00Z"}}
+            for i in range(count)]
+
+
+def test_yaml_dump_renders_multiline_as_literal_block():
+    import yaml
+
+    data = {"name": "test", "script": "echo a\necho b\n", "items": [utils._LiteralStr("x\ny")]}
+    output = utils.yaml_dump(data)
+
+    assert "script: |\n  echo a\n  echo b\n" in output
+    assert output.index("name") < output.index("script")
+    assert yaml.safe_load(output) == data
+    # LibYAML and pure Python dumpers render the same document
+    assert yaml.dump(data, Dumper=utils.get_yaml_dumper(libyaml=False), sort_keys=False) == output
+
+
+# YAML emission of a large cluster list and parsing of kubeconfigs give the same results
+# with the LibYAML C loader/dumper as with the pure Python ones.
+def test_yaml_libyaml_matches_python(make_kubeconfig):
+    import yaml
+
+    if not yaml.__with_libyaml__:
+        pytest.skip("PyYAML is built without LibYAML, no comparison")
+
+    payload = _large_clusters_payload()
+    kubeconfig = make_kubeconfig(days=30)
+
+    c_dump = yaml.dump(payload, Dumper=utils.get_yaml_dumper(), sort_keys=False)
+    py_dump = yaml.dump(payload, Dumper=utils.get_yaml_dumper(libyaml=False), sort_keys=False)
+    assert c_dump == py_dump
+    assert utils.yaml_load(kubeconfig) == yaml.safe_load(kubeconfig)
+
+
+class _FakeKubeAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # headers and body are written separately, avoid Nagle delaying the body
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _send(self, status, obj):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        self.server.requests.append((method, self.path))
+        nodepools = self.server.nodepools
+
+        if self.headers.get("Authorization") != "Bearer test-token":
+            return self._send(401, {"kind": "Status", "reason": "Unauthorized", "message": "Unauthorized"})
+
+        if self.path == "/apis":
+            return self._send(200, {"groups": [
+                {"name": "apps", "preferredVersion": {"groupVersion": "apps/v1"}},
+                {"name": "oks.dev", "preferredVersion": {"groupVersion": "oks.dev/v1beta2"}},
+            ]})
+
+        if self.path == "/apis/oks.dev/v1beta2":
+            return self._send(200, {"resources": [
+                {"name": "nodepools", "singularName": "nodepool", "kind": "NodePool", "namespaced": False, "shortNames": ["np"]},
+                {"name": "nodepools/status", "singularName": "", "kind": "NodePool", "namespaced": False},
+            ]})
+
+        prefix = "/apis/oks.dev/v1beta2/nodepools"
+        if not self.path.startswith(prefix):
+            return self._send(404, {"kind": "Status", "reason": "NotFound", "message": "the server could not find the requested resource"})
+
+        name = self.path[len(prefix) + 1:]
+        if method == "POST":
+            obj = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            nodepools[obj["metadata"]["name"]] = obj
+            return self._send(201, obj)
+
+        if name and name not in nodepools:
+            return self._send(404, {"kind": "Status", "reason": "NotFound", "message": f'nodepools.oks.dev "{name}" not found'})
+
+        if method == "DELETE":
+            return self._send(200, {"kind": "Status", "status": "Success", "details": {"name": nodepools.pop(name)["metadata"]["name"]}})
+
+        items = [nodepools[name]] if name else list(nodepools.values())
+        if "as=Table" in self.headers.get("Accept", ""):
+            return self._send(200, {"kind": "Table", "columnDefinitions": [
+                {"name": "Name", "type": "string"},
+                {"name": "Nodes", "type": "integer"},
+                {"name": "Type", "type": "string", "priority": 1},
+            ], "rows": [{"cells": [i["metadata"]["name"], i["spec"]["desiredNodes"], i["spec"]["nodeType"]]} for i in items]})
+
+        return self._send(200, items[0] if name else {"kind": "NodePoolList", "items": items})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def fake_kube_api(monkeypatch, make_kubeconfig):
+    """Stand-in Kubernetes API server, with a valid cached kubeconfig for cluster 12345 of project 12345."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeKubeAPIHandler)
+    server.requests = []
+    server.nodepools = {"pool01": {"apiVersion": "oks.dev/v1beta2", "kind": "NodePool", "metadata": {"name": "pool01"},
+                                   "spec": {"desiredNodes": 2, "nodeType": "tinav6.c2r4p3"}}}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(utils, "_kube_clients", {})
+    monkeypatch.setattr("requests.sessions.get_netrc_auth", lambda url, raise_errors=False: None)
+
+    kubeconfig = make_kubeconfig(server=f"http://127.0.0.1:{server.server_address[1]}", token="test-token")
+    server.kubeconfig_path = utils.save_cache("12345", "12345", "kubeconfig", kubeconfig, None, None)
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_native_kubectl_get_create_delete(fake_kube_api, capsys):
+    path = fake_kube_api.kubeconfig_path
+
+    result = utils.run_kubectl_native(path, ["get", "nodepool", "-o", "json"], capture=True)
+    assert json.loads(result.stdout)["items"][0]["metadata"]["name"] == "pool01"
+
+    nodepool = {"apiVersion": "oks.dev/v1beta2", "kind": "NodePool", "metadata": {"name": "pool02"},
+                "spec": {"desiredNodes": 3, "nodeType": "tinav6.c4r8p1"}}
+    utils.run_kubectl_native(path, ["create", "-f", "-"], input=json.dumps(nodepool))
+    assert capsys.readouterr().out == "nodepool.oks.dev/pool02 created\n"
+
+    utils.run_kubectl_native(path, ["get", "np", "-o", "wide"])
+    assert capsys.readouterr().out.splitlines() == [
+        "NAME     NODES   TYPE",
+        "pool01   2       tinav6.c2r4p3",
+        "pool02   3       tinav6.c4r8p1",
+    ]
+
+    utils.run_kubectl_native(path, ["delete", "nodepool", "pool02"])
+    assert capsys.readouterr().out == 'nodepool.oks.dev "pool02" deleted\n'
+
+    with pytest.raises(SystemExit):
+        utils.run_kubectl_native(path, ["get", "nodepool", "pool02", "-o", "json"])
+    assert 'Error from server (NotFound): nodepools.oks.dev "pool02" not found' in capsys.readouterr().err
+
+    # discovery is done once and kept next to the kubeconfig
+    assert [r for r in fake_kube_api.requests if r[1].startswith("/apis/oks.dev/v1beta2") and r[1].count("/") == 3] == [("GET", "/apis/oks.dev/v1beta2")]
+    assert (path.parent / "discovery.json").exists()
+
+
+def test_native_kubectl_falls_back(fake_kube_api, monkeypatch):
+    path = fake_kube_api.kubeconfig_path
+
+    assert utils.run_kubectl_native(path, ["logs", "-f", "pod"]) is None
+    assert utils.run_kubectl_native(path, ["get", "nodepool", "-o", "jsonpath={.items}"]) is None
+    assert utils.run_kubectl_native(path, ["get", "pods"]) is None
+
+    monkeypatch.setenv("OKS_KUBE_CLIENT", "kubectl")
+    assert utils.run_kubectl_native(path, ["get", "nodepool"]) is None
+
+
+@patch("oks_cli.utils.subprocess.run")
+def test_nodepool_list_uses_native_client(mock_run, fake_kube_api, add_default_profile, monkeypatch):
+    monkeypatch.setenv("OKS_PROFILE", "default")
+    utils.set_index_id("projects", "test", "12345")
+    utils.set_index_id("clusters", "12345/test", "12345")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cluster", "nodepool", "-p", "test", "-c", "test", "list"])
+
+    assert result.exit_code == 0, result.output
+    assert "pool01   2       tinav6.c2r4p3" in result.output
+    mock_run.assert_not_called()
+
+
+# Repeated nodepool gets against a local stand-in API server reuse the cached native client.
+def test_native_client_repeated_calls(fake_kube_api):
+    path = fake_kube_api.kubeconfig_path
+
+    first = utils.run_kubectl_native(path, ["get", "nodepool", "-o", "json"], capture=True)
+    for _ in range(20):
+        result = utils.run_kubectl_native(path, ["get", "nodepool", "-o", "json"], capture=True)
+        assert result.returncode == 0
+        assert result.stdout == first.stdout
+    assert len(utils._kube_clients) == 1
+
+
+@patch("requests.Session.request")
+def test_conditional_request_not_modified(mock_request, add_default_profile):
+    payload = {"ResponseContext": {}, "Projects": [{"id": "12345", "name": "test"}]}
+    mock_request.side_effect = [
+        MagicMock(status_code=200, headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}, json=lambda: payload),
+        MagicMock(status_code=304, headers={}),
+        MagicMock(status_code=200, headers={}, json=lambda: payload),
+        MagicMock(status_code=200, headers={}, json=lambda: {**payload, "Projects": []}),
+        MagicMock(status_code=200, headers={}, json=lambda: {**payload, "Projects": []}),
+    ]
+    utils.login_profile("default")
+
+    assert do_request("GET", "projects", conditional=True) == payload["Projects"]
+
+    assert do_request("GET", "projects", conditional=True) is utils.NOT_MODIFIED
+    headers = mock_request.call_args.kwargs["headers"]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+    # server without validators: the payload hash tells if it changed
+    assert do_request("GET", "projects", conditional=True) is utils.NOT_MODIFIED
+    assert do_request("GET", "projects", conditional=True) == []
+    assert "If-None-Match" not in mock_request.call_args.kwargs["headers"]
+    assert do_request("GET", "projects", conditional=True) is utils.NOT_MODIFIED
+
+
+def test_watch_scheduler_backs_off_when_stable(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(utils.time, "sleep", sleeps.append)
+
+    scheduler = utils.WatchScheduler(interval=2, max_interval=10)
+
+    scheduler.update(["deploying", "ready"])
+    scheduler.sleep()
+    for _ in range(4):
+        scheduler.update(["ready", "ready"])
+        scheduler.sleep()
+    scheduler.update(["upgrading"])
+    scheduler.sleep()
+
+    assert sleeps == [2, 4, 8, 10, 10, 2]
+
+
+def test_watch_scheduler_retry_after_and_reminders(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(utils.time, "sleep", sleeps.append)
+
+    scheduler = utils.WatchScheduler(interval=2, max_interval=8)
+    scheduler.failed(retry_after=20)
+    scheduler.sleep()
+    scheduler.sleep()
+
+    assert sleeps == [20, 4]
+    assert scheduler.remind_due()
+    assert not scheduler.remind_due()
+
+
+def test_parse_retry_after():
+    assert utils.parse_retry_after("30") == 30
+    assert utils.parse_retry_after(None) is None
+    assert utils.parse_retry_after("Wed, 01 Jan 2020 00:00:00 GMT") == 0
+    assert utils.parse_retry_after("soon") is None
+
+
+def test_run_detached_logs_failures(tmp_path):
+    log_path = tmp_path / "refresh.log"
+
+    def refresh():
+        raise ValueError("broken refresh")
+
+    pid = utils.run_detached(refresh, log_path=str(log_path))
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 1
+    assert "ValueError: broken refresh" in log_path.read_text()
+
+
+def test_profile_context_is_isolated_per_thread(add_default_profile, monkeypatch):
+    utils.set_profile("other", {"region_name": "us-east-2", "type": "ak/sk", "access_key": "AK2", "secret_key": "SK2", "jwt": False})
+    monkeypatch.delenv("OKS_PROFILE", raising=False)
+    monkeypatch.delenv("OKS_REGION", raising=False)
+
+    barrier = threading.Barrier(2)
+
+    def region(name):
+        with utils.profile_context(name):
+            # both profiles are logged in at the same time
+            barrier.wait(timeout=5)
+            return utils.getenv("OKS_PROFILE"), utils.getenv("OKS_REGION"), utils.getenv("OKS_ACCESS_KEY")
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert list(executor.map(region, ["default", "other"])) == [
+            ("default", "eu-west-2", "AK"), ("other", "us-east-2", "AK2")]
+
+    assert "OKS_PROFILE" not in os.environ
+    assert "OKS_REGION" not in os.environ
+
+
+def test_delete_resources_runs_in_the_callers_profile(add_default_profile, monkeypatch):
+    utils.set_profile("other", {"region_name": "us-east-2", "type": "ak/sk", "access_key": "AK2", "secret_key": "SK2", "jwt": False})
+    monkeypatch.delenv("OKS_PROFILE", raising=False)
+    seen = []
+    monkeypatch.setattr(utils, "do_request", lambda method, path: seen.append((path, utils.getenv("OKS_PROFILE"), utils.getenv("OKS_ACCESS_KEY"))))
+
+    with utils.profile_context("other"):
+        statuses = utils.delete_resources([("clusters/c1", "a"), ("clusters/c2", "b")], max_concurrent=2, rate=100)
+
+    assert statuses == ["deleted", "deleted"]
+    assert sorted(seen) == [("clusters/c1", "other", "AK2"), ("clusters/c2", "other", "AK2")]
+
+
+def test_profile_context_falls_back_to_exported_settings(add_default_profile, monkeypatch):
+    utils.set_profile("userpass", {"region_name": "eu-west-2", "type": "username/password", "username": "user",
+                                   "password": "pass", "rate_limit": 3})
+    monkeypatch.setattr(utils, "_logged_in_env", set())
+    monkeypatch.setenv("OKS_OTP_CODE", "123456")
+    monkeypatch.setenv("OKS_ENDPOINT", "https://oks.example.com/api/v2/")
+    # restored once the test is over, after the login below wrote them
+    for name in ("OKS_PROFILE", "OKS_REGION", "OKS_USERNAME", "OKS_PASSWORD", "OKS_RATE_LIMIT"):
+        monkeypatch.setenv(name, "")
+        monkeypatch.delenv(name)
+    utils.login_profile("userpass")
+
+    with utils.profile_context("default"):
+        assert utils.getenv("OKS_OTP_CODE") == "123456"
+        assert utils.getenv("OKS_ENDPOINT") == "https://oks.example.com/api/v2/"
+        # set by the login of another profile, not by the user
+        assert utils.getenv("OKS_USERNAME") is None
+        assert utils.getenv("OKS_RATE_LIMIT") is None
+        assert utils.getenv("OKS_ACCESS_KEY") == "AK"
+
+
+def test_list_from_profiles_reports_failed_profiles(add_default_profile, capsys):
+    utils.set_profile("other", {"region_name": "us-east-2", "type": "ak/sk", "access_key": "AK2", "secret_key": "SK2", "jwt": False})
+
+    def func():
+        if utils.getenv("OKS_PROFILE") == "other":
+            raise click.ClickException("unreachable")
+        return [{"id": "1"}]
+
+    assert utils.list_from_profiles(["default", "other"], func) == [{"id": "1", "profile": "default", "region": "eu-west-2"}]
+    assert "unreachable" in capsys.readouterr().err
+
+    with pytest.raises(click.ClickException):
+        utils.list_from_profiles(["other"], func)
+
+
+def test_parse_and_match_selector():
+    selector = utils.parse_selector(None, None, "tag=env=staging, version!=1.30,statuses.status=ready")
+    assert selector == [(["tags", "env"], "=", "staging"), (["version"], "!=", "1.30"), (["statuses", "status"], "=", "ready")]
+
+    cluster = {"tags": {"env": "staging"}, "version": "1.31", "statuses": {"status": "ready"}}
+    assert utils.match_selector(cluster, selector)
+    assert not utils.match_selector({**cluster, "tags": {"env": "prod"}}, selector)
+    assert not utils.match_selector({**cluster, "version": "1.30"}, selector)
+    assert utils.match_selector({}, utils.parse_selector(None, None, "tag=env!=prod"))
+
+    for value in ["env", "tag=env", "=staging"]:
+        with pytest.raises(click.BadParameter):
+            utils.parse_selector(None, None, value)
+
+
+def test_token_bucket_limits_rate():
+    bucket = utils.TokenBucket(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(7):
+        bucket.acquire()
+
+    # the burst is free, the 5 others wait 1/50s each
+    assert time.monotonic() - start >= 0.09
+
+
+def _error_response(status_code, retry_after=None):
+    response = MagicMock(status_code=status_code, headers={"Retry-After": retry_after} if retry_after else {},
+                         text='{"Error": "unavailable"}')
+    response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    return response
+
+
+@patch("requests.Session.request")
+def test_request_retries_honour_retry_after(mock_request, add_default_profile, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(utils.time, "sleep", sleeps.append)
+    ok = MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": []})
+    mock_request.side_effect = [_error_response(503, "5"), ok, _error_response(500), _error_response(429, "1"), ok]
+    utils.login_profile("default")
+
+    assert do_request("GET", "projects") == []
+    assert 5 <= sleeps[0] <= 6
+
+    # a POST is not sent again after a server error, unless the API refused it with 429
+    with pytest.raises(utils.JSONClickException):
+        do_request("POST", "projects", json={})
+    assert do_request("POST", "projects", json={}) is not None
+    assert mock_request.call_count == 5
+
+    # the API asked to wait longer than allowed
+    monkeypatch.setenv("OKS_RETRY_MAX_DELAY", "10")
+    mock_request.side_effect = [_error_response(503, "60")]
+    with pytest.raises(utils.JSONClickException) as excinfo:
+        do_request("GET", "clusters")
+    assert excinfo.value.retry_after == 60
+
+
+@patch("requests.Session.request")
+def test_request_retry_budget_and_circuit_breaker(mock_request, add_default_profile, monkeypatch):
+    monkeypatch.setattr(utils.time, "sleep", lambda delay: None)
+    monkeypatch.setenv("OKS_RETRY_BUDGET", "2")
+    monkeypatch.setenv("OKS_CIRCUIT_THRESHOLD", "4")
+    mock_request.side_effect = lambda *args, **kwargs: _error_response(502)
+    utils.login_profile("default")
+
+    # the budget allows 2 retries for the whole invocation
+    with pytest.raises(utils.JSONClickException):
+        do_request("GET", "projects")
+    assert mock_request.call_count == 3
+    with pytest.raises(utils.JSONClickException):
+        do_request("GET", "clusters")
+    assert mock_request.call_count == 4
+
+    # the 4th consecutive failure opened the circuit: no request is sent until the cooldown is over
+    with pytest.raises(utils.JSONClickException) as excinfo:
+        do_request("GET", "nodepools")
+    assert mock_request.call_count == 4
+    assert excinfo.value.status_code == 503
+    assert "unavailable" in str(excinfo.value)
+
+
+@patch("requests.Session.request")
+def test_request_retry_budget_replenishes(mock_request, add_default_profile, monkeypatch):
+    monkeypatch.setattr(utils.time, "sleep", lambda delay: None)
+    monkeypatch.setenv("OKS_RETRY_BUDGET", "1")
+    monkeypatch.setenv("OKS_RETRY_RATIO", "0.5")
+    ok = MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": []})
+    mock_request.side_effect = [_error_response(502), _error_response(502), _error_response(502),
+                                ok, ok, _error_response(502), ok]
+    utils.login_profile("default")
+
+    # the single retry is spent, the next error is not retried
+    with pytest.raises(utils.JSONClickException):
+        do_request("GET", "projects")
+    with pytest.raises(utils.JSONClickException):
+        do_request("GET", "clusters")
+    assert mock_request.call_count == 3
+
+    # two successful requests earn the retry back
+    do_request("GET", "projects", params={"page": 1})
+    do_request("GET", "projects", params={"page": 2})
+    assert do_request("GET", "clusters") == []
+    assert mock_request.call_count == 7
+
+
+@patch("requests.Session.request")
+def test_cli_requests_go_through_rate_limiter(mock_request, add_default_profile):
+    mock_request.return_value = MagicMock(status_code=200, headers={}, json=lambda: {"ResponseContext": {}, "Projects": []})
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["project", "list", "-o", "json"])
+    assert result.exit_code == 0
+
+    limiter = utils.get_rate_limiter("https://api.eu-west-2.oks.outscale.com/api/v2/")
+    assert limiter.rate == 10
+    assert limiter.tokens < limiter.burst
+
+
+def test_rate_limiter_per_endpoint_and_profile(add_default_profile, monkeypatch):
+    assert utils.get_rate_limiter("https://api.eu-west-2.oks.outscale.com/api/v2/").rate == 10
+
+    monkeypatch.setenv("OKS_RATE_LIMIT", "5")
+    limiter = utils.get_rate_limiter("https://api.eu-west-2.oks.outscale.com/api/v2/")
+    assert limiter.rate == 5
+    assert utils.get_rate_limiter("https://api.eu-west-2.oks.outscale.com/api/v2/") is limiter
+    assert utils.get_rate_limiter("https://api.cloudgouv-eu-west-1.oks.outscale.com/api/v2/") is not limiter
+
+    monkeypatch.setenv("OKS_RATE_LIMIT", "0")
+    assert utils.get_rate_limiter("https://api.eu-west-2.oks.outscale.com/api/v2/") is None
+
+    monkeypatch.delenv("OKS_RATE_LIMIT")
+    runner = CliRunner()
+    result = runner.invoke(cli, ["profile", "update", "--profile-name", "default", "--rate-limit", "2"])
+    assert result.exit_code == 0
+    with utils.profile_context("default"):
+        assert utils.get_rate_limiter("https://api.eu-west-2.oks.outscale.com/api/v2/").rate == 2